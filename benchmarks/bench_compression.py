@@ -0,0 +1,61 @@
+# Response size and throughput of /users/ and /vacations/export per Accept-Encoding
+# Usage: python benchmarks/bench_compression.py [requests]
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from flask_jwt_extended import create_access_token
+from db import Base, SessionLocal, get_engine
+from main import create_app
+from models.employee import Employee
+from models.vacation_used import VacationUsed
+from utils.compression import STREAMS
+
+USERS = 2000
+VACATIONS = 20000
+
+
+def seed():
+    Base.metadata.create_all(bind=get_engine())
+    with SessionLocal() as session:
+        session.execute(
+            Employee.__table__.insert(),
+            [{"email": f"user{i}@example.com", "password_hash": "x", "is_admin": i == 0} for i in range(USERS)]
+        )
+        start = date(2000, 1, 1)
+        session.execute(
+            VacationUsed.__table__.insert(),
+            [
+                {"employee_id": 1 + i % USERS, "start_date": start + timedelta(days=i // USERS), "end_date": start + timedelta(days=i // USERS), "days_used": 1}
+                for i in range(VACATIONS)
+            ]
+        )
+        session.commit()
+
+
+def measure(client, url, headers, requests):
+    size = len(client.get(url, headers=headers).data)  # warm up
+    started = time.perf_counter()
+    for _ in range(requests):
+        assert client.get(url, headers=headers).status_code == 200
+    return size, requests / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    seed()
+
+    app = create_app()
+    with app.app_context():
+        token = create_access_token(identity="1", additional_claims={"is_admin": True})
+    client = app.test_client()
+
+    for url in ["/users/", "/vacations/export"]:
+        for encoding in ["identity", *STREAMS]:
+            headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": encoding}
+            size, rate = measure(client, url, headers, requests)
+            print(f"{url:18} {encoding:8} {size:>10,} bytes {rate:>8,.1f} req/s")
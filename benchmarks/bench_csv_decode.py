@@ -0,0 +1,59 @@
+# Micro-benchmark: per-row dateutil parsing vs sniffed batch decoding
+# Usage: python benchmarks/bench_csv_decode.py [rows]
+import csv
+import io
+import os
+import sys
+import time
+from datetime import date, timedelta
+from dateutil import parser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.csv_decoding import iter_batches, date_decoder_for, decode_used_rows
+
+
+def make_csv(rows, date_format):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["Employee", "Vacation start date", "Vacation end date"])
+    start = date(2019, 1, 1)
+    for i in range(rows):
+        day = start + timedelta(days=i % 3000)
+        writer.writerow([f"user{i % 500}@example.com", day.strftime(date_format), (day + timedelta(days=4)).strftime(date_format)])
+    return out.getvalue()
+
+
+def run_dateutil(content):
+    reader = csv.reader(io.StringIO(content))
+    next(reader)
+    for row in reader:
+        row[0].strip()
+        parser.parse(row[1]).date()
+        parser.parse(row[2]).date()
+
+
+def run_decoder(content):
+    reader = csv.reader(io.StringIO(content))
+    next(reader)
+    date_decoder = None
+    for batch in iter_batches(reader):
+        if date_decoder is None:
+            date_decoder = date_decoder_for(batch)
+        decode_used_rows(batch, date_decoder)
+
+
+def measure(fn, content, rows):
+    started = time.perf_counter()
+    fn(content)
+    return rows / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    for label, date_format in [("ISO", "%Y-%m-%d"), ("Long", "%A, %B %d, %Y")]:
+        content = make_csv(rows, date_format)
+        slow = measure(run_dateutil, content, rows)
+        fast = measure(run_decoder, content, rows)
+        print(f"{label:5} dates  dateutil: {slow:>10,.0f} rows/s   decoder: {fast:>10,.0f} rows/s   x{fast / slow:.1f}")
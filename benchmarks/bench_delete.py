@@ -0,0 +1,72 @@
+# Deleting employees with long vacation histories: ORM-loaded cascade vs ON DELETE CASCADE
+# Usage: python benchmarks/bench_delete.py [vacations_per_user] [users]
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'delete.db')}")
+
+from db import Base, SessionLocal, get_engine
+from models.employee import Employee
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services.rollup_service import rebuild_monthly_usage
+
+
+# One single-day vacation per calendar day, so bookings never overlap
+def seed(users, vacations):
+    with SessionLocal() as session:
+        employees = [Employee(email=f"leaver{i}@example.com", password_hash="x") for i in range(users)]
+        session.add_all(employees)
+        session.flush()
+        ids = [employee.id for employee in employees]
+
+        start = date(1990, 1, 1)
+        for employee_id in ids:
+            session.add_all([VacationTotal(employee_id=employee_id, year=year, total_days=20, total_days_left=20) for year in range(1990, 2026)])
+            session.execute(
+                VacationUsed.__table__.insert(),
+                [
+                    {"employee_id": employee_id, "start_date": start + timedelta(days=i), "end_date": start + timedelta(days=i), "days_used": 1}
+                    for i in range(vacations)
+                ]
+            )
+        rebuild_monthly_usage(session, ids)
+        session.commit()
+    return ids
+
+
+# load_children=True is what cascade="all, delete" without passive_deletes did: every child row
+# is loaded and deleted by primary key before the employee
+def delete_users(ids, load_children):
+    tracemalloc.start()
+    started = time.perf_counter()
+    with SessionLocal() as session:
+        for employee_id in ids:
+            employee = session.get(Employee, employee_id)
+            if load_children:
+                employee.vacation_used, employee.vacation_totals, employee.monthly_usage
+            session.delete(employee)
+        session.commit()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    vacations = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    Base.metadata.create_all(bind=get_engine())
+
+    for name, load_children in [("orm cascade", True), ("on delete cascade", False)]:
+        ids = seed(users, vacations)
+        elapsed, peak = delete_users(ids, load_children)
+        with SessionLocal() as session:
+            left = session.query(VacationUsed).filter(VacationUsed.employee_id.in_(ids)).count()
+        print(f"{name:18} {users} users x {vacations:,} vacations: {elapsed:7.2f} s  peak {peak / 1024 / 1024:7.1f} MB  rows left {left}")
@@ -0,0 +1,68 @@
+# Export throughput and peak memory for growing row counts (CSV and NDJSON)
+# Usage: python benchmarks/bench_export.py [rows]
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'export.db')}")
+os.environ.setdefault("ARCHIVE_DIR", os.path.join(_tmp, "archive"))
+
+from db import Base, SessionLocal, get_engine
+from models.employee import Employee
+from models.vacation_used import VacationUsed
+from services.export_service import export_vacations
+
+EMPLOYEES = 500
+
+
+# Row n -> employee n % EMPLOYEES, day n // EMPLOYEES, so bookings never overlap
+def seed(rows, offset):
+    with SessionLocal() as session:
+        start = date(2024, 1, 1)
+        session.execute(
+            VacationUsed.__table__.insert(),
+            [
+                {"employee_id": n % EMPLOYEES + 1, "start_date": start + timedelta(days=n // EMPLOYEES), "end_date": start + timedelta(days=n // EMPLOYEES), "days_used": 1}
+                for n in range(offset, offset + rows)
+            ]
+        )
+        session.commit()
+
+
+def measure(export_format):
+    tracemalloc.start()
+    started = time.perf_counter()
+    written = 0
+    with open(os.devnull, "w") as out:
+        for chunk in export_vacations(export_format):
+            written += len(chunk)
+            out.write(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, written, peak
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    Base.metadata.create_all(bind=get_engine())
+    with SessionLocal() as session:
+        session.execute(
+            Employee.__table__.insert(),
+            [{"email": f"user{i}@example.com", "password_hash": "x", "is_admin": False} for i in range(EMPLOYEES)]
+        )
+        session.commit()
+
+    print(f"{'rows':>8} {'format':>7} {'rows/s':>10} {'MB/s':>7} {'peak KB':>8}")
+    total = 0
+    for step in (rows // 4, rows // 4, rows // 2):
+        seed(step, total)
+        total += step
+        for export_format in ("csv", "ndjson"):
+            elapsed, written, peak = measure(export_format)
+            print(f"{total:>8} {export_format:>7} {total / elapsed:>10.0f} {written / elapsed / 1e6:>7.1f} {peak / 1024:>8.0f}")
@@ -0,0 +1,74 @@
+# Throughput of /users/ and /vacations/<id>/<year> with stdlib vs orjson JSON provider
+# Usage: python benchmarks/bench_json.py [requests]
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from flask_jwt_extended import create_access_token
+from db import Base, SessionLocal, get_engine
+from main import create_app
+from models.employee import Employee
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from utils.json_provider import JSON_PROVIDERS, orjson
+
+USERS = 2000
+VACATIONS = 250
+YEAR = 2025
+
+
+def seed():
+    Base.metadata.create_all(bind=get_engine())
+    with SessionLocal() as session:
+        session.execute(
+            Employee.__table__.insert(),
+            [{"email": f"user{i}@example.com", "password_hash": "x", "is_admin": i == 0} for i in range(USERS)]
+        )
+        session.add(VacationTotal(employee_id=1, year=YEAR, total_days=400, total_days_left=150))
+        start = date(YEAR, 1, 1)
+        session.execute(
+            VacationUsed.__table__.insert(),
+            [
+                {"employee_id": 1, "start_date": start + timedelta(days=i), "end_date": start + timedelta(days=i), "days_used": 1}
+                for i in range(VACATIONS)
+            ]
+        )
+        session.commit()
+
+
+def measure(client, url, headers, requests):
+    client.get(url, headers=headers)  # warm up
+    started = time.perf_counter()
+    for _ in range(requests):
+        assert client.get(url, headers=headers).status_code == 200
+    return requests / (time.perf_counter() - started)
+
+
+def measure_encode(provider, payload, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        provider.dumps(payload, separators=(",", ":"))
+    return requests / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seed()
+
+    app = create_app()
+    with app.app_context():
+        token = create_access_token(identity="1", additional_claims={"is_admin": True})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    providers = ["stdlib", "orjson"] if orjson else ["stdlib"]
+    for url in ["/users/", f"/vacations/1/{YEAR}"]:
+        payload = app.test_client().get(url, headers=headers).get_json()
+        for name in providers:
+            app.json = JSON_PROVIDERS[name](app)
+            rate = measure(app.test_client(), url, headers, requests)
+            encode = measure_encode(app.json, payload, requests)
+            print(f"{url:20} {name:7} {rate:>8,.0f} req/s   encode only: {encode:>8,.0f} bodies/s")
@@ -0,0 +1,98 @@
+# Year / period queries on partitioned vacation_used vs an unpartitioned copy (Postgres only)
+# Usage: DATABASE_URL=postgresql+psycopg2://... python benchmarks/bench_partitions.py [employees] [years]
+#   Run against a scratch database after `alembic upgrade head`, it inserts test data.
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_engine
+from db.partitions import ensure_partitions, is_partitioned
+
+YEAR_QUERY = """
+    SELECT id, start_date, end_date, days_used FROM {table}
+    WHERE employee_id = :employee_id
+      AND start_date >= :year_start AND start_date <= :year_end AND end_date <= :year_end
+    ORDER BY start_date
+"""
+
+PERIOD_QUERY = """
+    SELECT start_date, end_date FROM {table}
+    WHERE employee_id = :employee_id AND end_date >= :period_start AND start_date <= :period_end
+"""
+
+
+def seed(connection, employees, first_year, last_year):
+    connection.execute(
+        text("INSERT INTO employees (email, password_hash, is_admin) SELECT 'bench' || g || '@example.com', 'x', false FROM generate_series(1, :n) g"),
+        {"n": employees}
+    )
+    ids = connection.execute(text("SELECT id FROM employees WHERE email LIKE 'bench%'")).scalars().all()
+
+    rows = []
+    for employee_id in ids:
+        for year in range(first_year, last_year + 1):
+            # ~10 one-week vacations per year
+            for week in random.sample(range(50), 10):
+                start = date(year, 1, 1) + timedelta(weeks=week)
+                rows.append({"employee_id": employee_id, "start_date": start, "end_date": start + timedelta(days=4), "days_used": 5})
+        if len(rows) > 20000:
+            connection.execute(text("INSERT INTO vacation_used (employee_id, start_date, end_date, days_used) VALUES (:employee_id, :start_date, :end_date, :days_used)"), rows)
+            rows = []
+    if rows:
+        connection.execute(text("INSERT INTO vacation_used (employee_id, start_date, end_date, days_used) VALUES (:employee_id, :start_date, :end_date, :days_used)"), rows)
+
+    connection.execute(text("DROP TABLE IF EXISTS vacation_used_flat"))
+    connection.execute(text("CREATE TABLE vacation_used_flat AS SELECT * FROM vacation_used"))
+    connection.execute(text("CREATE INDEX ON vacation_used_flat (employee_id, start_date)"))
+    connection.execute(text("ANALYZE vacation_used"))
+    connection.execute(text("ANALYZE vacation_used_flat"))
+    return ids
+
+
+def timed(connection, query, params_list):
+    started = time.perf_counter()
+    for params in params_list:
+        connection.execute(text(query), params).all()
+    return (time.perf_counter() - started) / len(params_list) * 1000
+
+
+def partitions_scanned(connection, query, params):
+    plan = connection.execute(text("EXPLAIN " + query), params).scalars().all()
+    return sum(1 for line in plan if "vacation_used_y" in line or "vacation_used_default" in line)
+
+
+if __name__ == "__main__":
+    employees = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    last_year = date.today().year
+    first_year = last_year - years + 1
+
+    engine = get_engine()
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            sys.exit("vacation_used is not partitioned, run `alembic upgrade head` on Postgres first")
+        ensure_partitions(connection, first_year=first_year)
+        ids = seed(connection, employees, first_year, last_year)
+
+    samples = [
+        {
+            "employee_id": random.choice(ids),
+            "year_start": date(last_year, 1, 1), "year_end": date(last_year, 12, 31),
+            "period_start": date(last_year, 3, 1), "period_end": date(last_year, 6, 30),
+        }
+        for _ in range(500)
+    ]
+
+    print(f"{employees} employees, {years} years ({first_year}-{last_year}), {len(samples)} queries each")
+    with engine.connect() as connection:
+        for label, query in [("year", YEAR_QUERY), ("period", PERIOD_QUERY)]:
+            for table in ["vacation_used", "vacation_used_flat"]:
+                sql = query.format(table=table)
+                ms = timed(connection, sql, samples)
+                scanned = partitions_scanned(connection, sql, samples[0]) if table == "vacation_used" else "-"
+                print(f"{label:7} {table:20} {ms:7.3f} ms/query   partitions scanned: {scanned}")
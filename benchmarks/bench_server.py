@@ -0,0 +1,103 @@
+# Compare the Flask dev server (old entrypoint) with the Gunicorn launcher
+# Usage: python benchmarks/bench_server.py [seconds] [client_threads]
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_server.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret-key-bench-secret-key")
+
+from flask_jwt_extended import create_access_token
+from db import Base, SessionLocal, get_engine
+from main import create_app
+from models.employee import Employee
+from models.vacation_total import VacationTotal
+
+PORT = 5055
+URL = "/vacations/1/2025"
+
+SERVERS = {
+    "flask run": [sys.executable, "-m", "flask", "--app", "main:create_app()", "run", "--port", str(PORT)],
+    "gunicorn": [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{PORT}", "main:create_app()"],
+}
+
+
+def seed():
+    Base.metadata.create_all(bind=get_engine())
+    with SessionLocal() as session:
+        session.add(Employee(id=1, email="bench@example.com", password_hash="x", is_admin=True))
+        session.add(VacationTotal(employee_id=1, year=2025, total_days=20, total_days_left=20))
+        session.commit()
+
+
+def wait_for_port(timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", PORT), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def client(headers, stop_at, latencies, errors):
+    connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=10)
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        try:
+            connection.request("GET", URL, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException):
+            errors.append("conn")
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=10)
+        latencies.append(time.perf_counter() - started)
+
+
+def run(name, command, headers, seconds, threads):
+    process = subprocess.Popen(command, cwd=ROOT, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port()
+        latencies, errors = [], []
+        stop_at = time.monotonic() + seconds
+        workers = [threading.Thread(target=client, args=(headers, stop_at, latencies, errors)) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        process.terminate()
+        process.wait()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    print(f"{name:10} {len(latencies) / seconds:>8,.0f} req/s   p50 {p50:6.1f} ms   p99 {p99:6.1f} ms   errors {len(errors)}")
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    seed()
+    app = create_app()
+    with app.app_context():
+        token = create_access_token(identity="1", additional_claims={"is_admin": True})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    print(f"GET {URL}, {threads} client threads, {seconds:.0f}s each, {os.cpu_count()} cores")
+    for name, command in SERVERS.items():
+        run(name, command, headers, seconds, threads)
@@ -0,0 +1,60 @@
+# Import-time profile of the app: python -X importtime, slowest modules first
+# Usage: python benchmarks/bench_startup.py [top] [--json]
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(statement):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def wall_time(statement, runs=5):
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    top = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 15
+
+    modules = import_profile("import main")
+    total_us = sum(self_us for _, self_us, _ in modules)
+    slowest = sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+
+    result = {
+        "import_main_ms": round(total_us / 1000, 1),
+        "python_only_s": round(wall_time("pass"), 3),
+        "import_main_s": round(wall_time("import main"), 3),
+        "create_app_s": round(wall_time("import main; main.create_app()"), 3),
+        "slowest_modules": [{"module": name, "self_ms": round(self_us / 1000, 2)} for name, self_us, _ in slowest],
+    }
+
+    if "--json" in sys.argv:
+        print(json.dumps(result))
+        sys.exit(0)
+
+    print(f"import main (sum of self times): {result['import_main_ms']} ms")
+    print(f"wall time: python {result['python_only_s']}s, import main {result['import_main_s']}s, create_app {result['create_app_s']}s")
+    print(f"\nslowest {top} modules (self time):")
+    for module in result["slowest_modules"]:
+        print(f"  {module['self_ms']:8.2f} ms  {module['module']}")
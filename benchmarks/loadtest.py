@@ -0,0 +1,318 @@
+# Mixed-workload load test against a running instance, prints a JSON report
+# Usage: python benchmarks/loadtest.py --url http://127.0.0.1:5000 --seed --users 200 --workers 16 --duration 30 \
+#            --mix overview=70,me=20,book=5,login=5 [--output report.json]
+# DATABASE_URL and JWT_SECRET_KEY must be the same as the server's (users are seeded and tokens minted locally).
+# All logins come from this one client IP and trip the server's per-IP login limiter within seconds. Those 429s are
+# reported as "rate_limited" and left out of errors, throughput and latency. To measure password hashing instead,
+# start the server with a relaxed limiter (RELAXED_LIMITER below, --seed prints it when login is in the mix).
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func
+from werkzeug.security import generate_password_hash
+from db import SessionLocal
+from main import create_app
+from models.employee import Employee
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+
+EMAIL = "loadtest{}@example.com"
+ADMIN_EMAIL = "loadtest-admin@example.com"
+PASSWORD = "loadtest-password"
+YEARS = 10
+DEFAULT_MIX = "overview=70,me=20,book=5,login=5"
+RELAXED_LIMITER = "LOGIN_IP_BURST=100000 LOGIN_IP_PER_MINUTE=1000000 LOGIN_EMAIL_BURST=100000 LOGIN_EMAIL_PER_MINUTE=1000000"
+
+
+# "overview=70,me=20" -> [("overview", 70), ("me", 20)]
+def parse_mix(text):
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown endpoint '{name}' in --mix, use: {', '.join(SCENARIOS)}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+# Create loadtest users (one password hash shared by all, hashing is slow) with totals for YEARS years
+def seed(users, first_year):
+    password_hash = generate_password_hash(PASSWORD)
+    with SessionLocal() as session:
+        existing = {email for (email,) in session.query(Employee.email).filter(Employee.email.like("loadtest%"))}
+        new_users = [
+            {"email": email, "password_hash": password_hash, "is_admin": email == ADMIN_EMAIL}
+            for email in [ADMIN_EMAIL] + [EMAIL.format(i) for i in range(users)]
+            if email not in existing
+        ]
+        if new_users:
+            session.execute(Employee.__table__.insert(), new_users)
+            session.commit()
+
+        ids = _user_ids(session, users)
+        have_totals = {
+            (employee_id, year)
+            for employee_id, year in session.query(VacationTotal.employee_id, VacationTotal.year)
+            .filter(VacationTotal.employee_id.in_(ids), VacationTotal.year >= first_year)
+        }
+        totals = [
+            {"employee_id": employee_id, "year": year, "total_days": 365, "total_days_left": 365}
+            for employee_id in ids
+            for year in range(first_year, first_year + YEARS)
+            if (employee_id, year) not in have_totals
+        ]
+        if totals:
+            session.execute(VacationTotal.__table__.insert(), totals)
+            session.commit()
+
+
+def _user_ids(session, users):
+    emails = [EMAIL.format(i) for i in range(users)]
+    rows = dict(session.query(Employee.email, Employee.id).filter(Employee.email.in_(emails)))
+    return [rows[email] for email in emails if email in rows]
+
+
+def load_users(users):
+    with SessionLocal() as session:
+        ids = _user_ids(session, users)
+        admin_id = session.query(Employee.id).filter_by(email=ADMIN_EMAIL).scalar()
+        # Bookings continue after the last seeded booking so re-runs don't overlap
+        last_end = session.query(func.max(VacationUsed.end_date)).filter(VacationUsed.employee_id.in_(ids)).scalar()
+    if not ids or admin_id is None:
+        raise SystemExit("No loadtest users in the database, run with --seed first")
+    return ids, admin_id, last_end
+
+
+# Real access tokens, signed with the server's JWT_SECRET_KEY
+def mint_tokens(ids, admin_id):
+    app = create_app()
+    with app.app_context():
+        tokens = {
+            user_id: create_access_token(identity=str(user_id), additional_claims={"is_admin": False}, expires_delta=timedelta(hours=6))
+            for user_id in ids
+        }
+        admin_token = create_access_token(identity=str(admin_id), additional_claims={"is_admin": True}, expires_delta=timedelta(hours=6))
+    return tokens, admin_token
+
+
+class Workload:
+    """Shared state for the scenarios: users, tokens and the next free booking day."""
+
+    def __init__(self, ids, tokens, admin_token, first_day):
+        self.ids = ids
+        self.tokens = tokens
+        self.admin_token = admin_token
+        self._lock = threading.Lock()
+        self._next_booking = 0
+        self.first_day = first_day
+
+    # Every booking gets its own (user, weekday), walking forward through the calendar
+    def next_booking(self):
+        with self._lock:
+            n = self._next_booking
+            self._next_booking += 1
+        user_id = self.ids[n % len(self.ids)]
+        # k-th weekday counted from the first Monday on/after first_day
+        weeks, weekday = divmod(n // len(self.ids), 5)
+        monday = self.first_day + timedelta(days=(7 - self.first_day.weekday()) % 7)
+        return user_id, monday + timedelta(weeks=weeks, days=weekday)
+
+    def auth(self, user_id):
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+
+# Each scenario returns (method, path, headers, body)
+def overview(workload, rng):
+    user_id = rng.choice(workload.ids)
+    return "GET", f"/vacations/{user_id}", workload.auth(user_id), None
+
+
+def year_view(workload, rng):
+    user_id = rng.choice(workload.ids)
+    return "GET", f"/vacations/{user_id}/{workload.first_day.year}", workload.auth(user_id), None
+
+
+def used_period(workload, rng):
+    user_id = rng.choice(workload.ids)
+    year = workload.first_day.year
+    return "GET", f"/vacations/{user_id}/used?from={year}-01-01&to={year}-12-31", workload.auth(user_id), None
+
+
+def me(workload, rng):
+    user_id = rng.choice(workload.ids)
+    return "GET", "/users/me", workload.auth(user_id), None
+
+
+def book(workload, rng):
+    user_id, day = workload.next_booking()
+    body = {"user_id": user_id, "start_date": day.isoformat(), "end_date": day.isoformat()}
+    return "POST", "/vacations/vacation-used", {"Authorization": f"Bearer {workload.admin_token}"}, body
+
+
+def login(workload, rng):
+    index = rng.randrange(len(workload.ids))
+    return "POST", "/auth/login", {}, {"email": EMAIL.format(index), "password": PASSWORD}
+
+
+SCENARIOS = {
+    "overview": overview,
+    "year": year_view,
+    "used": used_period,
+    "me": me,
+    "book": book,
+    "login": login,
+}
+
+
+def worker(target, workload, mix, stop_at, results, seed_value):
+    rng = random.Random(seed_value)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    connection = None
+
+    while time.monotonic() < stop_at:
+        name = rng.choices(names, weights)[0]
+        method, path, headers, body = SCENARIOS[name](workload, rng)
+        payload = json.dumps(body) if body is not None else None
+        if payload is not None:
+            headers = dict(headers, **{"Content-Type": "application/json"})
+
+        if connection is None:
+            connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+
+        started = time.perf_counter()
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            status = "connection_error"
+            connection.close()
+            connection = None
+        results.append((name, status, time.perf_counter() - started))
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    # nearest-rank
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+# 429s are answered before any real work, counted on their own so they don't pass for fast requests
+def summarize(samples, elapsed):
+    served = [(status, latency) for status, latency in samples if status != 429]
+    latencies = sorted(latency for _, latency in served)
+    statuses = defaultdict(int)
+    for status, _ in samples:
+        statuses[str(status)] += 1
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2") and status != "429")
+
+    return {
+        "requests": len(samples),
+        "rate_limited": statuses.get("429", 0),
+        "throughput_rps": round(len(served) / elapsed, 1) if elapsed else 0,
+        "errors": errors,
+        "error_rate": round(errors / len(served), 4) if served else 0,
+        "status_codes": dict(sorted(statuses.items())),
+        "latency_ms": {
+            name: round(value * 1000, 2) if value is not None else None
+            for name, value in (
+                ("p50", percentile(latencies, 50)),
+                ("p90", percentile(latencies, 90)),
+                ("p95", percentile(latencies, 95)),
+                ("p99", percentile(latencies, 99)),
+                ("max", latencies[-1] if latencies else None),
+            )
+        },
+    }
+
+
+def run(args):
+    mix = parse_mix(args.mix)
+    first_year = date.today().year
+
+    if args.seed:
+        seed(args.users, first_year)
+        if any(name == "login" and weight for name, weight in mix):
+            print(
+                "login is in --mix: restart the server with a relaxed login limiter to measure password hashing, e.g.\n"
+                f"  {RELAXED_LIMITER}\notherwise most logins are reported as rate_limited.",
+                file=sys.stderr,
+            )
+    ids, admin_id, last_end = load_users(args.users)
+    tokens, admin_token = mint_tokens(ids, admin_id)
+
+    first_day = max(date(first_year, 1, 1), last_end + timedelta(days=1)) if last_end else date(first_year, 1, 1)
+    workload = Workload(ids, tokens, admin_token, first_day)
+    target = urlsplit(args.url)
+
+    results = []
+    stop_at = time.monotonic() + args.duration
+    started = time.monotonic()
+    threads = [
+        threading.Thread(target=worker, args=(target, workload, mix, stop_at, results, args.random_seed + i))
+        for i in range(args.workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    by_endpoint = defaultdict(list)
+    for name, status, latency in results:
+        by_endpoint[name].append((status, latency))
+
+    return {
+        "config": {
+            "url": args.url,
+            "duration_s": args.duration,
+            "workers": args.workers,
+            "users": len(ids),
+            "mix": dict(mix),
+        },
+        "elapsed_s": round(elapsed, 2),
+        "total": summarize([(status, latency) for _, status, latency in results], elapsed),
+        "endpoints": {name: summarize(samples, elapsed) for name, samples in sorted(by_endpoint.items())},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mixed-workload load test for a running vacation tracker")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--users", type=int, default=200, help="seeded users to spread requests over")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weights per endpoint ({', '.join(SCENARIOS)})")
+    parser.add_argument("--seed", action="store_true", help="create loadtest users and totals first (idempotent)")
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+from commands.archive import archive_year_command
+from commands.export import export_vacations_command
+from commands.idempotency import purge_idempotency_keys_command
+from commands.imports import import_totals_command, import_users_command, import_vacations_command
+from commands.jobs import recover_import_jobs_command, run_import_jobs_command
+from commands.partitions import ensure_partitions_command
+from commands.rate_limit import purge_rate_limit_buckets_command
+from commands.reconcile import reconcile_command
+from commands.rollover import rollover_year_command
+from commands.rollups import rebuild_monthly_usage_command
+from commands.tokens import purge_revoked_tokens_command
+
+
+def register_commands(app):
+    app.cli.add_command(ensure_partitions_command)
+    app.cli.add_command(archive_year_command)
+    app.cli.add_command(export_vacations_command)
+    # short alias, same command
+    app.cli.add_command(export_vacations_command, name="export")
+    app.cli.add_command(rollover_year_command)
+    app.cli.add_command(import_users_command)
+    app.cli.add_command(import_totals_command)
+    app.cli.add_command(import_vacations_command)
+    app.cli.add_command(reconcile_command)
+    app.cli.add_command(rebuild_monthly_usage_command)
+    app.cli.add_command(purge_idempotency_keys_command)
+    app.cli.add_command(purge_rate_limit_buckets_command)
+    app.cli.add_command(purge_revoked_tokens_command)
+    app.cli.add_command(run_import_jobs_command)
+    app.cli.add_command(recover_import_jobs_command)
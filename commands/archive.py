@@ -0,0 +1,18 @@
+import click
+from services.archive_service import ArchiveError, archive_year
+
+
+# flask archive-year 2019   (after HR closed the year)
+@click.command("archive-year")
+@click.argument("year", type=int)
+def archive_year_command(year):
+    """Move a closed year's totals and used vacations into the compressed archive."""
+    try:
+        report = archive_year(year)
+    except ArchiveError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"Archived {year}: {report['totals']} totals and {report['vacations']} vacations "
+        f"for {report['employees']} employees"
+    )
@@ -0,0 +1,14 @@
+import click
+from services.export_service import EXPORT_FORMATS, export_vacations
+
+
+# flask export-vacations --format ndjson --year 2024 -o vacations.ndjson
+@click.command("export-vacations")
+@click.option("--format", "export_format", type=click.Choice(list(EXPORT_FORMATS)), default="csv", show_default=True)
+@click.option("--year", type=int, default=None, help="Only vacations starting in this year.")
+@click.option("--user-id", type=int, default=None, help="Only this employee.")
+@click.option("-o", "--output", type=click.File("w", encoding="utf-8"), default="-", help="Output file, stdout by default.")
+def export_vacations_command(export_format, year, user_id, output):
+    """Stream all used vacations (with employee email) as CSV or NDJSON."""
+    for chunk in export_vacations(export_format, year=year, employee_id=user_id):
+        output.write(chunk)
@@ -0,0 +1,9 @@
+import click
+from utils.idempotency import purge_expired
+
+
+# flask purge-idempotency-keys   (from cron, expired keys are also replaced on reuse)
+@click.command("purge-idempotency-keys")
+def purge_idempotency_keys_command():
+    """Delete stored Idempotency-Key responses past their TTL."""
+    click.echo(f"Deleted {purge_expired()} expired idempotency keys")
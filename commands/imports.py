@@ -0,0 +1,36 @@
+import json
+import click
+from services.parallel_import import import_file
+
+
+def _run(kind, path, workers, chunk_size):
+    report = import_file(kind, path, workers=workers, chunk_size=chunk_size)
+    click.echo(json.dumps(report, indent=2))
+
+
+# Shared options: local file, optional process pool and commit chunk size
+def _import_command(name, kind, help_text):
+    @click.command(name, help=help_text)
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--workers", type=click.IntRange(min=1), default=1, show_default=True,
+                  help="Split the file by email and import the parts in this many processes.")
+    @click.option("--chunk-size", type=int, default=None, help="Rows per commit (default IMPORT_CHUNK_SIZE).")
+    def command(path, workers, chunk_size):
+        _run(kind, path, workers, chunk_size)
+    return command
+
+
+# flask import-users users.csv --workers 4
+import_users_command = _import_command(
+    "import-users", "users", "Bulk create users from a local CSV/NDJSON file (same format as POST /auth/register)."
+)
+
+# flask import-totals totals_2026.csv
+import_totals_command = _import_command(
+    "import-totals", "vacation_totals", "Bulk create vacation totals from a local file (same format as POST /vacations/totals)."
+)
+
+# flask import-vacations used.csv.gz --workers 4
+import_vacations_command = _import_command(
+    "import-vacations", "vacation_used", "Bulk add used vacations from a local file (same format as POST /vacations/vacation-used)."
+)
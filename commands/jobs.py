@@ -0,0 +1,23 @@
+import click
+from services.jobs_service import recover_jobs, run_worker
+
+
+# flask run-import-jobs   (with IMPORT_JOB_RUNNER=worker the web workers only queue uploads)
+@click.command("run-import-jobs")
+@click.option("--poll-interval", type=float, default=2.0, show_default=True, help="Seconds between checks for new jobs.")
+@click.option("--once", is_flag=True, help="Stop when the queue is empty instead of waiting for new jobs.")
+def run_import_jobs_command(poll_interval, once):
+    """Run queued background imports, and re-queue jobs whose worker died."""
+    run_worker(poll_interval=poll_interval, once=once)
+
+
+# flask recover-import-jobs   (re-queue or fail jobs without a heartbeat, delete orphaned uploads)
+@click.command("recover-import-jobs")
+@click.option("--stale-seconds", type=int, default=None, help="Heartbeat age that counts as dead (default IMPORT_JOB_STALE_SECONDS).")
+def recover_import_jobs_command(stale_seconds):
+    """Re-queue background imports left behind by a dead worker."""
+    report = recover_jobs(stale_seconds)
+    click.echo(
+        f"Re-queued {len(report['requeued'])} jobs, failed {len(report['failed'])} jobs, "
+        f"removed {report['removed_uploads']} orphaned uploads"
+    )
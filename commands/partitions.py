@@ -0,0 +1,17 @@
+import click
+from db import get_engine
+from db.partitions import ensure_partitions
+
+
+# flask ensure-partitions --years-ahead 2   (run from cron / at deploy)
+@click.command("ensure-partitions")
+@click.option("--years-ahead", default=2, show_default=True, help="Create partitions up to this many years after the current one.")
+def ensure_partitions_command(years_ahead):
+    """Create missing yearly vacation_used partitions (Postgres only)."""
+    with get_engine().begin() as connection:
+        created = ensure_partitions(connection, years_ahead=years_ahead)
+
+    if created:
+        click.echo(f"Created partitions: {', '.join(str(year) for year in created)}")
+    else:
+        click.echo("Partitions are up to date")
@@ -0,0 +1,10 @@
+import click
+from utils.rate_limit import DatabaseBucketStore, create_login_limiter
+
+
+# flask purge-rate-limit-buckets   (from cron, logins also prune every LOGIN_BUCKET_PRUNE_EVERY attempts)
+@click.command("purge-rate-limit-buckets")
+def purge_rate_limit_buckets_command():
+    """Delete login rate limit buckets that have refilled to full."""
+    idle_after = create_login_limiter().idle_seconds()
+    click.echo(f"Deleted {DatabaseBucketStore().prune(idle_after)} idle rate limit buckets")
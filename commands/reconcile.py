@@ -0,0 +1,24 @@
+import click
+from services.reconcile_service import reconcile
+
+
+# flask reconcile --year 2025 --fix
+@click.command("reconcile")
+@click.option("--year", type=int, default=None, help="Only check this year.")
+@click.option("--fix", is_flag=True, help="Write the expected days left back to vacation_totals.")
+def reconcile_command(year, fix):
+    """Check that days left match total days minus used vacations."""
+    result = reconcile(year=year, fix=fix)
+
+    for mismatch in result["mismatches"]:
+        click.echo(
+            f"employee {mismatch['employee_id']} year {mismatch['year']}: "
+            f"days left {mismatch['total_days_left']}, expected {mismatch['expected']}"
+        )
+
+    if not result["mismatches"]:
+        click.echo("All vacation totals are consistent")
+    elif fix:
+        click.echo(f"Fixed {result['fixed']} vacation totals")
+    else:
+        click.echo(f"{len(result['mismatches'])} mismatches, run with --fix to correct them")
@@ -0,0 +1,27 @@
+import click
+from services.archive_service import is_archived
+from services.rollover_service import RolloverError, get_default_max_carry_over, rollover_year
+
+
+# flask rollover-year 2026 --base-days 20 --max-carry-over 5
+@click.command("rollover-year")
+@click.argument("year", type=int)
+@click.option("--base-days", type=int, default=None, help="New days per employee (default ROLLOVER_BASE_DAYS).")
+@click.option("--max-carry-over", type=int, default=None, help="Max unused days carried from the previous year (default ROLLOVER_MAX_CARRY_OVER).")
+@click.option("--carry-all", is_flag=True, help="Carry over all unused days.")
+def rollover_year_command(year, base_days, max_carry_over, carry_all):
+    """Create vacation totals for YEAR for every employee that has none yet."""
+    if is_archived(year):
+        raise click.ClickException(f"Year {year} is archived")
+
+    if carry_all:
+        max_carry_over = None
+    elif max_carry_over is None:
+        max_carry_over = get_default_max_carry_over()
+
+    try:
+        result = rollover_year(year, base_days=base_days, max_carry_over=max_carry_over)
+    except RolloverError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f"Created {result['created']} vacation totals for {year}")
@@ -0,0 +1,15 @@
+import click
+from db import SessionLocal
+from services.rollup_service import rebuild_monthly_usage
+
+
+# flask rebuild-monthly-usage [--user-id 5]   (after bulk SQL changes to vacation_used)
+@click.command("rebuild-monthly-usage")
+@click.option("--user-id", "user_ids", type=int, multiple=True, help="Only these employees (repeatable).")
+def rebuild_monthly_usage_command(user_ids):
+    """Recompute the per-month used workdays rollup from vacation_used."""
+    with SessionLocal() as session:
+        written = rebuild_monthly_usage(session, user_ids or None)
+        session.commit()
+
+    click.echo(f"Rebuilt {written} monthly usage rows")
@@ -0,0 +1,9 @@
+import click
+from utils.token_blacklist import purge_expired_tokens
+
+
+# flask purge-revoked-tokens   (from cron, logged-out tokens past their exp)
+@click.command("purge-revoked-tokens")
+def purge_revoked_tokens_command():
+    """Delete revoked tokens that have expired anyway."""
+    click.echo(f"Deleted {purge_expired_tokens()} expired revoked tokens")
@@ -1,6 +1,10 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 Base = declarative_base()
 
@@ -10,8 +14,187 @@ def get_database_url():
         "postgresql+psycopg2://postgres:postgres@db:5432/vacation_tracker"
     )
 
+# Comma separated list of read-only replicas, empty -> everything goes to primary
+def get_replica_urls():
+    return [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+def create_db_engine(url=None):
+    engine = create_engine(url or get_database_url(), echo=False, future=True)
+    if engine.dialect.name == "sqlite":
+        # SQLite ignores foreign keys (and ON DELETE CASCADE) unless every connection turns them on
+        event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+    return engine
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+# Engines are created on first use and once per process (a forked child builds its own)
+_engine = None
+_replicas = None
+_replicas_loaded = False
+_pid = None
+
+
+def _check_pid():
+    global _engine, _replicas, _replicas_loaded, _pid
+    if _pid == os.getpid():
+        return
+    # Inherited from the parent -> drop without closing the parent's sockets
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _replicas is not None:
+        for replica in _replicas.engines:
+            replica.dispose(close=False)
+    _engine, _replicas, _replicas_loaded, _pid = None, None, False, os.getpid()
+
+
 def get_engine():
-    return create_engine(get_database_url(), echo=False, future=True)
+    global _engine
+    _check_pid()
+    if _engine is None:
+        _engine = create_db_engine()
+    return _engine
+
+
+def get_replicas():
+    global _replicas, _replicas_loaded
+    _check_pid()
+    if not _replicas_loaded:
+        urls = get_replica_urls()
+        _replicas = ReplicaPool([create_db_engine(url) for url in urls]) if urls else None
+        _replicas_loaded = True
+    return _replicas
+
+
+# Set by read_only() around service functions that never write
+_read_only = ContextVar("read_only", default=False)
+
+# Identifies the client (set per request) for read-your-writes stickiness
+sticky_key = ContextVar("sticky_key", default=None)
+
+
+def read_only(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+    return wrapper
+
+
+class ReplicaPool:
+    """Round-robin over replica engines, skipping ones that failed a health check."""
+
+    def __init__(self, engines, check_interval=None, sticky_seconds=None):
+        self.engines = list(engines)
+        self.check_interval = check_interval if check_interval is not None else float(os.getenv("REPLICA_CHECK_INTERVAL", "5"))
+        self.sticky_seconds = sticky_seconds if sticky_seconds is not None else float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+        self._lock = threading.Lock()
+        self._next = 0
+        self._healthy = [True] * len(self.engines)
+        self._checked_at = [0.0] * len(self.engines)
+        self._sticky_until = {}
+
+    def _is_healthy(self, index):
+        now = time.monotonic()
+        if now - self._checked_at[index] < self.check_interval:
+            return self._healthy[index]
+
+        self._checked_at[index] = now
+        try:
+            with self.engines[index].connect() as connection:
+                connection.execute(text("SELECT 1"))
+            self._healthy[index] = True
+        except Exception:
+            self._healthy[index] = False
+        return self._healthy[index]
+
+    # Next healthy replica, None when all are down
+    def choose(self):
+        with self._lock:
+            for _ in range(len(self.engines)):
+                index = self._next
+                self._next = (self._next + 1) % len(self.engines)
+                if self._is_healthy(index):
+                    return self.engines[index]
+        return None
+
+    # After a write, the same client reads from primary for a few seconds
+    def mark_sticky(self, key):
+        if key is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._sticky_until[key] = now + self.sticky_seconds
+            # drop expired entries so the map doesn't grow forever
+            if len(self._sticky_until) > 10000:
+                self._sticky_until = {k: v for k, v in self._sticky_until.items() if v > now}
+
+    def is_sticky(self, key):
+        return key is not None and self._sticky_until.get(key, 0) > time.monotonic()
+
+
+class RoutingSession(Session):
+    """Reads inside read_only() go to a replica, everything else to the bound primary."""
+
+    def __init__(self, *args, replicas=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._replicas = replicas
+        self.did_write = False
+
+    @property
+    def replicas(self):
+        return self._replicas if self._replicas is not None else get_replicas()
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replicas = self.replicas
+        if (
+            replicas
+            and _read_only.get()
+            and not self.did_write
+            and not replicas.is_sticky(sticky_key.get())
+        ):
+            replica = replicas.choose()
+            if replica is not None:
+                return replica
+        if self.bind is None:
+            return get_engine()
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+# Writes (flush or bulk statement) pin the rest of the session to primary
+@event.listens_for(RoutingSession, "before_flush")
+def _remember_flush(session, flush_context, instances):
+    session.did_write = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _remember_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.did_write = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _stick_to_primary(session):
+    replicas = session.replicas
+    if session.did_write and replicas:
+        replicas.mark_sticky(sticky_key.get())
+    session.did_write = False
+
+
+# No bind here, RoutingSession asks get_engine() when it first needs a connection
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, expire_on_commit=False)
+
 
-engine = get_engine()
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+# Forked worker must not reuse connections opened by the parent process
+def dispose_after_fork():
+    global _pid
+    _pid = None
+    _check_pid()
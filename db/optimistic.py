@@ -0,0 +1,32 @@
+import os
+import random
+import time
+
+from sqlalchemy.orm.exc import StaleDataError
+
+# vacation_totals rows carry a version number (VacationTotal.version, SQLAlchemy version_id_col).
+# An UPDATE only matches the version it read, so a concurrent change makes the flush fail with
+# StaleDataError instead of silently overwriting it. No row locks are held while a request runs.
+
+
+def get_stale_retries():
+    return int(os.getenv("STALE_RETRY_ATTEMPTS", "3"))
+
+
+def get_stale_backoff():
+    return float(os.getenv("STALE_RETRY_BACKOFF", "0.02"))
+
+
+# Run fn() (one whole read-modify-write transaction) again when another writer got in first.
+# Waits backoff * 2^attempt seconds (with jitter) between tries, re-raises StaleDataError after `retries` retries.
+def retry_on_stale(fn, retries=None, backoff=None, sleep=time.sleep):
+    retries = get_stale_retries() if retries is None else retries
+    backoff = get_stale_backoff() if backoff is None else backoff
+
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except StaleDataError:
+            if attempt == retries:
+                raise
+            sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.0))
@@ -0,0 +1,63 @@
+from sqlalchemy import text
+
+# Two vacations of one employee may only overlap on weekends. Each row stores its
+# workday-trimmed range (workday_start = first weekday, workday_end = last weekday,
+# both NULL for a weekend-only booking); two bookings clash exactly when those ranges
+# intersect. The database enforces it:
+#   Postgres -> GiST exclusion constraint on (employee_id, daterange(workday_start, workday_end, '[]'))
+#   SQLite   -> BEFORE INSERT trigger using ix_vacation_used_employee_workdays
+# On Postgres vacation_used is partitioned (db/partitions.py), exclusion constraints can only live on
+# the partitions, so lock_employee() also serializes bookings of one employee across years.
+
+EXCLUSION_SQL = (
+    "ALTER TABLE {table} ADD CONSTRAINT {table}_no_overlap EXCLUDE USING gist "
+    "(employee_id WITH =, daterange(workday_start, workday_end, '[]') WITH &&) "
+    "WHERE (workday_start IS NOT NULL)"
+)
+
+SQLITE_TRIGGER_SQL = """
+CREATE TRIGGER IF NOT EXISTS trg_vacation_used_no_overlap
+BEFORE INSERT ON vacation_used
+WHEN NEW.workday_start IS NOT NULL
+BEGIN
+    SELECT RAISE(ABORT, 'vacation_used_no_overlap')
+    WHERE EXISTS (
+        SELECT 1 FROM vacation_used
+        WHERE employee_id = NEW.employee_id
+          AND workday_end >= NEW.workday_start
+          AND workday_start <= NEW.workday_end
+    );
+END
+"""
+
+OVERLAP_ERROR = "Vacation period overlaps with an existing vacation in workdays"
+
+
+def add_exclusion_constraint(connection, table):
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+    connection.execute(text(EXCLUSION_SQL.format(table=table)))
+
+
+# Postgres: one booking per employee at a time (until commit), no-op elsewhere
+def lock_employee(session, employee_id):
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": int(employee_id)})
+
+
+# Same for every employee of an import chunk, always in id order so two imports can't deadlock
+def lock_employees(session, employee_ids):
+    for employee_id in sorted(set(employee_ids)):
+        lock_employee(session, employee_id)
+
+
+# True if an IntegrityError came from the overlap constraint / trigger
+def is_overlap_violation(error):
+    orig = getattr(error, "orig", error)
+    if getattr(orig, "pgcode", None) == "23P01":  # exclusion_violation
+        return True
+    return "no_overlap" in str(orig)
+
+
+# True if Postgres aborted the transaction to break a deadlock
+def is_deadlock(error):
+    return getattr(getattr(error, "orig", error), "pgcode", None) == "40P01"
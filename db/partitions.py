@@ -0,0 +1,75 @@
+from datetime import date
+from sqlalchemy import text
+from db.overlaps import add_exclusion_constraint
+
+# vacation_used is range partitioned by start_date year on Postgres (see migration 9b4f2d6e1a73).
+# SQLite keeps a plain table, every function here is a no-op there.
+
+PARENT = "vacation_used"
+DEFAULT_PARTITION = "vacation_used_default"
+
+
+def partition_name(year):
+    return f"vacation_used_y{year}"
+
+
+def is_partitioned(connection):
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(connection.execute(
+        text("SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :name"),
+        {"name": PARENT}
+    ).scalar())
+
+
+def existing_partition_years(connection):
+    rows = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent"
+        ),
+        {"parent": PARENT}
+    ).scalars()
+    prefix = partition_name("")
+    return sorted(int(name[len(prefix):]) for name in rows if name.startswith(prefix))
+
+
+# Create one year partition; rows of that year already sitting in the default partition are moved in
+def create_year_partition(connection, year):
+    name = partition_name(year)
+    bounds = {"start": date(year, 1, 1), "end": date(year + 1, 1, 1)}
+
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    # Overlap constraint is per partition, the parent can't carry it (db/overlaps.py)
+    add_exclusion_constraint(connection, name)
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE start_date >= :start AND start_date < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds
+    )
+    connection.execute(text(
+        f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    ))
+
+
+# Make sure partitions exist from first_year (default: earliest existing) up to this year + years_ahead
+def ensure_partitions(connection, years_ahead=2, first_year=None, today=None):
+    if not is_partitioned(connection):
+        return []
+
+    today = today or date.today()
+    existing = set(existing_partition_years(connection))
+    if first_year is None:
+        first_year = min(existing) if existing else today.year
+
+    created = []
+    for year in range(first_year, today.year + years_ahead + 1):
+        if year not in existing:
+            create_year_partition(connection, year)
+            created.append(year)
+    return created
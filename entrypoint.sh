@@ -8,5 +8,8 @@ done
 echo "Running Alembic migrations..."
 alembic -c /app/alembic.ini upgrade head
 
-echo "Starting Flask..."
-exec flask run --host=0.0.0.0 --port=5000
+echo "Creating upcoming vacation_used partitions..."
+flask --app main ensure-partitions --years-ahead 2
+
+echo "Starting Gunicorn..."
+exec gunicorn -c gunicorn.conf.py "main:create_app()"
@@ -0,0 +1,45 @@
+# Production server settings, used by entrypoint.sh:
+#   gunicorn -c gunicorn.conf.py "main:create_app()"
+#
+# Graceful reload: kill -HUP <master pid>  (new workers start, old ones finish their requests)
+# New code with preload_app: kill -USR2 <master pid>, then kill -QUIT <old master pid>
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+
+# 2 x cores + 1 is the usual starting point for sync workers
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("WORKER_CLASS", "sync")
+threads = int(os.getenv("WORKER_THREADS", "1"))
+
+# Import the app once in the master, workers fork with it already loaded
+preload_app = os.getenv("PRELOAD_APP", "true").lower() in ["true", "1", "yes"]
+
+# Background imports run on threads inside the workers unless IMPORT_JOB_RUNNER=worker
+# (a separate `flask run-import-jobs` process). Recycling a worker stops its jobs, so it's off then.
+jobs_in_workers = os.getenv("IMPORT_JOB_RUNNER", "thread").strip().lower() != "worker"
+
+# Recycle workers after this many requests (jitter so they don't restart together)
+max_requests = int(os.getenv("MAX_REQUESTS", "0" if jobs_in_workers else "1000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "100"))
+
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+accesslog = os.getenv("ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Every worker gets its own connection pool and import job threads
+    import db
+    from services import jobs_service
+
+    db.dispose_after_fork()
+    jobs_service.reset_after_fork()
+
+    # Jobs of a worker that was killed (timeout, reload) are picked up again by the others
+    if jobs_in_workers:
+        jobs_service.start_recovery_thread()
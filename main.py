@@ -1,16 +1,27 @@
+import hashlib
 import os
 from flask_jwt_extended import JWTManager
 from utils.token_blacklist import blacklist
-from flask import Flask
+from utils.json_provider import get_json_provider_class
+from utils.compression import register_compression
+from utils.idempotency import register_idempotency
+from utils.profiling import register_profiling
+from flask import Flask, request
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-from db import Base, engine
+from db import sticky_key
+from commands import register_commands
 from routes.auth import auth_bp
 from routes.users import users_bp
 from routes.vacations import vacations_bp
+from routes.jobs import jobs_bp
+from routes.profiling import profiling_bp
+from services.jobs_service import default_job_starter
 
 
 def create_app(config_class=None):
     app = Flask(__name__)
+    app.json = get_json_provider_class()(app)
 
     if config_class:
         app.config.from_object(config_class)
@@ -18,13 +29,39 @@ def create_app(config_class=None):
         app.config.from_envvar("APP_SETTINGS", silent=True)
 
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "dev-secret-key")
+    # Called as start(job_id, kind, upload_path) for every queued import, see IMPORT_JOB_RUNNER
+    app.config.setdefault("IMPORT_JOB_STARTER", default_job_starter())
 
-    # Kreiranje tabela pomeramo van testova
-    # Base.metadata.create_all(bind=engine)  <-- UKLANJAMO OVDЕ
+    # Behind a reverse proxy / load balancer: client IP from X-Forwarded-For, so login rate limits
+    # and read-your-writes see the real client instead of the proxy
+    trusted_proxies = int(os.getenv("TRUSTED_PROXIES", "0"))
+    if trusted_proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
 
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(users_bp, url_prefix="/users")
     app.register_blueprint(vacations_bp, url_prefix="/vacations")
+    app.register_blueprint(jobs_bp, url_prefix="/jobs")
+    app.register_blueprint(profiling_bp, url_prefix="/profiling")
+
+    register_commands(app)
+
+    # Client key for read-your-writes: same token (or IP) reads from primary right after a write
+    @app.before_request
+    def remember_client():
+        client = request.headers.get("Authorization") or request.remote_addr or ""
+        sticky_key.set(hashlib.sha1(client.encode("utf-8")).hexdigest())
+
+    # cProfile dumps for admin X-Profile requests and sampled traffic. First in, last out,
+    # so the other hooks below are part of the profile.
+    register_profiling(app)
+
+    # Accept-Encoding negotiated gzip/br/zstd. Registered first so it runs last,
+    # after_request hooks run in reverse and idempotency stores the plain body.
+    register_compression(app)
+
+    # Idempotency-Key on POST/PATCH: retries get the first response back instead of running again
+    register_idempotency(app)
 
     jwt = JWTManager(app)
 
@@ -35,7 +72,6 @@ def create_app(config_class=None):
 
     return app
 
-app = create_app()
-
+# No module level app: `flask run` and gunicorn call create_app() themselves
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    create_app().run(host="0.0.0.0", port=5000, debug=True)
@@ -3,11 +3,17 @@ from logging.config import fileConfig
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 
-from db import engine, Base
+from db import get_engine, Base
 import models
 from models.employee import Employee
 from models.vacation_total import VacationTotal
 from models.vacation_used import VacationUsed
+from models.import_job import ImportJob
+from models.import_checkpoint import ImportCheckpoint
+from models.revoked_token import RevokedToken
+from models.rate_limit_bucket import RateLimitBucket
+from models.vacation_monthly_usage import VacationMonthlyUsage
+from models.idempotency_key import IdempotencyKey
 
 config = context.config
 
@@ -38,9 +44,15 @@ def run_migrations_online() -> None:
     #     prefix="sqlalchemy.",
     #     poolclass=pool.NullPool,
     # )
-    connectable = engine
+    connectable = get_engine()
 
     with connectable.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            # Batch migrations copy and drop tables, with foreign keys on that would cascade deletes.
+            # The pragma only works outside a transaction, commit so Alembic starts its own.
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
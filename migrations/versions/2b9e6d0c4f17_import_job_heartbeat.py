@@ -0,0 +1,33 @@
+"""import job heartbeat
+
+Revision ID: 2b9e6d0c4f17
+Revises: 8e2d5c3f7a14
+Create Date: 2026-10-20 09:41:27.615904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b9e6d0c4f17'
+down_revision: Union[str, Sequence[str], None] = '8e2d5c3f7a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('import_jobs', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # Jobs from before the heartbeat count as last seen when they were created
+    op.execute("UPDATE import_jobs SET updated_at = COALESCE(finished_at, started_at, created_at)")
+    op.create_index('ix_import_jobs_status_updated_at', 'import_jobs', ['status', 'updated_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_import_jobs_status_updated_at', table_name='import_jobs')
+    with op.batch_alter_table('import_jobs') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,32 @@
+"""revoked token expiry
+
+Revision ID: 6a1f3e8c2d45
+Revises: 2b9e6d0c4f17
+Create Date: 2026-10-20 14:07:52.338210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1f3e8c2d45'
+down_revision: Union[str, Sequence[str], None] = '2b9e6d0c4f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows stay NULL, purge-revoked-tokens removes them a day after revoked_at
+    op.add_column('revoked_tokens', sa.Column('expires_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_revoked_tokens_expires_at'), 'revoked_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_revoked_tokens_expires_at'), table_name='revoked_tokens')
+    with op.batch_alter_table('revoked_tokens') as batch_op:
+        batch_op.drop_column('expires_at')
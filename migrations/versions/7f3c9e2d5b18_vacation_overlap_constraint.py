@@ -0,0 +1,99 @@
+"""vacation overlap constraint
+
+Revision ID: 7f3c9e2d5b18
+Revises: e2b7c5a09f14
+Create Date: 2026-10-19 16:37:12.554810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3c9e2d5b18'
+down_revision: Union[str, Sequence[str], None] = 'e2b7c5a09f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Workday-trimmed range of every booking: weekend start -> next monday, weekend end -> previous friday
+BACKFILL_POSTGRES = """
+    UPDATE vacation_used SET
+        workday_start = start_date + CASE EXTRACT(ISODOW FROM start_date) WHEN 6 THEN 2 WHEN 7 THEN 1 ELSE 0 END,
+        workday_end = end_date - CASE EXTRACT(ISODOW FROM end_date) WHEN 6 THEN 1 WHEN 7 THEN 2 ELSE 0 END
+"""
+
+BACKFILL_SQLITE = """
+    UPDATE vacation_used SET
+        workday_start = CASE strftime('%w', start_date) WHEN '6' THEN date(start_date, '+2 days') WHEN '0' THEN date(start_date, '+1 day') ELSE start_date END,
+        workday_end = CASE strftime('%w', end_date) WHEN '6' THEN date(end_date, '-1 day') WHEN '0' THEN date(end_date, '-2 days') ELSE end_date END
+"""
+
+SQLITE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS trg_vacation_used_no_overlap
+    BEFORE INSERT ON vacation_used
+    WHEN NEW.workday_start IS NOT NULL
+    BEGIN
+        SELECT RAISE(ABORT, 'vacation_used_no_overlap')
+        WHERE EXISTS (
+            SELECT 1 FROM vacation_used
+            WHERE employee_id = NEW.employee_id
+              AND workday_end >= NEW.workday_start
+              AND workday_start <= NEW.workday_end
+        );
+    END
+"""
+
+
+# Exclusion constraints can't be declared on a partitioned parent, so every partition gets its own
+def _postgres_tables(bind):
+    children = bind.execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'vacation_used'"
+    )).scalars().all()
+    return children or ['vacation_used']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    op.add_column('vacation_used', sa.Column('workday_start', sa.Date(), nullable=True))
+    op.add_column('vacation_used', sa.Column('workday_end', sa.Date(), nullable=True))
+
+    op.execute(BACKFILL_POSTGRES if bind.dialect.name == "postgresql" else BACKFILL_SQLITE)
+    # Weekend-only bookings have no workdays and never clash
+    op.execute("UPDATE vacation_used SET workday_start = NULL, workday_end = NULL WHERE workday_start > workday_end")
+
+    op.create_index('ix_vacation_used_employee_workdays', 'vacation_used', ['employee_id', 'workday_end'])
+
+    if bind.dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        for table in _postgres_tables(bind):
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_no_overlap EXCLUDE USING gist "
+                f"(employee_id WITH =, daterange(workday_start, workday_end, '[]') WITH &&) "
+                f"WHERE (workday_start IS NOT NULL)"
+            )
+    else:
+        op.execute(SQLITE_TRIGGER)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+
+    if bind.dialect.name == "postgresql":
+        for table in _postgres_tables(bind):
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_no_overlap")
+    else:
+        op.execute("DROP TRIGGER IF EXISTS trg_vacation_used_no_overlap")
+
+    op.drop_index('ix_vacation_used_employee_workdays', table_name='vacation_used')
+    with op.batch_alter_table('vacation_used') as batch_op:
+        batch_op.drop_column('workday_end')
+        batch_op.drop_column('workday_start')
@@ -0,0 +1,56 @@
+"""cascade employee deletes
+
+Revision ID: 8e2d5c3f7a14
+Revises: 1c7e4b9a2f60
+Create Date: 2026-10-19 21:05:19.274416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from db.overlaps import SQLITE_TRIGGER_SQL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2d5c3f7a14'
+down_revision: Union[str, Sequence[str], None] = '1c7e4b9a2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables pointing at employees.id, all got Postgres' default <table>_employee_id_fkey name
+CHILD_TABLES = ['vacation_totals', 'vacation_used', 'vacation_monthly_usage']
+
+# SQLite foreign keys are unnamed, batch mode needs a name to find them
+SQLITE_NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s"}
+
+
+def _set_ondelete(ondelete):
+    if op.get_bind().dialect.name == 'postgresql':
+        # vacation_used is partitioned, the constraint on the parent covers every partition
+        for table in CHILD_TABLES:
+            op.drop_constraint(f'{table}_employee_id_fkey', table, type_='foreignkey')
+            op.create_foreign_key(f'{table}_employee_id_fkey', table, 'employees', ['employee_id'], ['id'], ondelete=ondelete)
+        return
+
+    # SQLite can't alter a constraint, batch mode copies each table
+    for table in CHILD_TABLES:
+        name = f'fk_{table}_employee_id'
+        with op.batch_alter_table(table, recreate='always', naming_convention=SQLITE_NAMING) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, 'employees', ['employee_id'], ['id'], ondelete=ondelete)
+
+    # The copy drops triggers, put the overlap check back (db/overlaps.py)
+    op.execute(SQLITE_TRIGGER_SQL)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _set_ondelete('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _set_ondelete(None)
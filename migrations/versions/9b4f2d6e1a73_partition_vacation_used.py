@@ -0,0 +1,96 @@
+"""partition vacation_used by start_date year
+
+Revision ID: 9b4f2d6e1a73
+Revises: c71e0b9d4a25
+Create Date: 2026-10-19 12:48:33.190254
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4f2d6e1a73'
+down_revision: Union[str, Sequence[str], None] = 'c71e0b9d4a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+YEARS_AHEAD = 2
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    if bind.dialect.name != "postgresql":
+        # SQLite: plain table, only the lookup index
+        op.create_index('ix_vacation_used_employee_start', 'vacation_used', ['employee_id', 'start_date'])
+        return
+
+    op.execute("ALTER TABLE vacation_used RENAME TO vacation_used_old")
+    op.execute("ALTER TABLE vacation_used_old RENAME CONSTRAINT vacation_used_pkey TO vacation_used_old_pkey")
+
+    # Partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE vacation_used (
+            id integer NOT NULL DEFAULT nextval('vacation_used_id_seq'),
+            start_date date NOT NULL,
+            end_date date NOT NULL,
+            days_used integer NOT NULL,
+            created_at timestamp without time zone,
+            employee_id integer NOT NULL REFERENCES employees (id),
+            CONSTRAINT vacation_used_pkey PRIMARY KEY (id, start_date)
+        ) PARTITION BY RANGE (start_date)
+    """)
+    op.execute("ALTER SEQUENCE vacation_used_id_seq OWNED BY vacation_used.id")
+    op.execute("CREATE INDEX ix_vacation_used_employee_start ON vacation_used (employee_id, start_date)")
+
+    # Catch-all for dates outside the yearly partitions
+    op.execute("CREATE TABLE vacation_used_default PARTITION OF vacation_used DEFAULT")
+
+    first_year = bind.execute(sa.text("SELECT EXTRACT(YEAR FROM MIN(start_date))::int FROM vacation_used_old")).scalar()
+    last_year = date.today().year + YEARS_AHEAD
+    for year in range(min(first_year or date.today().year, date.today().year), last_year + 1):
+        op.execute(
+            f"CREATE TABLE vacation_used_y{year} PARTITION OF vacation_used "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+
+    op.execute("""
+        INSERT INTO vacation_used (id, start_date, end_date, days_used, created_at, employee_id)
+        SELECT id, start_date, end_date, days_used, created_at, employee_id FROM vacation_used_old
+    """)
+    op.execute("DROP TABLE vacation_used_old")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+
+    if bind.dialect.name != "postgresql":
+        op.drop_index('ix_vacation_used_employee_start', table_name='vacation_used')
+        return
+
+    op.execute("ALTER TABLE vacation_used RENAME TO vacation_used_partitioned")
+    op.execute("ALTER TABLE vacation_used_partitioned RENAME CONSTRAINT vacation_used_pkey TO vacation_used_partitioned_pkey")
+    op.execute("""
+        CREATE TABLE vacation_used (
+            id integer NOT NULL DEFAULT nextval('vacation_used_id_seq'),
+            start_date date NOT NULL,
+            end_date date NOT NULL,
+            days_used integer NOT NULL,
+            created_at timestamp without time zone,
+            employee_id integer NOT NULL REFERENCES employees (id),
+            CONSTRAINT vacation_used_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("""
+        INSERT INTO vacation_used (id, start_date, end_date, days_used, created_at, employee_id)
+        SELECT id, start_date, end_date, days_used, created_at, employee_id FROM vacation_used_partitioned
+    """)
+    op.execute("ALTER SEQUENCE vacation_used_id_seq OWNED BY vacation_used.id")
+    op.execute("DROP TABLE vacation_used_partitioned CASCADE")
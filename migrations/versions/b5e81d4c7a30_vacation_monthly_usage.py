@@ -0,0 +1,78 @@
+"""vacation monthly usage
+
+Revision ID: b5e81d4c7a30
+Revises: 7f3c9e2d5b18
+Create Date: 2026-10-19 17:54:21.083612
+
+"""
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e81d4c7a30'
+down_revision: Union[str, Sequence[str], None] = '7f3c9e2d5b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows per round trip while reading vacation_used and per rollup INSERT
+FETCH_SIZE = 2000
+
+
+def _workdays_by_month(start_date, end_date):
+    months = defaultdict(int)
+    current = start_date
+    while current <= end_date:
+        if current.weekday() < 5:
+            months[current.replace(day=1)] += 1
+        current += timedelta(days=1)
+    return months
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table = op.create_table('vacation_monthly_usage',
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('workdays', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('employee_id', 'month')
+    )
+
+    # Backfill from existing vacations, streamed in employee order: one employee's months in memory at a time
+    bind = op.get_bind()
+    vacation_used = sa.table(
+        'vacation_used',
+        sa.column('employee_id', sa.Integer),
+        sa.column('start_date', sa.Date),
+        sa.column('end_date', sa.Date),
+    )
+    rows = bind.execute(
+        sa.select(vacation_used.c.employee_id, vacation_used.c.start_date, vacation_used.c.end_date)
+        .order_by(vacation_used.c.employee_id)
+        .execution_options(yield_per=FETCH_SIZE)
+    )
+
+    pending = []
+    for employee_id, vacations in groupby(rows, key=lambda row: row[0]):
+        months = defaultdict(int)
+        for _, start_date, end_date in vacations:
+            for month, workdays in _workdays_by_month(start_date, end_date).items():
+                months[month] += workdays
+        pending.extend({"employee_id": employee_id, "month": month, "workdays": workdays} for month, workdays in months.items())
+
+        if len(pending) >= FETCH_SIZE:
+            op.bulk_insert(table, pending)
+            pending = []
+    if pending:
+        op.bulk_insert(table, pending)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('vacation_monthly_usage')
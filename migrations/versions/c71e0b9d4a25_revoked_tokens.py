@@ -0,0 +1,32 @@
+"""revoked tokens
+
+Revision ID: c71e0b9d4a25
+Revises: 5e0d7a41c8b2
+Create Date: 2026-10-19 11:26:05.731942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71e0b9d4a25'
+down_revision: Union[str, Sequence[str], None] = '5e0d7a41c8b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('revoked_tokens',
+    sa.Column('jti', sa.String(length=36), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('jti')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('revoked_tokens')
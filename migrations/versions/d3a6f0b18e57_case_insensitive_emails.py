@@ -0,0 +1,35 @@
+"""case insensitive emails
+
+Revision ID: d3a6f0b18e57
+Revises: b5e81d4c7a30
+Create Date: 2026-10-19 18:02:37.514920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a6f0b18e57'
+down_revision: Union[str, Sequence[str], None] = 'b5e81d4c7a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Accounts that differ only in letter case have to be merged by hand first
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT lower(email) FROM employees GROUP BY lower(email) HAVING count(*) > 1"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"Emails used by more than one employee (ignoring case): {', '.join(sorted(duplicates))}")
+
+    op.create_index('ux_employees_email_lower', 'employees', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_employees_email_lower', table_name='employees')
@@ -0,0 +1,30 @@
+"""unique vacation total per year
+
+Revision ID: e2b7c5a09f14
+Revises: 4d8a1f6c3e92
+Create Date: 2026-10-19 15:11:48.902317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c5a09f14'
+down_revision: Union[str, Sequence[str], None] = '4d8a1f6c3e92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('vacation_totals') as batch_op:
+        batch_op.create_unique_constraint('uq_vacation_totals_employee_year', ['employee_id', 'year'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('vacation_totals') as batch_op:
+        batch_op.drop_constraint('uq_vacation_totals_employee_year', type_='unique')
@@ -0,0 +1,30 @@
+"""vacation total version
+
+Revision ID: f84c2a9d61e3
+Revises: d3a6f0b18e57
+Create Date: 2026-10-19 19:24:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f84c2a9d61e3'
+down_revision: Union[str, Sequence[str], None] = 'd3a6f0b18e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows start at version 1
+    op.add_column('vacation_totals', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('vacation_totals') as batch_op:
+        batch_op.drop_column('version')
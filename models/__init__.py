@@ -1,3 +1,9 @@
 from models.employee import Employee
 from models.vacation_total import VacationTotal
-from models.vacation_used import VacationUsed
\ No newline at end of file
+from models.vacation_used import VacationUsed
+from models.import_job import ImportJob
+from models.import_checkpoint import ImportCheckpoint
+from models.revoked_token import RevokedToken
+from models.rate_limit_bucket import RateLimitBucket
+from models.vacation_monthly_usage import VacationMonthlyUsage
+from models.idempotency_key import IdempotencyKey
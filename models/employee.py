@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index, func
 from sqlalchemy.orm import relationship
 from db import Base
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -12,9 +12,10 @@ class Employee(Base):
     password_hash = Column(String(255), nullable=False)
     is_admin = Column(Boolean, default=False, nullable=False)
 
-    # Relationships
-    vacation_totals = relationship("VacationTotal", back_populates="employee", cascade="all, delete")
-    vacation_used = relationship("VacationUsed", back_populates="employee", cascade="all, delete")
+    # Relationships, child rows are removed by ON DELETE CASCADE, not loaded and deleted one by one
+    vacation_totals = relationship("VacationTotal", back_populates="employee", cascade="all, delete", passive_deletes=True)
+    vacation_used = relationship("VacationUsed", back_populates="employee", cascade="all, delete", passive_deletes=True)
+    monthly_usage = relationship("VacationMonthlyUsage", back_populates="employee", cascade="all, delete", passive_deletes=True)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -24,3 +25,7 @@ class Employee(Base):
 
     def __repr__(self):
         return f"<Employee {self.email}>"
+
+
+# Emails are matched case-insensitively (utils/validators.normalize_email), one account per lower(email)
+Index("ux_employees_email_lower", func.lower(Employee.email), unique=True)
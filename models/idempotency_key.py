@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary
+from db import Base
+from datetime import datetime
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # sha256 of (user, method, path, Idempotency-Key header)
+    key = Column(String(64), primary_key=True)
+    # sha256 of the request itself, the same key can't be reused for a different request
+    request_hash = Column(String(64), nullable=False)
+
+    # NULL while the first request is still running
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    body = Column(LargeBinary, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.key} {self.status_code}>"
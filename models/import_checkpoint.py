@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from db import Base
+from datetime import datetime
+
+
+class ImportCheckpoint(Base):
+    __tablename__ = "import_checkpoints"
+    __table_args__ = (UniqueConstraint("kind", "file_hash", name="uq_import_checkpoints_kind_file_hash"),)
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(32), nullable=False)
+    file_hash = Column(String(64), nullable=False)
+
+    # Number of data rows already committed, and counters for them (JSON)
+    row_offset = Column(Integer, nullable=False, default=0)
+    report = Column(Text, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ImportCheckpoint {self.kind} {self.file_hash[:8]} @{self.row_offset}>"
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from db import Base
+from datetime import datetime
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    # Recovery looks for queued/running jobs with an old heartbeat
+    __table_args__ = (Index("ix_import_jobs_status_updated_at", "status", "updated_at"),)
+
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(32), nullable=False)
+    status = Column(String(16), nullable=False, default="queued")  # queued, running, succeeded, failed
+    rows_processed = Column(Integer, nullable=False, default=0)
+
+    # Final report (JSON) in the same shape as the synchronous endpoint response
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_by = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Heartbeat, bumped with every progress report. A running job that stops bumping it lost its worker.
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ImportJob {self.id} {self.kind} {self.status}>"
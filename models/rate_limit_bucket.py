@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Float
+from db import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(255), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # unix time, shared by all workers
+    updated_at = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<RateLimitBucket {self.key} tokens={self.tokens}>"
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime
+from db import Base
+from datetime import datetime
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(36), primary_key=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+    # The token's own exp, after that it's rejected anyway and the row can go
+    expires_at = Column(DateTime, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken {self.jti}>"
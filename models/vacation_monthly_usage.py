@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import relationship
+from db import Base
+from utils.workdays import workdays_by_month
+
+
+# Used workdays per employee and calendar month, kept in step with vacation_used
+class VacationMonthlyUsage(Base):
+    __tablename__ = "vacation_monthly_usage"
+
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True)
+    # first day of the month
+    month = Column(Date, primary_key=True)
+    workdays = Column(Integer, nullable=False, default=0)
+
+    employee = relationship("Employee", back_populates="monthly_usage")
+
+    def __repr__(self):
+        return f"<VacationMonthlyUsage {self.employee_id} {self.month:%Y-%m}: {self.workdays}>"
+
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+# Add a vacation's workdays to its months (upsert), on the caller's connection / transaction
+def add_monthly_usage(connection, employee_id, start_date, end_date):
+    table = VacationMonthlyUsage.__table__
+    insert = _INSERTS[connection.dialect.name]
+    for month, workdays in workdays_by_month(start_date, end_date).items():
+        statement = insert(table).values(employee_id=employee_id, month=month, workdays=workdays)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.employee_id, table.c.month],
+            set_={"workdays": table.c.workdays + statement.excluded.workdays},
+        ))
+
+
+# Take a deleted vacation's workdays back out (rows already gone with their employee are skipped)
+def remove_monthly_usage(connection, employee_id, start_date, end_date):
+    table = VacationMonthlyUsage.__table__
+    for month, workdays in workdays_by_month(start_date, end_date).items():
+        connection.execute(
+            update(table)
+            .where(table.c.employee_id == employee_id, table.c.month == month)
+            .values(workdays=table.c.workdays - workdays)
+        )
@@ -1,18 +1,23 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from db import Base
 
 
 class VacationTotal(Base):
     __tablename__ = "vacation_totals"
+    __table_args__ = (UniqueConstraint("employee_id", "year", name="uq_vacation_totals_employee_year"),)
 
     id = Column(Integer, primary_key=True)
     year = Column(Integer, nullable=False)
     total_days = Column(Integer, nullable=False)
     total_days_left = Column(Integer, nullable=False)
+    # Bumped on every UPDATE, concurrent writers retry instead of overwriting each other (db/optimistic.py)
+    version = Column(Integer, nullable=False, server_default="1")
 
-    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
     employee = relationship("Employee", back_populates="vacation_totals")
 
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<VacationTotal {self.employee_id} {self.year}: {self.total_days}>"
@@ -1,21 +1,62 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, Index, DDL, event
 from sqlalchemy.orm import relationship
 from db import Base
+from db.overlaps import EXCLUSION_SQL, SQLITE_TRIGGER_SQL
 from datetime import datetime
+from models.vacation_monthly_usage import add_monthly_usage, remove_monthly_usage
+from utils.workdays import workday_bounds
+
+
+# Column defaults, so ORM objects and plain Table.insert() rows both get the workday range
+def _workday_start(context):
+    params = context.get_current_parameters()
+    return workday_bounds(params["start_date"], params["end_date"])[0]
+
+
+def _workday_end(context):
+    params = context.get_current_parameters()
+    return workday_bounds(params["start_date"], params["end_date"])[1]
 
 
 class VacationUsed(Base):
     __tablename__ = "vacation_used"
+    # On Postgres the table is partitioned by start_date year (db/partitions.py)
+    __table_args__ = (
+        Index("ix_vacation_used_employee_start", "employee_id", "start_date"),
+        Index("ix_vacation_used_employee_workdays", "employee_id", "workday_end"),
+    )
 
     id = Column(Integer, primary_key=True)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
     days_used = Column(Integer, nullable=False)
 
+    # First / last weekday of the booking, NULL if it only covers a weekend (db/overlaps.py)
+    workday_start = Column(Date, nullable=True, default=_workday_start)
+    workday_end = Column(Date, nullable=True, default=_workday_end)
+
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
     employee = relationship("Employee", back_populates="vacation_used")
 
     def __repr__(self):
         return f"<VacationUsed {self.employee_id} {self.days_used} days>"
+
+
+# Tables made by create_all() (tests, fresh local DBs) get the same overlap protection as the migration
+event.listen(VacationUsed.__table__, "after_create", DDL(SQLITE_TRIGGER_SQL).execute_if(dialect="sqlite"))
+event.listen(VacationUsed.__table__, "after_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"))
+event.listen(VacationUsed.__table__, "after_create", DDL(EXCLUSION_SQL.format(table="vacation_used")).execute_if(dialect="postgresql"))
+
+
+# Monthly rollup follows every ORM insert/delete in the same transaction.
+# Bulk Table.insert() / Query.delete() skip these, run rebuild_monthly_usage() after them.
+@event.listens_for(VacationUsed, "after_insert")
+def _add_to_monthly_usage(mapper, connection, target):
+    add_monthly_usage(connection, target.employee_id, target.start_date, target.end_date)
+
+
+@event.listens_for(VacationUsed, "after_delete")
+def _remove_from_monthly_usage(mapper, connection, target):
+    remove_monthly_usage(connection, target.employee_id, target.start_date, target.end_date)
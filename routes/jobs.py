@@ -0,0 +1,12 @@
+from flask import Blueprint
+from utils.auth import requires_admin
+from services import jobs_service
+
+jobs_bp = Blueprint("jobs", __name__)
+
+
+# Show background import job status and report
+@jobs_bp.get("/<job_id>", endpoint="get_job")
+@requires_admin
+def get_job(job_id):
+    return jobs_service.get_job(job_id)
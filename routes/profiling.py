@@ -0,0 +1,33 @@
+from flask import Blueprint
+from utils.auth import requires_admin
+from services import profiling_service
+
+profiling_bp = Blueprint("profiling", __name__)
+
+
+# Show sampling settings
+@profiling_bp.get("/", endpoint="get_profiling")
+@requires_admin
+def get_settings():
+    return profiling_service.get_settings()
+
+
+# Turn sampling on/off, narrow it to a path, keep only slow requests
+@profiling_bp.put("/", endpoint="update_profiling")
+@requires_admin
+def update_settings():
+    return profiling_service.update_settings()
+
+
+# Back to environment defaults
+@profiling_bp.delete("/", endpoint="reset_profiling")
+@requires_admin
+def reset_settings():
+    return profiling_service.reset_settings()
+
+
+# List written profiles
+@profiling_bp.get("/files", endpoint="list_profiles")
+@requires_admin
+def get_profiles():
+    return profiling_service.get_profiles()
@@ -19,6 +19,13 @@ def create_vacation_total():
 def update_vacation_total():
     return vacations_service.update_vacation_total()
 
+
+# Create totals for a new year for all employees
+@vacations_bp.post("/rollover")
+@requires_admin
+def rollover_year():
+    return vacations_service.rollover_year()
+
   
 # Add vacation
 @vacations_bp.post("/vacation-used")
@@ -27,6 +34,21 @@ def add_vacation_used():
     return vacations_service.add_vacation_used()
 
 
+# Export all used vacations (CSV or NDJSON stream)
+@vacations_bp.get("/export")
+@requires_admin
+def export_vacations():
+    return vacations_service.export_vacations()
+
+
+# Used days in a period for many employees
+# /vacations/used?from=YYYY-MM-DD&to=YYYY-MM-DD&user_ids=1,2,3
+@vacations_bp.get("/used")
+@requires_admin
+def get_used_in_period_for_users():
+    return vacations_service.get_used_in_period_for_users()
+
+
 # View vacation total, used, and left days per year
 @vacations_bp.get("/<int:user_id>")
 @requires_auth
@@ -41,6 +63,14 @@ def get_vacation_year(user_id, year):
     return vacations_service.get_vacation_year(user_id, year)
 
 
+# Year details for a range of years
+# /vacations/<user_id>/years?from_year=YYYY&to_year=YYYY
+@vacations_bp.get("/<int:user_id>/years")
+@requires_auth
+def get_vacation_years(user_id):
+    return vacations_service.get_vacation_years(user_id)
+
+
 # Search used vacation days from-to specific date
 # /vacations/<user_id>/used?from=YYYY-MM-DD&to=YYYY-MM-DD
 @vacations_bp.get("/<int:user_id>/used")
@@ -0,0 +1,208 @@
+from collections import namedtuple
+from datetime import date
+from itertools import groupby
+
+from db import SessionLocal
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services.rollup_service import rebuild_monthly_usage
+from utils.serializers import VACATION_TOTAL_COLUMNS, VACATION_USED_COLUMNS, vacation_used_row
+from utils.vacation_archive import VacationArchive
+from utils.workdays import calculate_workdays, workday_bounds
+
+
+# Rows fetched per round trip while streaming a year out of the database
+ARCHIVE_FETCH_SIZE = 1000
+# Ids per DELETE ... WHERE id IN (...) after the archive is written
+DELETE_CHUNK = 500
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+# Same attributes as the (start_date, end_date) row find_overlap returns from vacation_used
+ArchivedVacation = namedtuple("ArchivedVacation", ["start_date", "end_date"])
+
+
+def is_archived(year):
+    return VacationArchive().is_archived(year)
+
+
+def archived_years():
+    return VacationArchive().years()
+
+
+# Move totals and used vacations of a closed year into the archive, then delete them
+def archive_year(year, today=None, archive=None):
+    today = today or date.today()
+    if year >= today.year:
+        raise ArchiveError(f"Year {year} is not closed yet")
+
+    archive = archive or VacationArchive()
+    first_day, last_day = date(year, 1, 1), date(year, 12, 31)
+
+    with SessionLocal() as session:
+        if archive.has_pending(year):
+            _resume_pending(session, year, archive)
+
+        # Stored as (year, total_days, total_days_left), same tuple vacation_total_row() reads
+        totals = {
+            row[0]: list(row[1:])
+            for row in session.query(VacationTotal.employee_id, *VACATION_TOTAL_COLUMNS).filter(VacationTotal.year == year)
+        }
+        total_count = len(totals)
+
+        # Vacations belong to the year they start in, same rule as the totals they were taken from
+        vacations = (
+            session.query(VacationUsed.employee_id, *VACATION_USED_COLUMNS)
+            .filter(VacationUsed.start_date >= first_day, VacationUsed.start_date <= last_day)
+            .order_by(VacationUsed.employee_id, VacationUsed.start_date)
+            .execution_options(stream_results=True)
+            .yield_per(ARCHIVE_FETCH_SIZE)
+        )
+
+        archived_ids = []
+        archived_employees = []
+
+        def blocks():
+            for employee_id, rows in groupby(vacations, key=lambda row: row[0]):
+                serialized = [vacation_used_row(row[1:]) for row in rows]
+                archived_ids.extend(vacation["id"] for vacation in serialized)
+                archived_employees.append(employee_id)
+                yield employee_id, {"total": totals.pop(employee_id, None), "vacations": serialized}
+
+            # Employees with a total but no vacations that year
+            for employee_id, total in totals.items():
+                yield employee_id, {"total": total, "vacations": []}
+
+        # Staged only: if the delete below fails the rows stay in the database alone, never in both
+        employees = archive.stage(year, blocks())
+
+        try:
+            for i in range(0, len(archived_ids), DELETE_CHUNK):
+                chunk = archived_ids[i:i + DELETE_CHUNK]
+                session.query(VacationUsed).filter(VacationUsed.id.in_(chunk)).delete(synchronize_session=False)
+            session.query(VacationTotal).filter(VacationTotal.year == year).delete(synchronize_session=False)
+            # Bulk delete skips the rollup listeners, archived days are counted from the archive now
+            for i in range(0, len(archived_employees), DELETE_CHUNK):
+                rebuild_monthly_usage(session, archived_employees[i:i + DELETE_CHUNK])
+            session.commit()
+        except Exception:
+            archive.discard(year)
+            raise
+
+    archive.publish(year)
+    return {
+        "year": year,
+        "employees": employees,
+        "totals": total_count,
+        "vacations": len(archived_ids),
+    }
+
+
+# A previous run stopped between staging and publishing. Rows still in the database mean
+# its delete was rolled back, so the staged index is dropped; otherwise it committed and is published.
+def _resume_pending(session, year, archive):
+    first_day, last_day = date(year, 1, 1), date(year, 12, 31)
+    has_rows = (
+        session.query(VacationTotal.id).filter(VacationTotal.year == year).first() is not None
+        or session.query(VacationUsed.id)
+        .filter(VacationUsed.start_date >= first_day, VacationUsed.start_date <= last_day)
+        .first() is not None
+    )
+    if has_rows:
+        archive.discard(year)
+    else:
+        archive.publish(year)
+
+
+# Archived (year, total_days, total_days_left) rows of one employee
+def archived_totals(employee_id):
+    archive = VacationArchive()
+    rows = []
+    for year in archive.years():
+        block = archive.read(year, employee_id)
+        if block and block["total"]:
+            rows.append(block["total"])
+    return rows
+
+
+# {employee_id: total_days_left} of one archived year, what rollover carries over
+def archived_days_left(year):
+    return {
+        employee_id: block["total"][2]
+        for employee_id, block in VacationArchive().iter_year(year)
+        if block and block["total"]
+    }
+
+
+# {"total": ..., "vacations": [...]} for one archived year, None when the employee had nothing
+def archived_year(employee_id, year):
+    return VacationArchive().read(year, employee_id)
+
+
+def _archived_years_in_period(archive, start_date, end_date):
+    # A vacation can run into the next year, but never starts after end_date
+    return [year for year in archive.years() if start_date.year - 1 <= year <= end_date.year]
+
+
+def _block_days_in_period(block, start_date, end_date):
+    total_used = 0
+    for vacation in block["vacations"]:
+        vacation_start = date.fromisoformat(vacation["start_date"])
+        vacation_end = date.fromisoformat(vacation["end_date"])
+        if vacation_end < start_date or vacation_start > end_date:
+            continue
+        total_used += calculate_workdays(max(vacation_start, start_date), min(vacation_end, end_date))
+    return total_used
+
+
+# Workdays used between start_date and end_date, counted from archived years only
+def archived_days_in_period(employee_id, start_date, end_date):
+    archive = VacationArchive()
+    total_used = 0
+
+    for year in _archived_years_in_period(archive, start_date, end_date):
+        block = archive.read(year, employee_id)
+        if block:
+            total_used += _block_days_in_period(block, start_date, end_date)
+
+    return total_used
+
+
+# Same for many employees (None = everyone), each archived year is read once: {employee_id: workdays}
+def archived_days_by_employee(start_date, end_date, employee_ids=None):
+    archive = VacationArchive()
+    wanted = set(employee_ids) if employee_ids is not None else None
+    totals = {}
+
+    for year in _archived_years_in_period(archive, start_date, end_date):
+        for employee_id, block in archive.iter_year(year):
+            if wanted is not None and employee_id not in wanted:
+                continue
+            days = _block_days_in_period(block, start_date, end_date)
+            if days:
+                totals[employee_id] = totals.get(employee_id, 0) + days
+
+    return totals
+
+
+# Archived vacation sharing a workday with start..end. Archived rows are gone from vacation_used
+# (and its overlap constraint), but a booking in early January can still run into late December.
+def archived_overlap(employee_id, start_date, end_date):
+    first, last = workday_bounds(start_date, end_date)
+    if first is None:
+        return None
+
+    archive = VacationArchive()
+    # Called for every booking and import row: a stat per candidate year, no directory listing
+    for year in range(start_date.year - 1, end_date.year + 1):
+        block = archive.read(year, employee_id) if archive.is_archived(year) else None
+        for vacation in block["vacations"] if block else []:
+            vacation_start = date.fromisoformat(vacation["start_date"])
+            vacation_end = date.fromisoformat(vacation["end_date"])
+            vacation_first, vacation_last = workday_bounds(vacation_start, vacation_end)
+            if vacation_first is not None and vacation_first <= last and vacation_last >= first:
+                return ArchivedVacation(vacation_start, vacation_end)
+    return None
@@ -1,20 +1,18 @@
-import csv
-from io import TextIOWrapper
 from flask import request, jsonify
 from flask_jwt_extended import create_access_token, get_jwt
 from werkzeug.security import check_password_hash, generate_password_hash
 
+from sqlalchemy.exc import IntegrityError
+
 from db import SessionLocal
 from models.employee import Employee
+from services import import_service, jobs_service
+from utils.email_directory import find_employee
+from utils.rate_limit import MAX_EMAIL_LENGTH, get_login_limiter, retry_after_header
 from utils.token_blacklist import blacklist
+from utils.upload_streams import UnsupportedUploadError
+from utils.validators import is_valid_email
 from datetime import timedelta
-import re
-
-
-# Check is email
-def is_valid_email(email: str) -> bool:
-    pattern = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
-    return bool(re.match(pattern, email))
 
 
 # Initialize first Admin User if db is empty
@@ -50,13 +48,31 @@ def initialize_admin():
 # Login
 def login():
     data = request.json
-    email = data.get("email")
-    password = data.get("password")
+    email = data.get("email") if isinstance(data, dict) else None
+    password = data.get("password") if isinstance(data, dict) else None
+
+    # Only strings that can be an account's email reach the limiter (its keys are bounded) and the hash check
+    if not isinstance(email, str) or not isinstance(password, str) or len(email) > MAX_EMAIL_LENGTH:
+        return jsonify({"error": "Invalid credentials"}), 401
+
+    # Password hashing is slow on purpose, refuse early instead of queueing behind it
+    limiter = get_login_limiter()
+    retry_after = limiter.check(request.remote_addr, email)
+    if retry_after:
+        return jsonify({"error": "Too many login attempts, try again later"}), 429, retry_after_header(retry_after)
 
     with SessionLocal() as session:
-        user = session.query(Employee).filter_by(email=email).first()
+        user = find_employee(session, email)
+
+        if not user:
+            return jsonify({"error": "Invalid credentials"}), 401
 
-        if not user or not check_password_hash(user.password_hash, password):
+        with limiter.hash_slot() as acquired:
+            if not acquired:
+                return jsonify({"error": "Server busy, try again later"}), 429, retry_after_header(1)
+            password_ok = check_password_hash(user.password_hash, password)
+
+        if not password_ok:
             return jsonify({"error": "Invalid credentials"}), 401
 
         token = create_access_token(
@@ -73,51 +89,14 @@ def register_user():
 
     # CSV UPLOAD MODE
     if file:
-        # Check file in text mode
-        wrapped_file = TextIOWrapper(file, encoding='utf-8')
-        reader = csv.DictReader(wrapped_file)
-
-        created_count = 0
-        skipped_duplicates = 0
-
-        with SessionLocal() as session:
-            for row in reader:
-                email = row.get("Employee Email")
-                password = row.get("Employee Password")
-                is_admin_raw = row.get("is_admin", "false").strip().lower()
+        # Big files -> run in background worker, return job id
+        if jobs_service.wants_async(request):
+            return jobs_service.enqueue_import("users", file)
 
-                # Convert in boolean
-                is_admin = is_admin_raw in ["true", "1", "yes"]
-
-                if not email or not password:
-                    # Skip, not valid
-                    continue
-
-                if not is_valid_email(str(email)):
-                    # Skip, not valid
-                    continue
-
-                existing = session.query(Employee).filter_by(email=email).first()
-                if existing:
-                    skipped_duplicates += 1
-                    continue
-
-                user = Employee(
-                    email=email,
-                    password_hash=generate_password_hash(password),
-                    is_admin=is_admin
-                )
-
-                session.add(user)
-                created_count += 1
-
-            session.commit()
-
-        return jsonify({
-            "message": "Bulk import completed",
-            "created": created_count,
-            "duplicates_skipped": skipped_duplicates
-        }), 201
+        try:
+            return jsonify(import_service.import_users(file.stream)), 201
+        except UnsupportedUploadError as e:
+            return jsonify({"error": str(e)}), 400
 
     # SINGLE USER JSON MODE
 
@@ -130,9 +109,8 @@ def register_user():
         return jsonify({"error": "Invalid email format"}), 400
     
     with SessionLocal() as session:
-        # check if email exist
-        existing = session.query(Employee).filter_by(email=data["email"]).first()
-        if existing:
+        # check if email exist, in any letter case
+        if find_employee(session, data["email"]):
             return jsonify({"error": "User with this email already exists"}), 409
 
         user = Employee(
@@ -142,7 +120,12 @@ def register_user():
         )
 
         session.add(user)
-        session.commit()
+        try:
+            session.commit()
+        except IntegrityError:
+            # Registered by a concurrent request in the meantime (ux_employees_email_lower)
+            session.rollback()
+            return jsonify({"error": "User with this email already exists"}), 409
 
         return jsonify({
             "id": user.id,
@@ -152,6 +135,6 @@ def register_user():
 
 # Logout
 def logout():
-    jti = get_jwt()["jti"]
-    blacklist.add(jti)
+    claims = get_jwt()
+    blacklist.add(claims["jti"], claims.get("exp"))
     return jsonify({"msg": "Successfully logged out"}), 200
\ No newline at end of file
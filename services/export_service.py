@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+from datetime import date
+from itertools import islice
+
+from db import SessionLocal
+from models.employee import Employee
+from models.vacation_used import VacationUsed
+from utils.email_directory import RESOLVE_CHUNK
+from utils.vacation_archive import VacationArchive
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_FETCH_SIZE = 2000
+# Output is yielded in chunks of about this many bytes
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Same header as the vacation-used CSV import, so an export can be imported again
+CSV_HEADER = ["Employee", "Vacation start date", "Vacation end date", "Days used"]
+
+
+# (email, start_date, end_date, days_used) for every used vacation, archived years included
+def iter_vacations(year=None, employee_id=None):
+    archive = VacationArchive()
+
+    with SessionLocal() as session:
+        archived_years = [y for y in archive.years() if year is None or y == year]
+        for archived in archived_years:
+            yield from _iter_archived(session, archive, archived, employee_id)
+
+        query = (
+            session.query(Employee.email, VacationUsed.start_date, VacationUsed.end_date, VacationUsed.days_used)
+            .join(Employee, Employee.id == VacationUsed.employee_id)
+        )
+        if year is not None:
+            query = query.filter(VacationUsed.start_date >= date(year, 1, 1), VacationUsed.start_date <= date(year, 12, 31))
+        if employee_id is not None:
+            query = query.filter(VacationUsed.employee_id == employee_id)
+
+        query = (
+            query.order_by(VacationUsed.employee_id, VacationUsed.start_date)
+            .execution_options(stream_results=True)
+            .yield_per(EXPORT_FETCH_SIZE)
+        )
+        for email, start_date, end_date, days_used in query:
+            yield email, start_date.isoformat(), end_date.isoformat(), days_used
+
+
+# Emails of archived employees are looked up RESOLVE_CHUNK blocks at a time, one IN query each
+def _iter_archived(session, archive, year, employee_id):
+    if employee_id is not None:
+        blocks = iter([(employee_id, archive.read(year, employee_id))])
+    else:
+        blocks = archive.iter_year(year)
+
+    while True:
+        chunk = list(islice(blocks, RESOLVE_CHUNK))
+        if not chunk:
+            return
+        emails = dict(
+            session.query(Employee.id, Employee.email).filter(Employee.id.in_([archived_id for archived_id, _ in chunk]))
+        )
+        for archived_id, block in chunk:
+            for vacation in (block or {}).get("vacations", []):
+                yield emails.get(archived_id), vacation["start_date"], vacation["end_date"], vacation["days_used"]
+
+
+def _chunked(lines):
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _csv_lines(rows):
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    writer.writerow(CSV_HEADER)
+    yield out.getvalue()
+
+    for row in rows:
+        out.seek(0)
+        out.truncate()
+        writer.writerow(row)
+        yield out.getvalue()
+
+
+def _ndjson_lines(rows):
+    for email, start_date, end_date, days_used in rows:
+        yield json.dumps({
+            "email": email,
+            "start_date": start_date,
+            "end_date": end_date,
+            "days_used": days_used,
+        }) + "\n"
+
+
+# Generator of text chunks in the given format, nothing is held in memory besides one chunk
+def export_vacations(export_format="csv", year=None, employee_id=None):
+    rows = iter_vacations(year=year, employee_id=employee_id)
+    lines = _csv_lines(rows) if export_format == "csv" else _ndjson_lines(rows)
+    return _chunked(lines)
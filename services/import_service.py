@@ -0,0 +1,379 @@
+import copy
+import csv
+import hashlib
+import json
+import os
+from datetime import datetime
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm.exc import StaleDataError
+from werkzeug.security import generate_password_hash
+
+from db import SessionLocal
+from db.optimistic import retry_on_stale
+from db.overlaps import is_deadlock, is_overlap_violation, lock_employees
+from models.employee import Employee
+from models.import_checkpoint import ImportCheckpoint
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services.archive_service import is_archived
+from services.overlap_service import find_overlap
+from utils.csv_decoding import iter_batches, decode_user_rows, decode_total_rows, decode_used_rows, date_decoder_for
+from utils.upload_streams import open_upload, ndjson_records, rows_from_records, user_rows_from_records
+from utils.email_directory import resolve_emails
+from utils.validators import is_valid_email, normalize_email
+from utils.workdays import calculate_workdays
+
+
+# How often (in rows) progress is reported back to the caller
+PROGRESS_EVERY = 100
+
+# Used vacations import gave up on a chunk after STALE_RETRY_ATTEMPTS retries
+STALE_TOTAL_ERROR = "Vacation totals were changed by other requests during the import, upload the same file again to continue"
+
+
+def get_chunk_size():
+    return int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+
+
+def _report_progress(progress, processed, force=False):
+    if progress and (force or processed % PROGRESS_EVERY == 0):
+        progress(processed)
+
+
+# sha256 of the whole upload, used as checkpoint key (stream is rewound)
+def file_hash(stream):
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(1024 * 1024), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+# Restore counters from a previous interrupted run of the same file
+def _resume(session, kind, digest, report):
+    checkpoint = session.query(ImportCheckpoint).filter_by(kind=kind, file_hash=digest).first()
+    if not checkpoint:
+        return 0
+
+    report.update(json.loads(checkpoint.report))
+    return checkpoint.row_offset
+
+
+# Commit rows so far together with the checkpoint, then empty identity map
+def _commit_chunk(session, kind, digest, row_offset, report):
+    checkpoint = session.query(ImportCheckpoint).filter_by(kind=kind, file_hash=digest).first()
+    if not checkpoint:
+        checkpoint = ImportCheckpoint(kind=kind, file_hash=digest)
+        session.add(checkpoint)
+
+    checkpoint.row_offset = row_offset
+    checkpoint.report = json.dumps(report)
+    checkpoint.updated_at = datetime.utcnow()
+
+    session.commit()
+    session.expunge_all()
+
+
+# Last commit, file is done so checkpoint is not needed anymore
+def _finish(session, kind, digest):
+    session.query(ImportCheckpoint).filter_by(kind=kind, file_hash=digest).delete()
+    session.commit()
+    session.expunge_all()
+
+
+# Bulk create users from CSV (Employee Email, Employee Password, is_admin)
+def import_users(stream, progress=None, chunk_size=None):
+    chunk_size = chunk_size or get_chunk_size()
+    digest = file_hash(stream)
+
+    upload_format, lines = open_upload(stream)
+    if upload_format == "ndjson":
+        reader = user_rows_from_records(ndjson_records(lines))
+    else:
+        reader = csv.DictReader(lines)
+
+    report = {
+        "message": "Bulk import completed",
+        "created": 0,
+        "duplicates_skipped": 0
+    }
+    processed = 0
+    # Emails added earlier in this file, not committed yet
+    created = set()
+
+    with SessionLocal() as session:
+        row_offset = _resume(session, "users", digest, report)
+
+        for batch in iter_batches(reader):
+            # Whole batch already committed by an earlier run
+            if processed + len(batch) <= row_offset:
+                processed += len(batch)
+                continue
+
+            # Whole batch resolved up front, one query for all its emails
+            decoded_rows = decode_user_rows(batch)
+            known = resolve_emails(session, [row[0] for row in decoded_rows if row])
+
+            for decoded in decoded_rows:
+                if processed > row_offset and processed % chunk_size == 0:
+                    _commit_chunk(session, "users", digest, processed, report)
+
+                processed += 1
+                if processed <= row_offset:
+                    continue
+                _report_progress(progress, processed)
+
+                if decoded is None:
+                    # Skip, not valid
+                    continue
+                email, password, is_admin = decoded
+
+                if not is_valid_email(str(email)):
+                    # Skip, not valid
+                    continue
+
+                key = normalize_email(email)
+                if key in known or key in created:
+                    report["duplicates_skipped"] += 1
+                    continue
+                created.add(key)
+
+                user = Employee(
+                    email=email,
+                    password_hash=generate_password_hash(password),
+                    is_admin=is_admin
+                )
+
+                session.add(user)
+                report["created"] += 1
+
+        _finish(session, "users", digest)
+
+    _report_progress(progress, processed, force=True)
+
+    return report
+
+
+# Bulk create vacation totals from CSV (first row year, second row header)
+def import_vacation_totals(stream, progress=None, chunk_size=None):
+    chunk_size = chunk_size or get_chunk_size()
+    digest = file_hash(stream)
+
+    upload_format, lines = open_upload(stream)
+    if upload_format == "ndjson":
+        # First record -> {"year": 2019}, then {"email": ..., "total_days": ...}
+        records = ndjson_records(lines)
+        year = int(next(records)["year"])
+        reader = rows_from_records(records, ["email", "total_days"])
+    else:
+        reader = csv.reader(lines)
+
+        # First row -> take year
+        first_row = next(reader)
+        year = int(first_row[1])
+
+        # Second row -> name of colons (Employee,Total vacation days)
+        next(reader)  # skip
+
+    report = {
+        "year": year,
+        "created": 0,
+        "skipped_not_found": [],
+        "skipped_existing": []
+    }
+    processed = 0
+
+    # Archived (closed) year can't get new totals, they would be hidden behind the archive
+    archived = is_archived(year)
+
+    with SessionLocal() as session:
+        row_offset = _resume(session, "vacation_totals", digest, report)
+
+        for batch in iter_batches(reader):
+            # Whole batch already committed by an earlier run
+            if processed + len(batch) <= row_offset:
+                processed += len(batch)
+                continue
+
+            decoded_rows = decode_total_rows(batch)
+            known = resolve_emails(session, [row[0] for row in decoded_rows if row])
+
+            for decoded in decoded_rows:
+                if processed > row_offset and processed % chunk_size == 0:
+                    _commit_chunk(session, "vacation_totals", digest, processed, report)
+
+                processed += 1
+                if processed <= row_offset:
+                    continue
+                _report_progress(progress, processed)
+
+                if decoded is None:
+                    continue
+                email, total_days = decoded
+
+                user_id = known.get(normalize_email(email))
+                if not user_id:
+                    report["skipped_not_found"].append(email)
+                    continue
+
+                existing = archived or session.query(VacationTotal).filter_by(employee_id=user_id, year=year).first()
+                if existing:
+                    report["skipped_existing"].append(email)
+                    continue
+
+                vt = VacationTotal(
+                    employee_id=user_id,
+                    year=year,
+                    total_days=total_days,
+                    total_days_left=total_days
+                )
+                session.add(vt)
+                report["created"] += 1
+
+        _finish(session, "vacation_totals", digest)
+
+    _report_progress(progress, processed, force=True)
+
+    return report
+
+
+# Bulk add used vacations from CSV (Employee, start date, end date)
+def import_vacation_used(stream, progress=None, chunk_size=None):
+    chunk_size = chunk_size or get_chunk_size()
+    digest = file_hash(stream)
+
+    upload_format, lines = open_upload(stream)
+    if upload_format == "ndjson":
+        # One {"email": ..., "start_date": ..., "end_date": ...} per line
+        reader = rows_from_records(ndjson_records(lines), ["email", "start_date", "end_date"])
+    else:
+        reader = csv.reader(lines)
+        next(reader)  # skip
+
+    report = {
+        "created": 0,
+        "skipped_not_found": [],
+        "skipped_no_total_for_year": [],
+        "skipped_overlap": [],
+        "skipped_not_enough_days": []
+    }
+    processed = 0
+    # Rows of the chunk that is not committed yet, booked when the chunk is written
+    pending = []
+
+    with SessionLocal() as session:
+        row_offset = _resume(session, "vacation_used", digest, report)
+
+        date_decoder = None
+
+        for batch in iter_batches(reader):
+            # Whole batch already committed by an earlier run
+            if processed + len(batch) <= row_offset:
+                processed += len(batch)
+                continue
+
+            # Date format is guessed once per file, from the first batch
+            if date_decoder is None:
+                date_decoder = date_decoder_for(batch)
+
+            decoded_rows = decode_used_rows(batch, date_decoder)
+            known = resolve_emails(session, [row[0] for row in decoded_rows if row])
+
+            for decoded in decoded_rows:
+                if processed > row_offset and processed % chunk_size == 0:
+                    _write_used_chunk(session, digest, processed, report, pending)
+                    pending = []
+
+                processed += 1
+                if processed <= row_offset:
+                    continue
+                _report_progress(progress, processed)
+
+                if decoded is None:
+                    continue
+                email, start_date, end_date = decoded
+
+                if end_date < start_date:
+                    continue
+
+                user_id = known.get(normalize_email(email))
+                if not user_id:
+                    report["skipped_not_found"].append(email)
+                    continue
+
+                pending.append((email, start_date, end_date, user_id))
+
+        _write_used_chunk(session, digest, processed, report, pending, last=True)
+
+    _report_progress(progress, processed, force=True)
+
+    return report
+
+
+# Book one chunk and commit it. A total changed by someone else meanwhile (StaleDataError, see
+# db/optimistic.py) rolls the chunk back to the last checkpoint and books it again from there.
+# So does a booking that slipped in past the overlap check or a deadlock, the replay then
+# sees the other booking and reports the row as skipped_overlap.
+def _write_used_chunk(session, digest, row_offset, report, rows, last=False):
+    def attempt():
+        chunk_report = copy.deepcopy(report)
+        try:
+            # Held until the chunk commits, taken up front in id order
+            lock_employees(session, [row[3] for row in rows])
+            for row in rows:
+                _book_used_row(session, chunk_report, *row)
+            if last:
+                _finish(session, "vacation_used", digest)
+            else:
+                _commit_chunk(session, "vacation_used", digest, row_offset, chunk_report)
+        except StaleDataError:
+            session.rollback()
+            session.expunge_all()
+            raise
+        except DBAPIError as e:
+            session.rollback()
+            session.expunge_all()
+            if not (is_overlap_violation(e) or is_deadlock(e)):
+                raise
+            raise StaleDataError(str(e.orig)) from e
+        return chunk_report
+
+    report.update(retry_on_stale(attempt))
+
+
+def _book_used_row(session, report, email, start_date, end_date, user_id):
+    year = start_date.year
+    vacation_total = session.query(VacationTotal).filter_by(employee_id=user_id, year=year).first()
+    if not vacation_total:
+        report["skipped_no_total_for_year"].append(email)
+        return
+
+    # check overlap, one indexed lookup
+    if find_overlap(session, user_id, start_date, end_date):
+        report["skipped_overlap"].append(email)
+        return
+
+    days_used = calculate_workdays(start_date, end_date)
+
+    if vacation_total.total_days_left < days_used:
+        report["skipped_not_enough_days"].append(email)
+        return
+
+    new_entry = VacationUsed(
+        start_date=start_date,
+        end_date=end_date,
+        days_used=days_used,
+        employee_id=user_id
+    )
+    session.add(new_entry)
+    # Flush now so later rows of the same file see this one in the overlap check
+    session.flush()
+    vacation_total.total_days_left -= days_used
+    report["created"] += 1
+
+
+IMPORTERS = {
+    "users": import_users,
+    "vacation_totals": import_vacation_totals,
+    "vacation_used": import_vacation_used,
+}
@@ -0,0 +1,281 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func
+from sqlalchemy.orm.exc import StaleDataError
+
+from db import SessionLocal
+from models.import_job import ImportJob
+from services import import_service
+
+
+_executor = None
+_recovery_thread = None
+
+logger = logging.getLogger(__name__)
+
+# Jobs in these states still need a worker
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def get_upload_dir():
+    return os.getenv("IMPORT_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "vacation_imports"))
+
+
+def get_max_workers():
+    return int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+
+
+# "thread": jobs run on a pool inside the web worker, "worker": a separate `flask run-import-jobs` process takes them
+def get_runner():
+    return os.getenv("IMPORT_JOB_RUNNER", "thread").strip().lower()
+
+
+# No heartbeat for this long -> the process running the job is gone
+def get_stale_seconds():
+    return int(os.getenv("IMPORT_JOB_STALE_SECONDS", "300"))
+
+
+def upload_path(job_id):
+    return os.path.join(get_upload_dir(), f"{job_id}.upload")
+
+
+# Local worker pool, created on first use
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=get_max_workers(), thread_name_prefix="import-job")
+    return _executor
+
+
+def submit_job(job_id, kind, path):
+    get_executor().submit(run_job, job_id, kind, path)
+
+
+# What create_app() puts in IMPORT_JOB_STARTER: hand new jobs to the local pool,
+# or nothing when a separate `flask run-import-jobs` process claims them from the table
+def default_job_starter():
+    return None if get_runner() == "worker" else submit_job
+
+
+# Threads don't survive fork, worker builds its own pool on first use
+def reset_after_fork():
+    global _executor, _recovery_thread
+    _executor = None
+    _recovery_thread = None
+
+
+# Check if client asked for upload-and-enqueue mode (?async=true or form field)
+def wants_async(request):
+    return str(request.values.get("async", "")).strip().lower() in ["true", "1", "yes"]
+
+
+# Save upload to disk, create job row and hand it to the worker pool
+def enqueue_import(kind, file):
+    job_id = str(uuid.uuid4())
+
+    os.makedirs(get_upload_dir(), exist_ok=True)
+    path = upload_path(job_id)
+    file.save(path)
+
+    with SessionLocal() as session:
+        job = ImportJob(id=job_id, kind=kind, status="queued", rows_processed=0, created_by=int(get_jwt_identity()))
+        session.add(job)
+        session.commit()
+
+    start = current_app.config.get("IMPORT_JOB_STARTER")
+    if start:
+        start(job_id, kind, path)
+
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}"
+    }), 202
+
+
+def _update_job(job_id, **values):
+    with SessionLocal() as session:
+        session.query(ImportJob).filter_by(id=job_id).update({**values, "updated_at": datetime.utcnow()})
+        session.commit()
+
+
+# queued -> running in one UPDATE, only one thread or process gets True for a job
+def claim_job(job_id):
+    now = datetime.utcnow()
+    with SessionLocal() as session:
+        claimed = (
+            session.query(ImportJob)
+            .filter_by(id=job_id, status="queued")
+            .update({"status": "running", "started_at": now, "updated_at": now}, synchronize_session=False)
+        )
+        session.commit()
+    return claimed == 1
+
+
+# Oldest queued job this process managed to claim, (job_id, kind) or None
+def claim_next_job():
+    with SessionLocal() as session:
+        queued = (
+            session.query(ImportJob.id, ImportJob.kind)
+            .filter_by(status="queued")
+            .order_by(ImportJob.created_at)
+            .limit(10)
+            .all()
+        )
+
+    for job_id, kind in queued:
+        if claim_job(job_id):
+            return job_id, kind
+    return None
+
+
+# Pool entry point, runs outside of the request. Skips jobs another thread or process already took.
+def run_job(job_id, kind, path):
+    if claim_job(job_id):
+        run_claimed_job(job_id, kind, path)
+
+
+def run_claimed_job(job_id, kind, path):
+    def progress(processed):
+        _update_job(job_id, rows_processed=processed)
+
+    try:
+        with open(path, "rb") as stream:
+            report = import_service.IMPORTERS[kind](stream, progress=progress)
+    except StaleDataError:
+        _update_job(job_id, status="failed", error=import_service.STALE_TOTAL_ERROR, finished_at=datetime.utcnow())
+        return
+    except Exception as e:
+        _update_job(job_id, status="failed", error=str(e) or e.__class__.__name__, finished_at=datetime.utcnow())
+        return
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    _update_job(job_id, status="succeeded", result=json.dumps(report), finished_at=datetime.utcnow())
+
+
+# Jobs whose worker died (recycled, reloaded, killed on timeout) go back to the queue, or fail
+# when their upload is gone. Checkpoints make the rerun skip rows that were already committed.
+# Upload files without a queued/running job are deleted.
+def recover_jobs(stale_seconds=None, submit=False):
+    if stale_seconds is None:
+        stale_seconds = get_stale_seconds()
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=stale_seconds)
+    report = {"requeued": [], "failed": [], "removed_uploads": 0}
+    requeued_kinds = {}
+
+    stale = (
+        ImportJob.status.in_(ACTIVE_STATUSES),
+        func.coalesce(ImportJob.updated_at, ImportJob.created_at) < cutoff,
+    )
+
+    with SessionLocal() as session:
+        for job_id, kind in session.query(ImportJob.id, ImportJob.kind).filter(*stale).all():
+            if os.path.exists(upload_path(job_id)):
+                key, values = "requeued", {"status": "queued", "updated_at": now}
+            else:
+                key, values = "failed", {
+                    "status": "failed",
+                    "error": "Import stopped with its worker and the upload is gone, upload the file again",
+                    "finished_at": now,
+                    "updated_at": now,
+                }
+            # Same filter again, a heartbeat that came in meanwhile keeps the job where it is
+            if session.query(ImportJob).filter(ImportJob.id == job_id, *stale).update(values, synchronize_session=False):
+                report[key].append(job_id)
+                requeued_kinds[job_id] = kind
+        session.commit()
+
+        report["removed_uploads"] = _remove_orphaned_uploads(session, time.time() - stale_seconds)
+
+    if submit:
+        for job_id in report["requeued"]:
+            get_executor().submit(run_job, job_id, requeued_kinds[job_id], upload_path(job_id))
+
+    return report
+
+
+# Web worker side of recovery (IMPORT_JOB_RUNNER=thread): right away and then every half stale period,
+# so jobs of a killed sibling are picked up even when no new worker is forked
+def start_recovery_thread(interval=None):
+    global _recovery_thread
+    if _recovery_thread is not None:
+        return _recovery_thread
+    interval = interval or max(get_stale_seconds() / 2, 1)
+
+    def loop():
+        while True:
+            try:
+                report = recover_jobs(submit=True)
+                if report["requeued"] or report["failed"]:
+                    logger.info("Recovered import jobs: %s", report)
+            except Exception:
+                logger.exception("Import job recovery failed")
+            time.sleep(interval)
+
+    _recovery_thread = threading.Thread(target=loop, name="import-job-recovery", daemon=True)
+    _recovery_thread.start()
+    return _recovery_thread
+
+
+def _remove_orphaned_uploads(session, cutoff):
+    upload_dir = get_upload_dir()
+    if not os.path.isdir(upload_dir):
+        return 0
+
+    removed = 0
+    for name in os.listdir(upload_dir):
+        path = os.path.join(upload_dir, name)
+        # Fresh files may belong to a job row that is not committed yet
+        if not name.endswith(".upload") or os.path.getmtime(path) >= cutoff:
+            continue
+        job = session.get(ImportJob, name[:-len(".upload")])
+        if job is None or job.status not in ACTIVE_STATUSES:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+# Loop of `flask run-import-jobs`: recover dead jobs, then run queued ones one at a time
+def run_worker(poll_interval=2.0, once=False, sleep=time.sleep):
+    while True:
+        recover_jobs()
+        claimed = claim_next_job()
+        if claimed:
+            job_id, kind = claimed
+            run_claimed_job(job_id, kind, upload_path(job_id))
+        elif once:
+            return
+        else:
+            sleep(poll_interval)
+
+
+# Show job state, progress and final report
+def get_job(job_id):
+    with SessionLocal() as session:
+        job = session.query(ImportJob).filter_by(id=job_id).first()
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+
+        return jsonify({
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "rows_processed": job.rows_processed,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+            "result": json.loads(job.result) if job.result else None,
+            "error": job.error
+        }), 200
@@ -0,0 +1,32 @@
+from db.overlaps import OVERLAP_ERROR
+from models.vacation_used import VacationUsed
+from services import archive_service
+from utils.workdays import workday_bounds
+
+
+# Existing vacation sharing at least one workday with start..end, one indexed lookup,
+# plus the archive when a year the range could reach into is archived
+def find_overlap(session, employee_id, start_date, end_date):
+    first, last = workday_bounds(start_date, end_date)
+    if first is None:
+        return None
+
+    existing = (
+        session.query(VacationUsed.start_date, VacationUsed.end_date)
+        .filter(
+            VacationUsed.employee_id == employee_id,
+            VacationUsed.workday_end >= first,
+            VacationUsed.workday_start <= last
+        )
+        .first()
+    )
+    return existing or archive_service.archived_overlap(employee_id, start_date, end_date)
+
+
+# Same body the overlap check has always returned
+def overlap_error(existing, start_date, end_date):
+    body = {"error": OVERLAP_ERROR}
+    if existing is not None:
+        body["overlap_start"] = str(max(existing.start_date, start_date))
+        body["overlap_end"] = str(min(existing.end_date, end_date))
+    return body
@@ -0,0 +1,104 @@
+import csv
+import json
+import os
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+from services import import_service
+from utils.upload_streams import open_upload
+from utils.validators import normalize_email
+
+
+# Lines copied to every part before the data rows: (csv, ndjson)
+HEADER_LINES = {
+    "users": (1, 0),
+    "vacation_totals": (2, 1),
+    "vacation_used": (1, 0),
+}
+
+
+# Same email always lands in the same part, so per-employee checks (duplicates,
+# overlaps, days left) never race between processes. crc32 is stable across runs,
+# which keeps part files (and their resume checkpoints) identical on re-run.
+def part_for(email, parts):
+    return zlib.crc32(normalize_email(email).encode("utf-8")) % parts
+
+
+# Split an upload into `parts` plain files by email, returns their paths
+def split_upload(kind, stream, parts, out_dir):
+    upload_format, lines = open_upload(stream)
+    header_count = HEADER_LINES[kind][0 if upload_format == "csv" else 1]
+    suffix = "csv" if upload_format == "csv" else "ndjson"
+    paths = [os.path.join(out_dir, f"{kind}-{i}.{suffix}") for i in range(parts)]
+
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(path, "w", encoding="utf-8", newline="")) for path in paths]
+
+        if upload_format == "csv":
+            reader = csv.reader(lines)
+            writers = [csv.writer(f) for f in files]
+            email_index = 0
+            for _ in range(header_count):
+                header = next(reader, None)
+                if header is not None:
+                    for writer in writers:
+                        writer.writerow(header)
+            # Users file is read by column name, email is not always first
+            if kind == "users" and header and "Employee Email" in header:
+                email_index = header.index("Employee Email")
+
+            for row in reader:
+                email = row[email_index] if len(row) > email_index else ""
+                writers[part_for(email, parts)].writerow(row)
+        else:
+            lines = (line for line in lines if line.strip())
+            for _ in range(header_count):
+                header = next(lines, None)
+                if header is not None:
+                    for f in files:
+                        f.write(header.rstrip("\r\n") + "\n")
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = {}
+                email = record.get("email") if isinstance(record, dict) else None
+                files[part_for(email, parts)].write(line.rstrip("\r\n") + "\n")
+
+    return paths
+
+
+# Add counters, join skip lists, keep everything else from the first report
+def merge_reports(reports):
+    merged = {}
+    for report in reports:
+        for key, value in report.items():
+            if key not in merged:
+                merged[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list):
+                merged[key].extend(value)
+            elif isinstance(value, int) and not isinstance(value, bool) and key != "year":
+                merged[key] += value
+    return merged
+
+
+# Process pool entry point, the child builds its own engine on first query
+def _import_part(kind, path, chunk_size):
+    with open(path, "rb") as stream:
+        return import_service.IMPORTERS[kind](stream, chunk_size=chunk_size)
+
+
+def import_file(kind, path, workers=1, chunk_size=None):
+    if workers <= 1:
+        return _import_part(kind, path, chunk_size)
+
+    with tempfile.TemporaryDirectory(prefix="vacation-import-") as tmp_dir:
+        with open(path, "rb") as stream:
+            part_paths = split_upload(kind, stream, workers, tmp_dir)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(_import_part, [kind] * workers, part_paths, [chunk_size] * workers))
+
+    return merge_reports(reports)
@@ -0,0 +1,44 @@
+from flask import jsonify, request
+from utils.profiling import ProfileSettings, default_settings, list_profiles
+
+
+# Current sampling settings, shared by all workers on this host
+def get_settings():
+    return jsonify(ProfileSettings().load()), 200
+
+
+# {"sample_rate": 0.01, "path_prefix": "/vacations", "min_duration_ms": 200}, fields are optional
+def update_settings():
+    data = request.get_json(silent=True) or {}
+    settings = dict(ProfileSettings().load())
+
+    if "sample_rate" in data:
+        rate = data["sample_rate"]
+        if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+            return jsonify({"error": "sample_rate must be a number between 0 and 1"}), 400
+        settings["sample_rate"] = float(rate)
+
+    if "path_prefix" in data:
+        if not isinstance(data["path_prefix"], str):
+            return jsonify({"error": "path_prefix must be a string"}), 400
+        settings["path_prefix"] = data["path_prefix"]
+
+    if "min_duration_ms" in data:
+        min_duration = data["min_duration_ms"]
+        if isinstance(min_duration, bool) or not isinstance(min_duration, (int, float)) or min_duration < 0:
+            return jsonify({"error": "min_duration_ms must be a number >= 0"}), 400
+        settings["min_duration_ms"] = float(min_duration)
+
+    ProfileSettings().save(settings)
+    return jsonify(settings), 200
+
+
+# Back to the PROFILE_* environment defaults
+def reset_settings():
+    ProfileSettings().reset()
+    return jsonify(default_settings()), 200
+
+
+# Written .prof files, newest first
+def get_profiles():
+    return jsonify(list_profiles()), 200
@@ -0,0 +1,53 @@
+from sqlalchemy import and_, bindparam, extract, func, select, update
+
+from db import SessionLocal
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+
+
+# Totals whose total_days_left doesn't match total_days minus the vacations booked against that year
+def find_mismatches(year=None):
+    used_year = extract("year", VacationUsed.start_date)
+    used = (
+        select(
+            VacationUsed.employee_id.label("employee_id"),
+            used_year.label("year"),
+            func.sum(VacationUsed.days_used).label("days_used"),
+        )
+        .group_by(VacationUsed.employee_id, used_year)
+        .subquery()
+    )
+
+    expected = VacationTotal.total_days - func.coalesce(used.c.days_used, 0)
+    query = (
+        select(VacationTotal.id, VacationTotal.employee_id, VacationTotal.year, VacationTotal.total_days_left, expected)
+        .outerjoin(used, and_(used.c.employee_id == VacationTotal.employee_id, used.c.year == VacationTotal.year))
+        .where(VacationTotal.total_days_left != expected)
+        .order_by(VacationTotal.year, VacationTotal.employee_id)
+    )
+    if year is not None:
+        query = query.where(VacationTotal.year == year)
+
+    with SessionLocal() as session:
+        return [
+            {"id": row[0], "employee_id": row[1], "year": row[2], "total_days_left": row[3], "expected": row[4]}
+            for row in session.execute(query)
+        ]
+
+
+# Report mismatches, and with fix=True set total_days_left to the expected value
+def reconcile(year=None, fix=False):
+    mismatches = find_mismatches(year)
+
+    if fix and mismatches:
+        with SessionLocal() as session:
+            # One executemany, bumping the version so concurrent optimistic writers retry (db/optimistic.py)
+            session.execute(
+                update(VacationTotal.__table__)
+                .where(VacationTotal.id == bindparam("total_id"))
+                .values(total_days_left=bindparam("expected"), version=VacationTotal.version + 1),
+                [{"total_id": mismatch["id"], "expected": mismatch["expected"]} for mismatch in mismatches]
+            )
+            session.commit()
+
+    return {"mismatches": mismatches, "fixed": len(mismatches) if fix else 0}
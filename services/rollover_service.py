@@ -0,0 +1,100 @@
+import os
+
+from sqlalchemy import and_, case, exists, func, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+from db import SessionLocal
+from models.employee import Employee
+from models.vacation_total import VacationTotal
+from services import archive_service
+
+
+# Rows per executemany when the carry-over comes from the archive
+INSERT_CHUNK = 1000
+
+
+class RolloverError(ValueError):
+    pass
+
+
+def get_default_base_days():
+    return int(os.getenv("ROLLOVER_BASE_DAYS", "20"))
+
+
+# Empty -> all unused days carry over, a number -> at most that many
+def get_default_max_carry_over():
+    value = os.getenv("ROLLOVER_MAX_CARRY_OVER", "0")
+    return int(value) if value != "" else None
+
+
+# Create VacationTotal rows for `year` for every employee that has none yet, in one INSERT ... SELECT.
+# total = base_days + min(previous year's days left, max_carry_over)
+def rollover_year(year, base_days=None, max_carry_over=None):
+    base_days = get_default_base_days() if base_days is None else base_days
+    if base_days < 0 or (max_carry_over is not None and max_carry_over < 0):
+        raise RolloverError("base_days and max_carry_over can't be negative")
+
+    # Previous year archived -> its totals are gone from vacation_totals, days left come from the archive
+    archived_left = archive_service.archived_days_left(year - 1) if archive_service.is_archived(year - 1) else None
+
+    # A concurrent rollover can win the unique constraint race, the second try then inserts the rest
+    for attempt in range(2):
+        with SessionLocal() as session:
+            try:
+                if archived_left is None:
+                    created = session.execute(_rollover_statement(year, base_days, max_carry_over)).rowcount
+                else:
+                    created = _rollover_from_archive(session, year, base_days, max_carry_over, archived_left)
+                session.commit()
+                break
+            except IntegrityError:
+                session.rollback()
+                if attempt:
+                    raise
+
+    return {
+        "year": year,
+        "base_days": base_days,
+        "max_carry_over": max_carry_over,
+        "carry_over_from": "database" if archived_left is None else "archive",
+        "created": created,
+    }
+
+
+def _missing_employees(year):
+    # Re-running only fills in employees that are still missing
+    return ~exists().where(VacationTotal.employee_id == Employee.id, VacationTotal.year == year)
+
+
+def _rollover_statement(year, base_days, max_carry_over):
+    previous = aliased(VacationTotal)
+    carry = func.coalesce(previous.total_days_left, 0)
+    if max_carry_over is not None:
+        carry = case((carry > max_carry_over, max_carry_over), else_=carry)
+    days = (literal(base_days) + carry).label("days")
+
+    rows = (
+        # New rows start at version 1, same as an ORM insert (db/optimistic.py)
+        select(Employee.id, literal(year), days, days, literal(1))
+        .outerjoin(previous, and_(previous.employee_id == Employee.id, previous.year == year - 1))
+        .where(_missing_employees(year))
+    )
+    return insert(VacationTotal).from_select(
+        ["employee_id", "year", "total_days", "total_days_left", "version"], rows
+    )
+
+
+# Same rows as the INSERT ... SELECT, with the carry-over looked up in {employee_id: days left} from the archive
+def _rollover_from_archive(session, year, base_days, max_carry_over, archived_left):
+    rows = []
+    for employee_id in session.scalars(select(Employee.id).where(_missing_employees(year))):
+        carry = archived_left.get(employee_id) or 0
+        if max_carry_over is not None:
+            carry = min(carry, max_carry_over)
+        days = base_days + carry
+        rows.append({"employee_id": employee_id, "year": year, "total_days": days, "total_days_left": days, "version": 1})
+
+    for i in range(0, len(rows), INSERT_CHUNK):
+        session.execute(VacationTotal.__table__.insert(), rows[i:i + INSERT_CHUNK])
+    return len(rows)
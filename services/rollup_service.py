@@ -0,0 +1,109 @@
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+
+from sqlalchemy import and_, func, or_
+
+from models.vacation_monthly_usage import VacationMonthlyUsage
+from models.vacation_used import VacationUsed
+from utils.workdays import calculate_workdays, workdays_by_month
+
+
+REBUILD_FETCH_SIZE = 2000
+
+
+# Recompute the rollup from vacation_used (all employees, or only the given ones), in the caller's transaction
+def rebuild_monthly_usage(session, employee_ids=None):
+    deleted = session.query(VacationMonthlyUsage)
+    rows = session.query(VacationUsed.employee_id, VacationUsed.start_date, VacationUsed.end_date)
+    if employee_ids is not None:
+        employee_ids = list(employee_ids)
+        deleted = deleted.filter(VacationMonthlyUsage.employee_id.in_(employee_ids))
+        rows = rows.filter(VacationUsed.employee_id.in_(employee_ids))
+    deleted.delete(synchronize_session=False)
+
+    rows = rows.order_by(VacationUsed.employee_id).execution_options(stream_results=True).yield_per(REBUILD_FETCH_SIZE)
+
+    # One employee's months in memory at a time
+    written = 0
+    for employee_id, vacations in groupby(rows, key=lambda row: row[0]):
+        months = defaultdict(int)
+        for _, start_date, end_date in vacations:
+            for month, workdays in workdays_by_month(start_date, end_date).items():
+                months[month] += workdays
+
+        session.execute(
+            VacationMonthlyUsage.__table__.insert(),
+            [{"employee_id": employee_id, "month": month, "workdays": workdays} for month, workdays in months.items()]
+        )
+        written += len(months)
+    return written
+
+
+def _first_full_month(start_date):
+    if start_date.day == 1:
+        return start_date
+    return (start_date.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _last_full_month(end_date):
+    if (end_date + timedelta(days=1)).day == 1:
+        return end_date.replace(day=1)
+    return (end_date.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+
+# (from, to) windows that must be counted from raw rows, the rest is whole months
+def _edge_windows(start_date, end_date, first_month, last_month):
+    if first_month > last_month:
+        return [(start_date, end_date)]
+
+    edges = []
+    if start_date < first_month:
+        edges.append((start_date, first_month - timedelta(days=1)))
+    after_last = (last_month + timedelta(days=32)).replace(day=1)
+    if after_last <= end_date:
+        edges.append((after_last, end_date))
+    return edges
+
+
+# {employee_id: workdays used in start..end} for the given employees (None = everyone).
+# One grouped query over the rollup for whole months, one query for the raw rows in the edge months.
+# Employees without vacations in the window are left out.
+def used_workdays_by_employee(session, start_date, end_date, employee_ids=None):
+    totals = defaultdict(int)
+    if end_date < start_date:
+        return totals
+
+    first_month = _first_full_month(start_date)
+    last_month = _last_full_month(end_date)
+
+    if first_month <= last_month:
+        months = session.query(VacationMonthlyUsage.employee_id, func.sum(VacationMonthlyUsage.workdays)).filter(
+            VacationMonthlyUsage.month >= first_month,
+            VacationMonthlyUsage.month <= last_month
+        )
+        if employee_ids is not None:
+            months = months.filter(VacationMonthlyUsage.employee_id.in_(employee_ids))
+        for employee_id, workdays in months.group_by(VacationMonthlyUsage.employee_id):
+            if workdays:
+                totals[employee_id] += workdays
+
+    edges = _edge_windows(start_date, end_date, first_month, last_month)
+    if edges:
+        vacations = session.query(VacationUsed.employee_id, VacationUsed.start_date, VacationUsed.end_date).filter(
+            or_(*(and_(VacationUsed.end_date >= edge_start, VacationUsed.start_date <= edge_end) for edge_start, edge_end in edges))
+        )
+        if employee_ids is not None:
+            vacations = vacations.filter(VacationUsed.employee_id.in_(employee_ids))
+        for employee_id, vacation_start, vacation_end in vacations.execution_options(stream_results=True).yield_per(REBUILD_FETCH_SIZE):
+            # A long vacation can cover both edges, each edge is counted on its own
+            for edge_start, edge_end in edges:
+                if vacation_end >= edge_start and vacation_start <= edge_end:
+                    totals[employee_id] += calculate_workdays(max(vacation_start, edge_start), min(vacation_end, edge_end))
+
+    return totals
+
+
+# Workdays used in start..end: whole months from the rollup, the partial months at both ends from vacation_used
+def used_workdays(session, employee_id, start_date, end_date):
+    return used_workdays_by_employee(session, start_date, end_date, [employee_id]).get(employee_id, 0)
@@ -1,48 +1,44 @@
 from flask import jsonify, request
-from db import SessionLocal
+from db import SessionLocal, read_only
 from models.employee import Employee
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request, get_jwt
 from werkzeug.security import generate_password_hash
+from utils.serializers import EMPLOYEE_COLUMNS, employee_row, serialize_rows
 
 
 # List all users
+@read_only
 def list_users():
     session = SessionLocal()
-    users = session.query(Employee).all()
-    return jsonify([{"id": u.id, "email": u.email, "is_admin": u.is_admin} for u in users])
+    users = session.query(*EMPLOYEE_COLUMNS).all()
+    return jsonify(serialize_rows(employee_row, users))
 
 # Show logedin user
+@read_only
 def get_my_profile():
     verify_jwt_in_request()
     user_identity = get_jwt_identity()
 
     session = SessionLocal()
-    user = session.query(Employee).filter_by(id=user_identity).first()
+    user = session.query(*EMPLOYEE_COLUMNS).filter(Employee.id == user_identity).first()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    return jsonify({
-        "id": user.id,
-        "email": user.email,
-        "is_admin": user.is_admin
-    }), 200
+    return jsonify(employee_row(user)), 200
 
 
 # Show one user profile
+@read_only
 def get_user(user_id):
 
     session = SessionLocal()
-    user = session.query(Employee).filter_by(id=user_id).first()
+    user = session.query(*EMPLOYEE_COLUMNS).filter(Employee.id == user_id).first()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    return jsonify({
-        "id": user.id,
-        "email": user.email,
-        "is_admin": user.is_admin
-    }), 200
+    return jsonify(employee_row(user)), 200
 
 # Update profile
 def update_user(user_id):
@@ -1,33 +1,24 @@
-import csv
-from io import TextIOWrapper
-from dateutil import parser
-from flask import request, jsonify
-from db import SessionLocal
+from flask import Response, request, jsonify, stream_with_context
+from db import SessionLocal, read_only
+from db.optimistic import retry_on_stale
+from db.overlaps import is_overlap_violation, lock_employee
 from models.employee import Employee
 from models.vacation_total import VacationTotal
 from models.vacation_used import VacationUsed
 from flask_jwt_extended import get_jwt_identity, get_jwt
-from datetime import timedelta, datetime
-
-
-# Calculate days only from monday to friday
-def calculate_workdays(start_date, end_date):
-    day_count = 0
-    current = start_date
-    while current <= end_date:
-        if current.weekday() < 5:  # 0-4 mo-fr
-            day_count += 1
-        current += timedelta(days=1)
-    return day_count
-
-# Ignor overlap if overlap is weekends
-def overlap_is_only_weekends(start, end):
-    current = start
-    while current <= end:
-        if current.weekday() < 5:  # 0-4 mo-fr
-            return False
-        current += timedelta(days=1)
-    return True
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from services import archive_service, export_service, import_service, jobs_service, overlap_service, rollover_service, rollup_service
+from utils.serializers import (
+    VACATION_TOTAL_COLUMNS, VACATION_USED_COLUMNS, vacation_total_row, vacation_used_row, serialize_rows
+)
+from utils.upload_streams import UnsupportedUploadError
+from utils.workdays import calculate_workdays
+
+
+CONFLICT_ERROR = "Vacation total was changed by another request, try again"
+
 
 # Can view if is admin or id = logedin id
 def can_view(user_id):
@@ -47,55 +38,14 @@ def create_vacation_total():
 
     # # CSV UPLOAD MODE
     if file:
-        with SessionLocal() as session:
-            stream = TextIOWrapper(file.stream, encoding="utf-8")
-            reader = csv.reader(stream)
-
-            # First row -> take year
-            first_row = next(reader)
-            year = int(first_row[1])
-
-            # Second row -> name of colons (Employee,Total vacation days)
-            next(reader)  # skip
-
-            created = 0
-            skipped_existing = []
-            skipped_not_found = []
-
-            for row in reader:
-                email = row[0].strip()
-                try:
-                    total_days = int(row[1].strip())
-                except:
-                    continue
-
-                user = session.query(Employee).filter_by(email=email).first()
-                if not user:
-                    skipped_not_found.append(email)
-                    continue
-
-                existing = session.query(VacationTotal).filter_by(employee_id=user.id, year=year).first()
-                if existing:
-                    skipped_existing.append(email)
-                    continue
-
-                vt = VacationTotal(
-                    employee_id=user.id,
-                    year=year,
-                    total_days=total_days,
-                    total_days_left=total_days
-                )
-                session.add(vt)
-                created += 1
+        # Big files -> run in background worker, return job id
+        if jobs_service.wants_async(request):
+            return jobs_service.enqueue_import("vacation_totals", file)
 
-            session.commit()
-
-            return jsonify({
-                "year": year,
-                "created": created,
-                "skipped_not_found": skipped_not_found,
-                "skipped_existing": skipped_existing
-            }), 201
+        try:
+            return jsonify(import_service.import_vacation_totals(file.stream)), 201
+        except UnsupportedUploadError as e:
+            return jsonify({"error": str(e)}), 400
 
     # JSON MODE
 
@@ -107,7 +57,14 @@ def create_vacation_total():
     if not user_id or not year or total_days is None:
         return jsonify({"error": "user_id, year and total_days are required"}), 400
 
+    if archive_service.is_archived(year):
+        return jsonify({"error": f"Year {year} is archived"}), 409
+
     with SessionLocal() as session:
+        # The foreign key would reject it too, but as a 500
+        if not session.get(Employee, user_id):
+            return jsonify({"error": "User not found"}), 404
+
         existing = session.query(VacationTotal).filter_by(employee_id=user_id, year=year).first()
         if existing:
             return jsonify({"error": "Vacation total already set for this user and year"}), 409
@@ -120,7 +77,14 @@ def create_vacation_total():
         )
 
         session.add(vt)
-        session.commit()
+        try:
+            session.commit()
+        except IntegrityError:
+            # User deleted or the same total created by a concurrent request in the meantime
+            session.rollback()
+            if not session.get(Employee, user_id):
+                return jsonify({"error": "User not found"}), 404
+            return jsonify({"error": "Vacation total already set for this user and year"}), 409
 
         return jsonify({
             "message": "Vacation total created",
@@ -139,25 +103,61 @@ def update_vacation_total():
     if not user_id or not year or added_days is None:
         return jsonify({"error": "user_id, year and added_days are required"}), 400
 
-    with SessionLocal() as session:
-        vt = session.query(VacationTotal).filter_by(employee_id=user_id, year=year).first()
-        if not vt:
-            return jsonify({"error": "Vacation total for this user and year not found"}), 404
+    if archive_service.is_archived(year):
+        return jsonify({"error": f"Year {year} is archived"}), 409
+
+    # Read-modify-write, run again from a fresh read if another request changed the row meanwhile
+    def apply():
+        with SessionLocal() as session:
+            vt = session.query(VacationTotal).filter_by(employee_id=user_id, year=year).first()
+            if not vt:
+                return jsonify({"error": "Vacation total for this user and year not found"}), 404
 
-        vt.total_days += added_days
-        vt.total_days_left += added_days
+            vt.total_days += added_days
+            vt.total_days_left += added_days
 
-        session.commit()
+            session.commit()
 
-        return jsonify({
-            "message": "Vacation total updated",
-            "employee_id": user_id,
-            "year": year,
-            "total_days": vt.total_days,
-            "total_days_left": vt.total_days_left
-        }), 200
+            return jsonify({
+                "message": "Vacation total updated",
+                "employee_id": user_id,
+                "year": year,
+                "total_days": vt.total_days,
+                "total_days_left": vt.total_days_left
+            }), 200
+
+    try:
+        return retry_on_stale(apply)
+    except StaleDataError:
+        return jsonify({"error": CONFLICT_ERROR}), 409
     
 
+# Create next year's totals for all employees, carrying over unused days
+# {"year": 2026, "base_days": 20, "max_carry_over": 5}   (max_carry_over: null -> carry everything)
+def rollover_year():
+    data = request.get_json(silent=True) or {}
+    year = data.get("year")
+
+    if not isinstance(year, int):
+        return jsonify({"error": "year is required"}), 400
+
+    if archive_service.is_archived(year):
+        return jsonify({"error": f"Year {year} is archived"}), 409
+
+    base_days = data.get("base_days")
+    max_carry_over = data["max_carry_over"] if "max_carry_over" in data else rollover_service.get_default_max_carry_over()
+
+    if not all(value is None or isinstance(value, int) for value in (base_days, max_carry_over)):
+        return jsonify({"error": "base_days and max_carry_over must be integers"}), 400
+
+    try:
+        result = rollover_service.rollover_year(year, base_days=base_days, max_carry_over=max_carry_over)
+    except rollover_service.RolloverError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(result), 200
+
+
 # Add vacation
 def add_vacation_used():
 
@@ -166,89 +166,17 @@ def add_vacation_used():
     # CSV UPLOAD MODE
     
     if file:
-        stream = TextIOWrapper(file.stream, encoding="utf-8")
-        reader = csv.reader(stream)
-
-        header = next(reader)
-
-        created = 0
-        skipped_not_found = []
-        skipped_no_total = []
-        skipped_overlap = []
-        skipped_not_enough_days = []
-
-        with SessionLocal() as session:
-            for row in reader:
-                email = row[0].strip()
-
-                try:
-                    start_date = parser.parse(row[1]).date()
-                    end_date = parser.parse(row[2]).date()
-                except:
-                    continue
-
-                if end_date < start_date:
-                    continue
-
-                user = session.query(Employee).filter_by(email=email).first()
-                if not user:
-                    skipped_not_found.append(email)
-                    continue
-
-                year = start_date.year
-                vacation_total = session.query(VacationTotal).filter_by(employee_id=user.id, year=year).first()
-                if not vacation_total:
-                    skipped_no_total.append(email)
-                    continue
-
-                # check overlap
-                existing_vacations = (
-                    session.query(VacationUsed)
-                    .filter(
-                        VacationUsed.employee_id == user.id,
-                        VacationUsed.end_date >= start_date,
-                        VacationUsed.start_date <= end_date
-                    ).all()
-                )
-
-                reject_due_to_overlap = False
-                for existing in existing_vacations:
-                    overlap_start = max(existing.start_date, start_date)
-                    overlap_end = min(existing.end_date, end_date)
-                    if overlap_start <= overlap_end:
-                        if not overlap_is_only_weekends(overlap_start, overlap_end):
-                            reject_due_to_overlap = True
-                            break
-
-                if reject_due_to_overlap:
-                    skipped_overlap.append(email)
-                    continue
-
-                days_used = calculate_workdays(start_date, end_date)
-
-                if vacation_total.total_days_left < days_used:
-                    skipped_not_enough_days.append(email)
-                    continue
-
-                new_entry = VacationUsed(
-                    start_date=start_date,
-                    end_date=end_date,
-                    days_used=days_used,
-                    employee_id=user.id
-                )
-                session.add(new_entry)
-                vacation_total.total_days_left -= days_used
-                created += 1
-
-            session.commit()
-
-        return jsonify({
-            "created": created,
-            "skipped_not_found": skipped_not_found,
-            "skipped_no_total_for_year": skipped_no_total,
-            "skipped_overlap": skipped_overlap,
-            "skipped_not_enough_days": skipped_not_enough_days
-        }), 201
+        # Big files -> run in background worker, return job id
+        if jobs_service.wants_async(request):
+            return jobs_service.enqueue_import("vacation_used", file)
+
+        try:
+            return jsonify(import_service.import_vacation_used(file.stream)), 201
+        except UnsupportedUploadError as e:
+            return jsonify({"error": str(e)}), 400
+        except StaleDataError:
+            # Chunks before the conflict are committed, the same upload continues from there
+            return jsonify({"error": import_service.STALE_TOTAL_ERROR}), 409
 
     
     # JSON MODE
@@ -270,128 +198,189 @@ def add_vacation_used():
 
     year = start_date.year
 
-    with SessionLocal() as session:
-        vacation_total = session.query(VacationTotal).filter_by(employee_id=user_id, year=year).first()
-        if not vacation_total:
-            return jsonify({"error": f"No vacation total defined for year {year}"}), 400
-        
-        # check for overlap
-        existing_vacations = (
-            session.query(VacationUsed)
-            .filter(
-                VacationUsed.employee_id == user_id,
-                VacationUsed.end_date >= start_date,
-                VacationUsed.start_date <= end_date
-            )
-            .all()
-        )
-
-        for existing in existing_vacations:
-            overlap_start = max(existing.start_date, start_date)
-            overlap_end = min(existing.end_date, end_date)
+    if archive_service.is_archived(year):
+        return jsonify({"error": f"Year {year} is archived"}), 409
 
-            if overlap_start <= overlap_end:
-                if not overlap_is_only_weekends(overlap_start, overlap_end):
-                    return jsonify({
-                        "error": "Vacation period overlaps with an existing vacation in workdays",
-                        "overlap_start": str(overlap_start),
-                        "overlap_end": str(overlap_end)
-                    }), 400
+    # Read-modify-write of the year's total, run again from a fresh read if it changed meanwhile
+    def book():
+        with SessionLocal() as session:
+            # Postgres: bookings of one employee run one after another until commit
+            lock_employee(session, user_id)
 
-        days_used = calculate_workdays(start_date, end_date)
+            vacation_total = session.query(VacationTotal).filter_by(employee_id=user_id, year=year).first()
+            if not vacation_total:
+                return jsonify({"error": f"No vacation total defined for year {year}"}), 400
+        
+            # check for overlap (the database enforces it too, see db/overlaps.py)
+            existing = overlap_service.find_overlap(session, user_id, start_date, end_date)
+            if existing:
+                return jsonify(overlap_service.overlap_error(existing, start_date, end_date)), 400
+
+            days_used = calculate_workdays(start_date, end_date)
+
+            if vacation_total.total_days_left < days_used:
+                return jsonify({
+                    "error": "Not enough vacation days left",
+                    "days_left": vacation_total.total_days_left,
+                    "days_needed": days_used
+                }), 400
+
+            vacation = VacationUsed(
+                start_date=start_date,
+               	end_date=end_date,
+                days_used=days_used,
+                employee_id=user_id
+            )
+            session.add(vacation)
+
+            vacation_total.total_days_left -= days_used
+
+            try:
+                session.commit()
+            except IntegrityError as e:
+                session.rollback()
+                # User deleted in the meantime, the total went with it (ON DELETE CASCADE)
+                if not session.get(Employee, user_id):
+                    return jsonify({"error": "User not found"}), 404
+                # A concurrent booking got in between the check and the insert
+                if not is_overlap_violation(e):
+                    raise
+                existing = overlap_service.find_overlap(session, user_id, start_date, end_date)
+                return jsonify(overlap_service.overlap_error(existing, start_date, end_date)), 400
 
-        if vacation_total.total_days_left < days_used:
             return jsonify({
-                "error": "Not enough vacation days left",
-                "days_left": vacation_total.total_days_left,
-                "days_needed": days_used
-            }), 400
-
-        vacation = VacationUsed(
-            start_date=start_date,
-           	end_date=end_date,
-            days_used=days_used,
-            employee_id=user_id
-        )
-        session.add(vacation)
-
-        vacation_total.total_days_left -= days_used
-
-        session.commit()
+                "message": "Vacation entry added",
+                "days_used": days_used,
+                "days_left_now": vacation_total.total_days_left
+            }), 201
 
-        return jsonify({
-            "message": "Vacation entry added",
-            "days_used": days_used,
-            "days_left_now": vacation_total.total_days_left
-        }), 201
+    try:
+        return retry_on_stale(book)
+    except StaleDataError:
+        return jsonify({"error": CONFLICT_ERROR}), 409
     
 
 # View vacation total, used, and left days per year
+@read_only
 def get_vacation_overview(user_id):
     if not can_view(user_id):
         return jsonify({"error": "Access denied"}), 403
 
     with SessionLocal() as session:
-        totals = session.query(VacationTotal).filter_by(employee_id=user_id).all()
-
-        result = []
-        for vt in totals:
-            used_days = vt.total_days - vt.total_days_left
+        totals = session.query(*VACATION_TOTAL_COLUMNS).filter(VacationTotal.employee_id == user_id).all()
 
-            result.append({
-                "year": vt.year,
-                "total_days": vt.total_days,
-                "used_days": used_days,
-                "days_left": vt.total_days_left,
-            })
+    # Closed years live in the archive, not in vacation_totals
+    archived = archive_service.archived_totals(user_id)
+    if archived:
+        totals = sorted(archived + list(totals), key=lambda row: row[0])
 
-        return jsonify(result), 200
+    return jsonify(serialize_rows(vacation_total_row, totals)), 200
     
 
+# Same shape as the database version below, from an archived {"total": ..., "vacations": [...]} block
+def archived_year_result(year, block):
+    result = vacation_total_row(block["total"])
+    last_day = f"{year}-12-31"
+    result["vacations"] = [vacation for vacation in block["vacations"] if vacation["end_date"] <= last_day]
+    return result
+
+
 # List vacation info for given year
+@read_only
 def get_vacation_year(user_id, year):
     if not can_view(user_id):
         return jsonify({"error": "Access denied"}), 403
 
+    if archive_service.is_archived(year):
+        block = archive_service.archived_year(user_id, year)
+        if not block or not block["total"]:
+            return jsonify({"year": year, "message": "No data"}), 200
+        return jsonify(archived_year_result(year, block)), 200
+
     with SessionLocal() as session:
-        vt = session.query(VacationTotal).filter_by(employee_id=user_id, year=year).first()
+        vt = (
+            session.query(*VACATION_TOTAL_COLUMNS)
+            .filter(VacationTotal.employee_id == user_id, VacationTotal.year == year)
+            .first()
+        )
         if not vt:
             return jsonify({"year": year, "message": "No data"}), 200
 
-        used_days = vt.total_days - vt.total_days_left
-
         vacations = (
-            session.query(VacationUsed)
+            session.query(*VACATION_USED_COLUMNS)
             .filter(
                 VacationUsed.employee_id == user_id,
                 VacationUsed.start_date >= datetime(year, 1, 1).date(),
+                # upper bound on start_date lets Postgres prune other year partitions
+                VacationUsed.start_date <= datetime(year, 12, 31).date(),
                 VacationUsed.end_date <= datetime(year, 12, 31).date()
             )
             .order_by(VacationUsed.start_date.asc())
             .all()
         )
 
-        vacation_list = [
-            {
-                "id": v.id,
-                "start_date": v.start_date.isoformat(),
-                "end_date": v.end_date.isoformat(),
-                "days_used": v.days_used,
-            }
-            for v in vacations
-        ]
+        result = vacation_total_row(vt)
+        result["vacations"] = serialize_rows(vacation_used_row, vacations)
 
-        return jsonify({
-            "year": year,
-            "total_days": vt.total_days,
-            "used_days": used_days,
-            "days_left": vt.total_days_left,
-            "vacations": vacation_list
-        }), 200
+        return jsonify(result), 200
+
+
+# Year details for a range of years, each block shaped like get_vacation_year()
+# /vacations/<user_id>/years?from_year=YYYY&to_year=YYYY   (both optional)
+@read_only
+def get_vacation_years(user_id):
+    if not can_view(user_id):
+        return jsonify({"error": "Access denied"}), 403
+
+    try:
+        from_year = int(request.args["from_year"]) if request.args.get("from_year") else None
+        to_year = int(request.args["to_year"]) if request.args.get("to_year") else None
+    except ValueError:
+        return jsonify({"error": "from_year and to_year must be integers"}), 400
+
+    if from_year is not None and to_year is not None and from_year > to_year:
+        return jsonify({"error": "from_year cannot be after to_year"}), 400
+
+    def in_range(year):
+        return (from_year is None or year >= from_year) and (to_year is None or year <= to_year)
+
+    results = {}
+
+    # Closed years come from the archive, their rows are gone from the database
+    for year in archive_service.archived_years():
+        if in_range(year):
+            block = archive_service.archived_year(user_id, year)
+            if block and block["total"]:
+                results[year] = archived_year_result(year, block)
+
+    # Two queries for the whole range: totals, then every vacation starting in it
+    with SessionLocal() as session:
+        totals = session.query(*VACATION_TOTAL_COLUMNS).filter(VacationTotal.employee_id == user_id)
+        vacations = session.query(*VACATION_USED_COLUMNS).filter(VacationUsed.employee_id == user_id)
+        if from_year is not None:
+            totals = totals.filter(VacationTotal.year >= from_year)
+            vacations = vacations.filter(VacationUsed.start_date >= datetime(from_year, 1, 1).date())
+        if to_year is not None:
+            totals = totals.filter(VacationTotal.year <= to_year)
+            vacations = vacations.filter(VacationUsed.start_date <= datetime(to_year, 12, 31).date())
+
+        for vt in totals:
+            result = vacation_total_row(vt)
+            result["vacations"] = []
+            results[vt[0]] = result
+
+        for vacation in vacations.order_by(VacationUsed.start_date.asc()):
+            year = vacation[1].year
+            # Same rule as the single year view: vacations running into the next year are left out
+            if year in results and vacation[2].year == year:
+                results[year]["vacations"].append(vacation_used_row(vacation))
+
+    return jsonify([results[year] for year in sorted(results)]), 200
 
 
 # Search used vacation days from-to specific date
 # /vacations/<user_id>/used?from=YYYY-MM-DD&to=YYYY-MM-DD
+@read_only
 def get_used_in_period(user_id):
     if not can_view(user_id):
         return jsonify({"error": "Access denied"}), 403
@@ -406,22 +395,10 @@ def get_used_in_period(user_id):
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
 
     with SessionLocal() as session:
-        vacations = (
-            session.query(VacationUsed)
-            .filter(
-                VacationUsed.employee_id == user_id,
-                VacationUsed.end_date >= start_date,
-                VacationUsed.start_date <= end_date
-            )
-            .all()
-        )
+        # Whole months come from the monthly rollup, only the edges from raw rows
+        total_used = rollup_service.used_workdays(session, user_id, start_date, end_date)
 
-        total_used = 0
-
-        for vac in vacations:
-            overlap_start = max(vac.start_date, start_date)
-            overlap_end = min(vac.end_date, end_date)
-            total_used += calculate_workdays(overlap_start, overlap_end)
+        total_used += archive_service.archived_days_in_period(user_id, start_date, end_date)
 
         return jsonify({
             "user_id": user_id,
@@ -429,3 +406,71 @@ def get_used_in_period(user_id):
             "to": end,
             "days_used": total_used
         }), 200
+
+
+# Used days in a period for many employees at once (admin report)
+# /vacations/used?from=YYYY-MM-DD&to=YYYY-MM-DD&user_ids=1,2,3 (no user_ids = everyone)
+@read_only
+def get_used_in_period_for_users():
+    start = request.args.get("from")
+    end = request.args.get("to")
+
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date()
+    except:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    user_ids = None
+    if request.args.get("user_ids"):
+        try:
+            user_ids = sorted({int(value) for value in request.args["user_ids"].split(",")})
+        except ValueError:
+            return jsonify({"error": "user_ids must be a comma separated list of integers"}), 400
+
+    with SessionLocal() as session:
+        employees = session.query(Employee.id, Employee.email).order_by(Employee.id)
+        if user_ids is not None:
+            employees = employees.filter(Employee.id.in_(user_ids))
+        employees = employees.all()
+
+        if user_ids is not None and len(employees) != len(user_ids):
+            found = {employee_id for employee_id, _ in employees}
+            return jsonify({"error": "Users not found", "user_ids": [i for i in user_ids if i not in found]}), 404
+
+        used = rollup_service.used_workdays_by_employee(session, start_date, end_date, user_ids)
+        archived = archive_service.archived_days_by_employee(start_date, end_date, user_ids)
+
+        return jsonify({
+            "from": start,
+            "to": end,
+            "users": [
+                {
+                    "user_id": employee_id,
+                    "email": email,
+                    "days_used": used.get(employee_id, 0) + archived.get(employee_id, 0)
+                }
+                for employee_id, email in employees
+            ]
+        }), 200
+
+
+# Stream every used vacation as CSV or NDJSON, optionally for one year / one employee
+# /vacations/export?format=csv|ndjson&year=YYYY&user_id=N
+def export_vacations():
+    export_format = request.args.get("format", "csv")
+    if export_format not in export_service.EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    try:
+        year = int(request.args["year"]) if request.args.get("year") else None
+        user_id = int(request.args["user_id"]) if request.args.get("user_id") else None
+    except ValueError:
+        return jsonify({"error": "year and user_id must be integers"}), 400
+
+    chunks = export_service.export_vacations(export_format, year=year, employee_id=user_id)
+    return Response(
+        stream_with_context(chunks),
+        mimetype=export_service.EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename=vacations.{export_format}"},
+    )
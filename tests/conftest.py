@@ -1,27 +1,31 @@
 import os
 import pytest
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+
+# Force SQLite test DB before anything else, the engine is created lazily on first use
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+
 from main import create_app
-from db import Base, engine, SessionLocal
+from db import Base, get_engine, SessionLocal
 from models.employee import Employee
+from services import jobs_service
+from utils.rate_limit import reset_login_limiter
 from flask_jwt_extended import create_access_token
 from werkzeug.security import generate_password_hash
 
 
 @pytest.fixture(autouse=True)
 def reset_db():
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.drop_all(bind=get_engine())
+    Base.metadata.create_all(bind=get_engine())
+    # Fresh login buckets, otherwise logins from earlier tests count against the limit
+    reset_login_limiter()
     yield
 
 
 @pytest.fixture(scope="session")
 def test_engine():
-    # Force SQLite test DB before anything else
-    os.environ["DATABASE_URL"] = "sqlite:///:memory:"
-    test_engine = create_engine(os.environ["DATABASE_URL"], echo=False, future=True)
-    SessionLocal.configure(bind=test_engine)
+    engine = get_engine()
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
@@ -37,10 +41,8 @@ def test_app(SessionForTests):
     app = create_app()
     app.config["TESTING"] = True
     app.config["JWT_SECRET_KEY"] = "test-secret-key"
-
-    # Override global SessionLocal used by routes
-    from db import SessionLocal
-    SessionLocal.configure(bind=SessionForTests.kw["bind"])
+    # Run background import jobs inline, in-memory SQLite is per thread
+    app.config["IMPORT_JOB_STARTER"] = jobs_service.run_job
 
     return app
 
@@ -0,0 +1,190 @@
+import gzip
+import json
+import os
+import pytest
+from datetime import date
+from db import SessionLocal
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services import archive_service
+from utils.vacation_archive import VacationArchive
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path / "archive"))
+    return tmp_path / "archive"
+
+
+def _seed(user_id):
+    with SessionLocal() as session:
+        session.add_all([
+            VacationTotal(employee_id=user_id, year=2023, total_days=20, total_days_left=15),
+            VacationTotal(employee_id=user_id, year=2024, total_days=22, total_days_left=22),
+            VacationUsed(employee_id=user_id, start_date=date(2023, 3, 6), end_date=date(2023, 3, 10), days_used=5),
+            VacationUsed(employee_id=user_id, start_date=date(2024, 5, 6), end_date=date(2024, 5, 6), days_used=1),
+        ])
+        session.commit()
+
+
+def test_archive_moves_rows_out_of_database(create_test_user, archive_dir):
+    user = create_test_user(email="arch@example.com")
+    other = create_test_user(email="other@example.com")
+    _seed(user.id)
+    with SessionLocal() as session:
+        session.add(VacationTotal(employee_id=other.id, year=2023, total_days=10, total_days_left=10))
+        session.commit()
+
+    report = archive_service.archive_year(2023, today=date(2025, 1, 1))
+
+    assert report == {"year": 2023, "employees": 2, "totals": 2, "vacations": 1}
+    with SessionLocal() as session:
+        assert session.query(VacationTotal).filter_by(year=2023).count() == 0
+        assert session.query(VacationUsed).count() == 1
+
+    # Each employee is its own gzip member, readable on its own from the index offsets
+    index = json.loads((archive_dir / "2023" / "index.json").read_text())
+    offset, length = index[str(user.id)][0]
+    with open(archive_dir / "2023" / "vacations.jsonl.gz", "rb") as f:
+        f.seek(offset)
+        block = json.loads(gzip.decompress(f.read(length)))
+    assert block["total"] == [2023, 20, 15]
+    assert block["vacations"][0]["start_date"] == "2023-03-06"
+
+
+def test_archive_refuses_open_year(archive_dir):
+    with pytest.raises(archive_service.ArchiveError):
+        archive_service.archive_year(2025, today=date(2025, 6, 1))
+    assert not os.path.exists(archive_dir)
+
+
+def test_failed_delete_leaves_rows_only_in_database(create_test_user, archive_dir, monkeypatch):
+    user = create_test_user(email="fail@example.com")
+    _seed(user.id)
+
+    def fail(session, employee_ids):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(archive_service, "rebuild_monthly_usage", fail)
+    with pytest.raises(RuntimeError):
+        archive_service.archive_year(2023, today=date(2025, 1, 1))
+
+    assert not archive_service.is_archived(2023)
+    with SessionLocal() as session:
+        assert session.query(VacationTotal).filter_by(year=2023).count() == 1
+
+    # Re-run writes the year once, the bytes of the failed run stay unreferenced
+    monkeypatch.undo()
+    monkeypatch.setenv("ARCHIVE_DIR", str(archive_dir))
+    archive_service.archive_year(2023, today=date(2025, 1, 1))
+    index = json.loads((archive_dir / "2023" / "index.json").read_text())
+    assert len(index[str(user.id)]) == 1
+
+
+def test_pending_index_of_committed_run_is_published(archive_dir):
+    archive = VacationArchive(str(archive_dir))
+    archive.stage(2021, [(1, {"total": [2021, 20, 20], "vacations": []})])
+    assert not archive.is_archived(2021)
+
+    # Nothing left in the database for 2021, so the earlier run got as far as its commit
+    archive_service.archive_year(2021, today=date(2025, 1, 1))
+    assert archive.read(2021, 1)["total"] == [2021, 20, 20]
+    assert not archive.has_pending(2021)
+
+
+def test_archive_is_append_only(archive_dir):
+    archive = VacationArchive(str(archive_dir))
+    archive.append(2020, [(1, {"total": [2020, 20, 20], "vacations": []})])
+    size = os.path.getsize(archive_dir / "2020" / "vacations.jsonl.gz")
+
+    vacation = {"id": 9, "start_date": "2020-02-03", "end_date": "2020-02-03", "days_used": 1}
+    archive.append(2020, [(1, {"total": [2020, 20, 19], "vacations": [vacation]})])
+
+    assert os.path.getsize(archive_dir / "2020" / "vacations.jsonl.gz") > size
+    assert archive.read(2020, 1) == {"total": [2020, 20, 19], "vacations": [vacation]}
+    assert archive.read(2020, 2) is None
+
+
+def test_reads_include_archived_year(test_client, create_test_user, make_token):
+    user = create_test_user(email="reader@example.com")
+    _seed(user.id)
+    archive_service.archive_year(2023, today=date(2025, 1, 1))
+    headers = {"Authorization": f"Bearer {make_token(user.id)}"}
+
+    overview = test_client.get(f"/vacations/{user.id}", headers=headers).get_json()
+    assert [row["year"] for row in overview] == [2023, 2024]
+    assert overview[0]["used_days"] == 5
+
+    year = test_client.get(f"/vacations/{user.id}/2023", headers=headers).get_json()
+    assert year["days_left"] == 15
+    assert [v["start_date"] for v in year["vacations"]] == ["2023-03-06"]
+
+    used = test_client.get(f"/vacations/{user.id}/used?from=2023-01-01&to=2024-12-31", headers=headers).get_json()
+    assert used["days_used"] == 6
+
+    years = test_client.get(f"/vacations/{user.id}/years?from_year=2023&to_year=2024", headers=headers).get_json()
+    assert [block["year"] for block in years] == [2023, 2024]
+    assert years[0] == year
+
+    admin_headers = {"Authorization": f"Bearer {make_token(user.id, is_admin=True)}"}
+    report = test_client.get(f"/vacations/used?from=2023-01-01&to=2024-12-31&user_ids={user.id}", headers=admin_headers)
+    assert report.get_json()["users"][0]["days_used"] == 6
+
+
+def test_archived_year_rejects_new_totals(test_client, create_test_user, admin_token):
+    user = create_test_user(email="late@example.com")
+    archive_service.archive_year(2023, today=date(2025, 1, 1))
+
+    response = test_client.post(
+        "/vacations/totals",
+        json={"user_id": user.id, "year": 2023, "total_days": 20},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 409
+
+
+def test_archive_year_command(test_app, create_test_user):
+    user = create_test_user(email="cli@example.com")
+    _seed(user.id)
+
+    result = test_app.test_cli_runner().invoke(args=["archive-year", "2023"])
+    assert result.exit_code == 0
+    assert "1 totals and 1 vacations" in result.output
+
+
+def test_booking_detects_overlap_with_archived_year(test_client, create_test_user, admin_token):
+    user = create_test_user(email="boundary@example.com")
+    with SessionLocal() as session:
+        session.add_all([
+            VacationTotal(employee_id=user.id, year=2023, total_days=20, total_days_left=17),
+            VacationTotal(employee_id=user.id, year=2024, total_days=20, total_days_left=20),
+            # Fri 29 Dec 2023 - Wed 3 Jan 2024, belongs to 2023
+            VacationUsed(employee_id=user.id, start_date=date(2023, 12, 29), end_date=date(2024, 1, 3), days_used=4),
+        ])
+        session.commit()
+    archive_service.archive_year(2023, today=date(2025, 1, 1))
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    response = test_client.post(
+        "/vacations/vacation-used",
+        json={"user_id": user.id, "start_date": "2024-01-02", "end_date": "2024-01-05"},
+        headers=headers,
+    )
+    assert response.status_code == 400
+    assert response.get_json()["overlap_start"] == "2024-01-02"
+    assert response.get_json()["overlap_end"] == "2024-01-03"
+
+    response = test_client.post(
+        "/vacations/vacation-used",
+        json={"user_id": user.id, "start_date": "2024-01-04", "end_date": "2024-01-05"},
+        headers=headers,
+    )
+    assert response.status_code == 201
+
+    # Bookings can't start in the archived year at all
+    response = test_client.post(
+        "/vacations/vacation-used",
+        json={"user_id": user.id, "start_date": "2023-12-27", "end_date": "2023-12-27"},
+        headers=headers,
+    )
+    assert response.status_code == 409
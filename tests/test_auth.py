@@ -3,10 +3,11 @@ import json
 import csv
 import pytest
 from flask_jwt_extended import create_access_token, get_jti
-from utils.token_blacklist import blacklist
-from datetime import timedelta
+from utils.token_blacklist import blacklist, purge_expired_tokens
+from datetime import datetime, timedelta
 from db import SessionLocal
 from models.employee import Employee
+from models.revoked_token import RevokedToken
 
 
 def test_initialize_admin_success(test_client):
@@ -207,6 +208,23 @@ def test_logout_success(test_client, admin_user, test_app):
         jti = get_jti(token)
         assert jti in blacklist
 
+    with SessionLocal() as session:
+        assert session.get(RevokedToken, jti).expires_at is not None
+
+
+def test_purge_expired_revoked_tokens():
+    now = datetime.utcnow()
+    blacklist.add("expired", (now - timedelta(minutes=1) - datetime(1970, 1, 1)).total_seconds())
+    blacklist.add("valid", (now + timedelta(hours=1) - datetime(1970, 1, 1)).total_seconds())
+    with SessionLocal() as session:
+        session.add(RevokedToken(jti="legacy", revoked_at=now - timedelta(days=2)))
+        session.commit()
+
+    assert purge_expired_tokens(now) == 2
+    assert "valid" in blacklist
+    assert "expired" not in blacklist
+    assert "legacy" not in blacklist
+
 
 def test_logout_no_token(test_client):
     response = test_client.post("/auth/logout")
@@ -0,0 +1,100 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+from db import SessionLocal
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services import parallel_import, reconcile_service
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write_totals_csv(path, year, emails):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Vacation year", year])
+        writer.writerow(["Employee", "Total vacation days"])
+        for email in emails:
+            writer.writerow([email, 20])
+
+
+def test_split_upload_keeps_headers_and_groups_by_email(tmp_path):
+    emails = [f"user{i}@example.com" for i in range(50)] * 2
+    source = tmp_path / "totals.csv"
+    _write_totals_csv(source, 2026, emails)
+
+    with open(source, "rb") as stream:
+        paths = parallel_import.split_upload("vacation_totals", stream, 3, str(tmp_path))
+
+    seen = {}
+    for i, path in enumerate(paths):
+        rows = list(csv.reader(open(path, newline="")))
+        assert rows[:2] == [["Vacation year", "2026"], ["Employee", "Total vacation days"]]
+        for row in rows[2:]:
+            assert seen.setdefault(row[0], i) == i
+    assert sum(len(open(path).readlines()) - 2 for path in paths) == 100
+
+
+def test_merge_reports_adds_counts_and_joins_lists():
+    merged = parallel_import.merge_reports([
+        {"year": 2026, "created": 2, "skipped_not_found": ["a"], "skipped_existing": []},
+        {"year": 2026, "created": 3, "skipped_not_found": ["b"], "skipped_existing": ["c"]},
+    ])
+    assert merged == {"year": 2026, "created": 5, "skipped_not_found": ["a", "b"], "skipped_existing": ["c"]}
+
+
+def test_import_totals_command(test_app, create_test_user, tmp_path):
+    create_test_user(email="one@example.com")
+    source = tmp_path / "totals.csv"
+    _write_totals_csv(source, 2026, ["one@example.com", "missing@example.com"])
+
+    result = test_app.test_cli_runner().invoke(args=["import-totals", str(source)])
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert report["created"] == 1
+    assert report["skipped_not_found"] == ["missing@example.com"]
+
+
+def test_import_users_with_process_pool(tmp_path):
+    # Worker processes need a database file they can all open
+    source = tmp_path / "users.csv"
+    with open(source, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Employee Email", "Employee Password"])
+        for i in range(40):
+            writer.writerow([f"pool{i}@example.com", "secret"])
+
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'pool.db'}", PYTHONPATH=ROOT)
+    setup = "from db import Base, get_engine; import models; Base.metadata.create_all(get_engine())"
+    subprocess.run([sys.executable, "-c", setup], cwd=ROOT, env=env, check=True, timeout=60)
+
+    result = subprocess.run(
+        [sys.executable, "-m", "flask", "--app", "main", "import-users", str(source), "--workers", "3", "--chunk-size", "5"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report["created"] == 40
+    assert report["duplicates_skipped"] == 0
+
+
+def test_reconcile_finds_and_fixes_drift(test_app, create_test_user):
+    user = create_test_user(email="drift@example.com")
+    with SessionLocal() as session:
+        session.add(VacationTotal(employee_id=user.id, year=2025, total_days=20, total_days_left=20))
+        session.add(VacationTotal(employee_id=user.id, year=2026, total_days=20, total_days_left=20))
+        session.add(VacationUsed(employee_id=user.id, start_date=date(2025, 3, 3), end_date=date(2025, 3, 5), days_used=3))
+        session.commit()
+
+    mismatches = reconcile_service.find_mismatches()
+    assert [(m["year"], m["total_days_left"], m["expected"]) for m in mismatches] == [(2025, 20, 17)]
+
+    result = test_app.test_cli_runner().invoke(args=["reconcile", "--fix"])
+    assert result.exit_code == 0
+    assert "Fixed 1" in result.output
+    assert reconcile_service.find_mismatches() == []
@@ -0,0 +1,87 @@
+import gzip
+import json
+import zlib
+from datetime import date, timedelta
+from werkzeug.http import parse_accept_header
+from db import SessionLocal
+from models.employee import Employee
+from models.vacation_used import VacationUsed
+from services import export_service
+from utils.compression import choose_encoding
+
+
+def _seed_users(count):
+    with SessionLocal() as session:
+        session.execute(
+            Employee.__table__.insert(),
+            [{"email": f"remote{i}@example.com", "password_hash": "x", "is_admin": False} for i in range(count)]
+        )
+        session.commit()
+
+
+def test_large_json_is_gzipped_when_accepted(test_client, admin_token):
+    _seed_users(200)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    plain = test_client.get("/users/", headers=headers)
+    compressed = test_client.get("/users/", headers={**headers, "Accept-Encoding": "gzip, deflate"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert int(compressed.headers["Content-Length"]) < len(plain.data) / 4
+    assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+
+
+def test_small_and_refused_responses_stay_plain(test_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    # Below COMPRESSION_MIN_SIZE
+    response = test_client.get("/users/me", headers={**headers, "Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json()["is_admin"] is True
+
+    _seed_users(200)
+    response = test_client.get("/users/", headers={**headers, "Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_export_is_compressed_chunk_by_chunk(test_client, admin_token, create_test_user, monkeypatch):
+    user = create_test_user(email="stream@example.com")
+    with SessionLocal() as session:
+        first = date(2020, 1, 1)
+        session.execute(VacationUsed.__table__.insert(), [
+            {"employee_id": user.id, "start_date": first + timedelta(days=i), "end_date": first + timedelta(days=i), "days_used": 1}
+            for i in range(3000)
+        ])
+        session.commit()
+    monkeypatch.setattr(export_service, "EXPORT_CHUNK_BYTES", 4096)
+
+    response = test_client.get(
+        "/vacations/export",
+        headers={"Authorization": f"Bearer {admin_token}", "Accept-Encoding": "gzip"},
+        buffered=False
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+
+    # Every compressed chunk decodes on its own, the client sees rows before the export ends
+    decoder = zlib.decompressobj(31)
+    chunks = list(response.response)
+    first_rows = decoder.decompress(chunks[0]).decode("utf-8")
+    assert first_rows.startswith("Employee,")
+    text = first_rows + b"".join(decoder.decompress(chunk) for chunk in chunks[1:]).decode("utf-8")
+    response.close()
+
+    assert len(chunks) > 10
+    assert len(text.splitlines()) == 3001
+
+
+def test_choose_encoding_follows_client_then_server_preference():
+    available = ["zstd", "br", "gzip"]
+
+    assert choose_encoding(parse_accept_header("gzip, br"), available) == "br"
+    assert choose_encoding(parse_accept_header("gzip, br;q=0.5"), available) == "gzip"
+    assert choose_encoding(parse_accept_header("*"), ["gzip"]) == "gzip"
+    assert choose_encoding(parse_accept_header("deflate"), available) is None
+    assert choose_encoding(parse_accept_header("gzip"), []) is None
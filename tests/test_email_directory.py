@@ -0,0 +1,104 @@
+import io
+from sqlalchemy import event, text
+from db import SessionLocal, get_engine
+from models.vacation_total import VacationTotal
+from utils import email_directory
+from utils.email_directory import resolve_emails
+
+
+def _count_selects():
+    statements = []
+
+    def before(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", before)
+    return statements, lambda: event.remove(get_engine(), "before_cursor_execute", before)
+
+
+def test_login_and_register_ignore_email_case(test_client, create_test_user, admin_token):
+    create_test_user(email="mixed@example.com", password="secret")
+
+    response = test_client.post("/auth/login", json={"email": "Mixed@Example.COM", "password": "secret"})
+    assert response.status_code == 200
+
+    response = test_client.post(
+        "/auth/register",
+        json={"email": "MIXED@example.com", "password": "123"},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 409
+
+
+def test_register_again_after_delete(test_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    user_id = test_client.post("/auth/register", json={"email": "Kept@example.com", "password": "1"}, headers=headers).get_json()["id"]
+    assert test_client.delete(f"/users/{user_id}", headers=headers).status_code == 200
+
+    # Same address can be registered again right away
+    response = test_client.post("/auth/register", json={"email": "kept@example.com", "password": "1"}, headers=headers)
+    assert response.status_code == 201
+
+
+def test_resolve_emails_one_query_per_chunk(create_test_user, monkeypatch):
+    first = create_test_user(email="first@example.com")
+    second = create_test_user(email="second@example.com")
+    monkeypatch.setattr(email_directory, "RESOLVE_CHUNK", 2)
+    statements, stop = _count_selects()
+
+    try:
+        with SessionLocal() as session:
+            ids = resolve_emails(session, ["First@example.com", "second@example.com", "nobody@example.com", "", None])
+    finally:
+        stop()
+
+    assert ids == {"first@example.com": first.id, "second@example.com": second.id}
+    assert len(statements) == 2
+
+
+def test_imports_match_emails_case_insensitively(test_client, create_test_user, admin_token):
+    user = create_test_user(email="case@example.com")
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    users_csv = "Employee Email,Employee Password\nCASE@example.com,x\nnew@example.com,x\nNEW@example.com,x\n"
+    report = test_client.post(
+        "/auth/register",
+        data={"file": (io.BytesIO(users_csv.encode()), "users.csv")},
+        headers=headers,
+        content_type="multipart/form-data"
+    ).get_json()
+    assert report["created"] == 1
+    assert report["duplicates_skipped"] == 2
+
+    totals_csv = "Vacation year,2025\nEmployee,Total vacation days\nCase@Example.com,20\n"
+    report = test_client.post(
+        "/vacations/totals",
+        data={"file": (io.BytesIO(totals_csv.encode()), "totals.csv")},
+        headers=headers,
+        content_type="multipart/form-data"
+    ).get_json()
+    assert report["created"] == 1
+
+    with SessionLocal() as session:
+        assert session.query(VacationTotal).filter_by(employee_id=user.id, year=2025).count() == 1
+
+
+def test_employee_deleted_elsewhere_is_not_resolved(test_client, create_test_user, admin_token):
+    user = create_test_user(email="gone@example.com")
+
+    # Deleted behind the app's back, e.g. by another worker
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM employees WHERE id = :id"), {"id": user.id})
+        session.commit()
+
+    totals_csv = "Vacation year,2025\nEmployee,Total vacation days\ngone@example.com,20\n"
+    response = test_client.post(
+        "/vacations/totals",
+        data={"file": (io.BytesIO(totals_csv.encode()), "totals.csv")},
+        headers={"Authorization": f"Bearer {admin_token}"},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 201
+    assert response.get_json()["skipped_not_found"] == ["gone@example.com"]
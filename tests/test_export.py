@@ -0,0 +1,139 @@
+import csv
+import io
+import json
+import tracemalloc
+from datetime import date, timedelta
+from sqlalchemy import event
+from db import SessionLocal, get_engine
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services import archive_service, export_service
+
+
+# One single-day vacation per calendar day from Jan 1st of `year` (+ offset days), no overlaps
+def _seed_vacations(user_id, count, year=2024, offset=0):
+    with SessionLocal() as session:
+        first = date(year, 1, 1) + timedelta(days=offset)
+        session.execute(
+            VacationUsed.__table__.insert(),
+            [
+                {"employee_id": user_id, "start_date": first + timedelta(days=i), "end_date": first + timedelta(days=i), "days_used": 1}
+                for i in range(count)
+            ]
+        )
+        session.commit()
+
+
+def test_export_csv_can_be_imported_again(test_client, admin_token, create_test_user):
+    user = create_test_user(email="exp@example.com")
+    _seed_vacations(user.id, 3)
+
+    response = test_client.get("/vacations/export", headers={"Authorization": f"Bearer {admin_token}"})
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == export_service.CSV_HEADER
+    assert rows[1] == ["exp@example.com", "2024-01-01", "2024-01-01", "1"]
+    assert len(rows) == 4
+
+
+def test_export_ndjson_with_filters(test_client, admin_token, create_test_user):
+    first = create_test_user(email="first@example.com")
+    second = create_test_user(email="second@example.com")
+    _seed_vacations(first.id, 2, year=2023)
+    _seed_vacations(first.id, 2, year=2024)
+    _seed_vacations(second.id, 2, year=2024)
+
+    response = test_client.get(
+        f"/vacations/export?format=ndjson&year=2024&user_id={first.id}",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(records) == 2
+    assert {record["email"] for record in records} == {"first@example.com"}
+    assert all(record["start_date"].startswith("2024") for record in records)
+
+
+def test_export_rejects_bad_params(test_client, admin_token, make_token, create_test_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    assert test_client.get("/vacations/export?format=xml", headers=headers).status_code == 400
+    assert test_client.get("/vacations/export?year=abc", headers=headers).status_code == 400
+
+    user = create_test_user(email="plain@example.com")
+    response = test_client.get("/vacations/export", headers={"Authorization": f"Bearer {make_token(user.id)}"})
+    assert response.status_code == 403
+
+
+def test_export_includes_archived_years(tmp_path, monkeypatch, create_test_user):
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path))
+    user = create_test_user(email="old@example.com")
+    with SessionLocal() as session:
+        session.add(VacationTotal(employee_id=user.id, year=2022, total_days=20, total_days_left=19))
+        session.commit()
+    _seed_vacations(user.id, 1, year=2022)
+    _seed_vacations(user.id, 1, year=2024)
+    archive_service.archive_year(2022, today=date(2025, 1, 1))
+
+    rows = list(export_service.iter_vacations())
+
+    assert rows == [
+        ("old@example.com", "2022-01-01", "2022-01-01", 1),
+        ("old@example.com", "2024-01-01", "2024-01-01", 1),
+    ]
+
+
+def test_export_looks_up_archived_emails_per_chunk(tmp_path, monkeypatch, create_test_user):
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path))
+    users = [create_test_user(email=f"arch{i}@example.com") for i in range(3)]
+    for i, user in enumerate(users):
+        _seed_vacations(user.id, 1, year=2022, offset=i)
+    archive_service.archive_year(2022, today=date(2025, 1, 1))
+
+    monkeypatch.setattr(export_service, "RESOLVE_CHUNK", 2)
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "FROM employees" in statement:
+            statements.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", count)
+    try:
+        rows = list(export_service.iter_vacations(year=2022))
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", count)
+
+    assert [row[0] for row in rows] == ["arch0@example.com", "arch1@example.com", "arch2@example.com"]
+    assert len(statements) == 2
+
+
+def _peak_export_memory():
+    tracemalloc.start()
+    for _ in export_service.export_vacations("ndjson"):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def test_export_memory_does_not_grow_with_rows(create_test_user):
+    user = create_test_user(email="many@example.com")
+    _seed_vacations(user.id, 5000)
+    _peak_export_memory()  # warm up statement caches
+
+    small_peak = _peak_export_memory()
+    _seed_vacations(user.id, 15000, offset=5000)
+    large_peak = _peak_export_memory()
+
+    assert large_peak < small_peak * 1.5
+
+
+def test_export_vacations_command(test_app, create_test_user):
+    user = create_test_user(email="cli@example.com")
+    _seed_vacations(user.id, 2)
+
+    result = test_app.test_cli_runner().invoke(args=["export-vacations", "--format", "ndjson"])
+
+    assert result.exit_code == 0
+    assert len(result.output.splitlines()) == 2
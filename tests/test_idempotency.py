@@ -0,0 +1,125 @@
+import io
+from datetime import datetime, timedelta
+from db import SessionLocal
+from models.idempotency_key import IdempotencyKey
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services import import_service
+
+
+def _book(test_client, token, user_id, key, start="2025-03-03", end="2025-03-07"):
+    return test_client.post(
+        "/vacations/vacation-used",
+        json={"user_id": user_id, "start_date": start, "end_date": end},
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": key}
+    )
+
+
+def _seed_total(user_id):
+    with SessionLocal() as session:
+        session.add(VacationTotal(employee_id=user_id, year=2025, total_days=20, total_days_left=20))
+        session.commit()
+
+
+def test_retried_booking_is_replayed_not_deducted_twice(test_client, create_test_user, admin_token):
+    user = create_test_user(email="retry@example.com")
+    _seed_total(user.id)
+
+    first = _book(test_client, admin_token, user.id, "booking-1")
+    second = _book(test_client, admin_token, user.id, "booking-1")
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == first.get_json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+
+    with SessionLocal() as session:
+        assert session.query(VacationUsed).count() == 1
+        assert session.query(VacationTotal).one().total_days_left == 15
+
+
+def test_retried_import_does_not_run_again(test_client, admin_token, monkeypatch):
+    calls = []
+    real_import = import_service.import_users
+
+    def counting_import(stream, *args, **kwargs):
+        calls.append(1)
+        return real_import(stream, *args, **kwargs)
+
+    monkeypatch.setattr(import_service, "import_users", counting_import)
+    content = b"Employee Email,Employee Password\nbulk1@example.com,x\nbulk2@example.com,x\n"
+
+    responses = [
+        test_client.post(
+            "/auth/register",
+            data={"file": (io.BytesIO(content), "users.csv")},
+            headers={"Authorization": f"Bearer {admin_token}", "Idempotency-Key": "users-upload"},
+            content_type="multipart/form-data"
+        )
+        for _ in range(2)
+    ]
+
+    assert len(calls) == 1
+    assert [r.status_code for r in responses] == [201, 201]
+    assert responses[1].get_json()["created"] == 2
+
+
+def test_key_reused_for_other_request_or_user(test_client, create_test_user, admin_token, make_token):
+    user = create_test_user(email="reuse@example.com")
+    _seed_total(user.id)
+    assert _book(test_client, admin_token, user.id, "same-key").status_code == 201
+
+    # Same key, different body -> refused, nothing booked
+    response = _book(test_client, admin_token, user.id, "same-key", start="2025-04-07", end="2025-04-08")
+    assert response.status_code == 422
+
+    # Keys are per user, another admin's "same-key" is a new request
+    other_admin = create_test_user(email="otheradmin@example.com", is_admin=True)
+    response = _book(test_client, make_token(other_admin.id, is_admin=True), user.id, "same-key", start="2025-04-07", end="2025-04-08")
+    assert response.status_code == 201
+
+
+def test_in_progress_expired_and_retryable_responses(test_client, create_test_user, admin_token):
+    user = create_test_user(email="states@example.com")
+
+    # No total yet -> 400 is the real answer and gets replayed
+    assert _book(test_client, admin_token, user.id, "no-total").status_code == 400
+    _seed_total(user.id)
+    assert _book(test_client, admin_token, user.id, "no-total").status_code == 400
+
+    # A first request still running blocks the retry
+    with SessionLocal() as session:
+        record = session.query(IdempotencyKey).one()
+        record.status_code = None
+        session.commit()
+    response = _book(test_client, admin_token, user.id, "no-total")
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+
+    # Past its TTL the key is free again and the request runs
+    with SessionLocal() as session:
+        record = session.query(IdempotencyKey).one()
+        record.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        session.commit()
+    assert _book(test_client, admin_token, user.id, "no-total").status_code == 201
+
+
+def test_requests_without_key_or_user_are_untouched(test_client, create_test_user, admin_token, test_app):
+    user = create_test_user(email="plainlogin@example.com", password="pw")
+    _seed_total(user.id)
+
+    response = test_client.post("/auth/login", json={"email": "plainlogin@example.com", "password": "pw"}, headers={"Idempotency-Key": "login"})
+    assert response.status_code == 200
+    test_client.post(
+        "/vacations/vacation-used",
+        json={"user_id": user.id, "start_date": "2025-03-03", "end_date": "2025-03-03"},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+
+    with SessionLocal() as session:
+        assert session.query(IdempotencyKey).count() == 0
+        session.add(IdempotencyKey(key="old", request_hash="x", status_code=200, expires_at=datetime.utcnow() - timedelta(days=1)))
+        session.commit()
+
+    result = test_app.test_cli_runner().invoke(args=["purge-idempotency-keys"])
+    assert "Deleted 1 expired idempotency keys" in result.output
@@ -0,0 +1,234 @@
+import io
+import csv
+import gzip
+import json
+import tracemalloc
+import pytest
+from datetime import date
+from db import SessionLocal
+from models.employee import Employee
+from models.import_checkpoint import ImportCheckpoint
+from models.vacation_total import VacationTotal
+from services import import_service
+from utils import upload_streams
+from utils.upload_streams import decompressed
+from utils.csv_decoding import DateDecoder, sniff_date_format, decode_used_rows
+
+
+def _seed_employees(count):
+    with SessionLocal() as session:
+        session.execute(
+            Employee.__table__.insert(),
+            [{"email": f"bulk{i}@example.com", "password_hash": "x", "is_admin": False} for i in range(count)]
+        )
+        session.commit()
+
+
+def _totals_csv_bytes(year, count):
+    csv_data = io.StringIO()
+    writer = csv.writer(csv_data)
+    writer.writerow(["Year", year])
+    writer.writerow(["Employee", "Total vacation days"])
+    for i in range(count):
+        writer.writerow([f"bulk{i}@example.com", 20])
+    return csv_data.getvalue().encode("utf-8")
+
+
+def test_import_resumes_from_checkpoint(test_client, make_token, admin_user):
+    _seed_employees(500)
+    content = _totals_csv_bytes(2025, 500)
+
+    def fail_at_row_300(processed):
+        if processed == 300:
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        import_service.import_vacation_totals(io.BytesIO(content), progress=fail_at_row_300, chunk_size=100)
+
+    with SessionLocal() as session:
+        checkpoint = session.query(ImportCheckpoint).filter_by(kind="vacation_totals").one()
+        assert checkpoint.row_offset == 200
+        assert checkpoint.file_hash == import_service.file_hash(io.BytesIO(content))
+        assert session.query(VacationTotal).count() == 200
+
+    # Re-upload of the same file continues after row 200
+    token = make_token(user_id=admin_user.id, is_admin=True)
+    response = test_client.post(
+        "/vacations/totals",
+        data={"file": (io.BytesIO(content), "totals.csv")},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data["created"] == 500
+    assert data["skipped_existing"] == []
+
+    with SessionLocal() as session:
+        assert session.query(VacationTotal).count() == 500
+        assert session.query(ImportCheckpoint).count() == 0
+
+
+def test_completed_import_leaves_no_checkpoint():
+    _seed_employees(3)
+    report = import_service.import_vacation_totals(io.BytesIO(_totals_csv_bytes(2025, 3)), chunk_size=2)
+    assert report["created"] == 3
+
+    with SessionLocal() as session:
+        assert session.query(ImportCheckpoint).count() == 0
+
+
+def _peak_import_memory(year, rows):
+    content = _totals_csv_bytes(year, rows)
+    tracemalloc.start()
+    import_service.import_vacation_totals(io.BytesIO(content), chunk_size=100)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - len(content)
+
+
+def test_import_peak_memory_is_bounded():
+    _seed_employees(3000)
+
+    # Warm up statement caches so they don't count against the first run
+    _peak_import_memory(2023, 3000)
+
+    small_peak = _peak_import_memory(2024, 1000)
+    large_peak = _peak_import_memory(2025, 3000)
+
+    # Three times the rows must not mean three times the memory
+    assert large_peak < small_peak * 1.5
+
+
+# ----------------------------
+# Typed CSV decoding
+# ----------------------------
+
+def test_sniff_date_format():
+    assert sniff_date_format(["2019-08-30", "2019-09-11"]) == "%Y-%m-%d"
+    assert sniff_date_format(["Friday, August 30, 2019", "Wednesday, September 11, 2019"]) == "%A, %B %d, %Y"
+    assert sniff_date_format(["13.01.2020", "02.03.2020", "garbage"]) == "%d.%m.%Y"
+    assert sniff_date_format(["next tuesday"]) is None
+
+
+def test_date_decoder_falls_back_for_outliers():
+    decoder = DateDecoder("%A, %B %d, %Y")
+    assert decoder("Friday, August 30, 2019") == date(2019, 8, 30)
+    assert decoder(" 2019-09-11 ") == date(2019, 9, 11)
+    assert decoder.fallbacks == 1
+
+    with pytest.raises(ValueError):
+        decoder("not a date")
+
+
+def test_decode_used_rows_marks_bad_rows():
+    decoder = DateDecoder("%Y-%m-%d")
+    rows = [["a@example.com ", "2025-07-01", "2025-07-04"], ["b@example.com", "soon"], []]
+    assert decode_used_rows(rows, decoder) == [("a@example.com", date(2025, 7, 1), date(2025, 7, 4)), None, None]
+
+
+def test_import_vacation_used_readme_dates(test_client, create_test_user, make_token, admin_user, db_session):
+    user = create_test_user(email="dates@example.com")
+    db_session.add(VacationTotal(employee_id=user.id, year=2019, total_days=20, total_days_left=20))
+    db_session.commit()
+
+    csv_content = (
+        "Employee,Vacation start date,Vacation end date\n"
+        'dates@example.com,"Friday, August 30, 2019","Wednesday, September 11, 2019"\n'
+        'dates@example.com,"Thursday, October 24, 2019","Thursday, October 24, 2019"\n'
+        "dates@example.com,2019-11-22,2019-11-22\n"
+        "dates@example.com,someday,2019-11-22\n"
+    )
+    token = make_token(user_id=admin_user.id, is_admin=True)
+    response = test_client.post(
+        "/vacations/vacation-used",
+        data={"file": (io.BytesIO(csv_content.encode("utf-8")), "used.csv")},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 201
+    assert response.get_json()["created"] == 3
+
+    db_session.expire_all()
+    vt = db_session.query(VacationTotal).filter_by(employee_id=user.id, year=2019).one()
+    assert vt.total_days_left == 20 - 9 - 1 - 1
+
+
+# ----------------------------
+# Compressed and NDJSON uploads
+# ----------------------------
+
+def _upload(test_client, url, content, filename, token):
+    return test_client.post(
+        url,
+        data={"file": (io.BytesIO(content), filename)},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+def test_gzip_csv_totals_upload(test_client, create_test_user, make_token, admin_user):
+    user = create_test_user(email="gz@example.com")
+    token = make_token(user_id=admin_user.id, is_admin=True)
+
+    content = gzip.compress(f"Year,2025\nEmployee,Total vacation days\n{user.email},21\n".encode("utf-8"))
+    response = _upload(test_client, "/vacations/totals", content, "totals.csv.gz", token)
+    assert response.status_code == 201
+    assert response.get_json() == {"year": 2025, "created": 1, "skipped_not_found": [], "skipped_existing": []}
+
+
+def test_ndjson_totals_and_used_upload(test_client, create_test_user, make_token, admin_user):
+    user = create_test_user(email="nd@example.com")
+    token = make_token(user_id=admin_user.id, is_admin=True)
+
+    totals = "\n".join([
+        json.dumps({"year": 2025}),
+        json.dumps({"email": user.email, "total_days": 20}),
+        json.dumps({"email": "nobody@example.com", "total_days": 20}),
+    ])
+    response = _upload(test_client, "/vacations/totals", totals.encode("utf-8"), "totals.ndjson", token)
+    assert response.status_code == 201
+    assert response.get_json()["skipped_not_found"] == ["nobody@example.com"]
+
+    used = "\n".join([
+        json.dumps({"email": user.email, "start_date": "2025-07-01", "end_date": "2025-07-04"}),
+        "not json",
+        "",
+        json.dumps({"email": user.email, "start_date": "2025-07-02"}),
+    ])
+    response = _upload(test_client, "/vacations/vacation-used", gzip.compress(used.encode("utf-8")), "used.ndjson.gz", token)
+    assert response.status_code == 201
+    assert response.get_json()["created"] == 1
+
+
+def test_gzip_ndjson_users_upload(test_client, make_token, admin_user):
+    token = make_token(user_id=admin_user.id, is_admin=True)
+
+    users = "\n".join([
+        json.dumps({"email": "one@example.com", "password": "pass", "is_admin": True}),
+        json.dumps({"email": admin_user.email, "password": "pass"}),
+    ])
+    response = _upload(test_client, "/auth/register", gzip.compress(users.encode("utf-8")), "users.ndjson.gz", token)
+    assert response.status_code == 201
+    assert response.get_json() == {"message": "Bulk import completed", "created": 1, "duplicates_skipped": 1}
+
+
+def test_truncated_gzip_upload_returns_400(test_client, make_token, admin_user):
+    _seed_employees(300)
+    token = make_token(user_id=admin_user.id, is_admin=True)
+    content = gzip.compress(_totals_csv_bytes(2025, 300))
+
+    response = _upload(test_client, "/vacations/totals", content[:len(content) // 2], "totals.csv.gz", token)
+    assert response.status_code == 400
+    assert "truncated or corrupt" in response.get_json()["error"]
+
+
+def test_gzip_upload_is_streamed():
+    stream = io.BytesIO(gzip.compress(b"Year,2025\n"))
+    assert isinstance(decompressed(stream), gzip.GzipFile)
+
+
+@pytest.mark.skipif(upload_streams.zstandard is not None, reason="zstandard is installed")
+def test_zstd_upload_without_zstandard(test_client, make_token, admin_user):
+    token = make_token(user_id=admin_user.id, is_admin=True)
+    content = upload_streams.ZSTD_MAGIC + b"\x00" * 16
+    response = _upload(test_client, "/vacations/totals", content, "totals.csv.zst", token)
+    assert response.status_code == 400
+    assert "zstandard" in response.get_json()["error"]
@@ -0,0 +1,181 @@
+import io
+import csv
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from models.import_job import ImportJob
+from models.vacation_total import VacationTotal
+from services import jobs_service
+
+
+def _totals_csv(year, rows):
+    csv_data = io.StringIO()
+    writer = csv.writer(csv_data)
+    writer.writerow(["Year", year])
+    writer.writerow(["Employee", "Total vacation days"])
+    for row in rows:
+        writer.writerow(row)
+    return io.BytesIO(csv_data.getvalue().encode("utf-8"))
+
+
+def test_async_import_returns_job(test_client, create_test_user, make_token, admin_user, db_session):
+    user = create_test_user(email="async@example.com")
+    token = make_token(user_id=admin_user.id, is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = test_client.post(
+        "/vacations/totals?async=true",
+        data={"file": (_totals_csv("2025", [[user.email, 20], ["missing@example.com", 10]]), "totals.csv")},
+        headers=headers
+    )
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data["status"] == "queued"
+    assert data["status_url"] == f"/jobs/{data['job_id']}"
+
+    response = test_client.get(data["status_url"], headers=headers)
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job["kind"] == "vacation_totals"
+    assert job["status"] == "succeeded"
+    assert job["rows_processed"] == 2
+    assert job["result"] == {
+        "year": 2025,
+        "created": 1,
+        "skipped_not_found": ["missing@example.com"],
+        "skipped_existing": []
+    }
+    assert db_session.query(VacationTotal).filter_by(employee_id=user.id, year=2025).count() == 1
+
+
+def test_async_import_users_form_flag(test_client, make_token, admin_user):
+    token = make_token(user_id=admin_user.id, is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    csv_content = "Employee Email,Employee Password\nnew@example.com,pass\n"
+    response = test_client.post(
+        "/auth/register",
+        data={"file": (io.BytesIO(csv_content.encode("utf-8")), "users.csv"), "async": "1"},
+        headers=headers
+    )
+    assert response.status_code == 202
+
+    job = test_client.get(f"/jobs/{response.get_json()['job_id']}", headers=headers).get_json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"message": "Bulk import completed", "created": 1, "duplicates_skipped": 0}
+
+
+def test_async_import_failure_is_reported(test_client, make_token, admin_user):
+    token = make_token(user_id=admin_user.id, is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = test_client.post(
+        "/vacations/totals?async=true",
+        data={"file": (_totals_csv("not-a-year", []), "totals.csv")},
+        headers=headers
+    )
+    assert response.status_code == 202
+
+    job = test_client.get(f"/jobs/{response.get_json()['job_id']}", headers=headers).get_json()
+    assert job["status"] == "failed"
+    assert job["result"] is None
+    assert job["error"]
+
+
+def test_get_job_not_found(test_client, make_token, admin_user):
+    token = make_token(user_id=admin_user.id, is_admin=True)
+    response = test_client.get("/jobs/does-not-exist", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+    assert response.get_json()["error"] == "Job not found"
+
+
+def test_get_job_requires_admin(test_client, create_test_user, make_token):
+    user = create_test_user(email="plain@example.com")
+    token = make_token(user_id=user.id, is_admin=False)
+    response = test_client.get("/jobs/anything", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+
+def _stale_job(db_session, job_id, kind, status="running", minutes=30):
+    when = datetime.utcnow() - timedelta(minutes=minutes)
+    db_session.add(ImportJob(id=job_id, kind=kind, status=status, rows_processed=0, created_at=when, updated_at=when))
+    db_session.commit()
+
+
+def test_dead_job_is_requeued_and_finished_by_worker(create_test_user, db_session, tmp_path, monkeypatch):
+    monkeypatch.setenv("IMPORT_UPLOAD_DIR", str(tmp_path))
+    user = create_test_user(email="recover@example.com")
+    _stale_job(db_session, "dead-job", "vacation_totals")
+    (tmp_path / "dead-job.upload").write_bytes(_totals_csv("2025", [[user.email, 20]]).getvalue())
+
+    report = jobs_service.recover_jobs()
+    assert report["requeued"] == ["dead-job"]
+    assert report["failed"] == []
+
+    jobs_service.run_worker(once=True)
+
+    db_session.expire_all()
+    job = db_session.get(ImportJob, "dead-job")
+    assert job.status == "succeeded"
+    assert json.loads(job.result)["created"] == 1
+    assert not (tmp_path / "dead-job.upload").exists()
+
+
+def test_dead_job_without_upload_fails(db_session, tmp_path, monkeypatch):
+    monkeypatch.setenv("IMPORT_UPLOAD_DIR", str(tmp_path))
+    _stale_job(db_session, "lost-job", "users")
+
+    report = jobs_service.recover_jobs()
+    assert report["failed"] == ["lost-job"]
+
+    db_session.expire_all()
+    job = db_session.get(ImportJob, "lost-job")
+    assert job.status == "failed"
+    assert "upload" in job.error
+
+
+def test_recovery_leaves_live_jobs_and_removes_orphaned_uploads(db_session, tmp_path, monkeypatch):
+    monkeypatch.setenv("IMPORT_UPLOAD_DIR", str(tmp_path))
+    # Heartbeat a minute ago, still alive
+    _stale_job(db_session, "live-job", "users", minutes=1)
+    _stale_job(db_session, "done-job", "users", status="succeeded")
+    old = time.time() - 3600
+    for name in ["live-job", "done-job", "no-job"]:
+        path = tmp_path / f"{name}.upload"
+        path.write_bytes(b"x")
+        os.utime(path, (old, old))
+    # Just saved, its job row may not be committed yet
+    (tmp_path / "fresh.upload").write_bytes(b"x")
+
+    report = jobs_service.recover_jobs()
+    assert report == {"requeued": [], "failed": [], "removed_uploads": 2}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["fresh.upload", "live-job.upload"]
+
+    db_session.expire_all()
+    assert db_session.get(ImportJob, "live-job").status == "running"
+
+
+def test_worker_runner_only_queues(test_client, create_test_user, make_token, admin_user, db_session, tmp_path, monkeypatch):
+    monkeypatch.setenv("IMPORT_UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setenv("IMPORT_JOB_RUNNER", "worker")
+    monkeypatch.setitem(test_client.application.config, "IMPORT_JOB_STARTER", jobs_service.default_job_starter())
+    user = create_test_user(email="queued@example.com")
+    token = make_token(user_id=admin_user.id, is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = test_client.post(
+        "/vacations/totals?async=true",
+        data={"file": (_totals_csv("2025", [[user.email, 20]]), "totals.csv")},
+        headers=headers
+    )
+    job_id = response.get_json()["job_id"]
+    assert test_client.get(f"/jobs/{job_id}", headers=headers).get_json()["status"] == "queued"
+
+    jobs_service.run_worker(once=True)
+
+    job = test_client.get(f"/jobs/{job_id}", headers=headers).get_json()
+    assert job["status"] == "succeeded"
+    assert job["result"]["created"] == 1
+    # A second claim of the same job is refused
+    assert jobs_service.claim_job(job_id) is False
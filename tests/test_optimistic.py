@@ -0,0 +1,224 @@
+import io
+import pytest
+from datetime import date
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+import db
+from db import Base, SessionLocal, create_db_engine
+from db.optimistic import retry_on_stale
+from models.employee import Employee
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services import import_service, reconcile_service, rollover_service
+
+
+def test_retry_on_stale_backs_off_then_gives_up():
+    calls, sleeps = [], []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise StaleDataError("changed")
+        return "ok"
+
+    assert retry_on_stale(flaky, retries=3, backoff=0.1, sleep=sleeps.append) == "ok"
+    assert len(calls) == 3
+    # Exponential, jitter keeps each wait between half and full step
+    assert 0.05 <= sleeps[0] <= 0.1 and 0.1 <= sleeps[1] <= 0.2
+
+    def always_stale():
+        raise StaleDataError("changed")
+
+    with pytest.raises(StaleDataError):
+        retry_on_stale(always_stale, retries=2, backoff=0, sleep=sleeps.append)
+
+
+@pytest.fixture
+def file_engine(tmp_path, monkeypatch):
+    # In-memory SQLite is one connection per thread, the competing writer needs its own
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'optimistic.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(db, "_engine", engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def seeded_total(file_engine):
+    with SessionLocal() as session:
+        admin = Employee(email="admin@example.com", password_hash="x", is_admin=True)
+        user = Employee(email="racer@example.com", password_hash="x")
+        session.add_all([admin, user])
+        session.flush()
+        session.add(VacationTotal(employee_id=user.id, year=2025, total_days=20, total_days_left=20))
+        session.commit()
+        return admin.id, user.id
+
+
+# Another writer changes the row once, right before the request's own UPDATE is flushed
+@pytest.fixture
+def concurrent_edit(file_engine):
+    def edit(session, flush_context, instances):
+        if edits:
+            return
+        edits.append(1)
+        with file_engine.begin() as connection:
+            connection.execute(text(
+                "UPDATE vacation_totals SET total_days = total_days + 5, total_days_left = total_days_left + 5, version = version + 1"
+            ))
+
+    edits = []
+    event.listen(Session, "before_flush", edit)
+    yield edits
+    event.remove(Session, "before_flush", edit)
+
+
+def test_concurrent_total_edits_are_not_lost(test_client, make_token, seeded_total, concurrent_edit):
+    admin_id, user_id = seeded_total
+    headers = {"Authorization": f"Bearer {make_token(admin_id, is_admin=True)}"}
+
+    response = test_client.patch("/vacations/totals", json={"user_id": user_id, "year": 2025, "added_days": 3}, headers=headers)
+
+    assert response.status_code == 200
+    assert concurrent_edit == [1]
+    # 20 + 5 from the other writer + 3 from this request
+    assert response.get_json()["total_days"] == 28
+    with SessionLocal() as session:
+        total = session.query(VacationTotal).one()
+        assert (total.total_days, total.total_days_left, total.version) == (28, 28, 3)
+
+
+def test_booking_retries_after_concurrent_edit(test_client, make_token, seeded_total, concurrent_edit):
+    admin_id, user_id = seeded_total
+    headers = {"Authorization": f"Bearer {make_token(admin_id, is_admin=True)}"}
+
+    response = test_client.post(
+        "/vacations/vacation-used",
+        json={"user_id": user_id, "start_date": "2025-03-03", "end_date": "2025-03-07"},
+        headers=headers
+    )
+
+    assert response.status_code == 201
+    assert response.get_json()["days_left_now"] == 20 + 5 - 5
+
+
+def test_conflict_after_retries_returns_409(test_client, make_token, seeded_total, file_engine, monkeypatch):
+    admin_id, user_id = seeded_total
+    monkeypatch.setenv("STALE_RETRY_ATTEMPTS", "1")
+    monkeypatch.setenv("STALE_RETRY_BACKOFF", "0")
+
+    def always_edit(session, flush_context, instances):
+        with file_engine.begin() as connection:
+            connection.execute(text("UPDATE vacation_totals SET version = version + 1"))
+
+    event.listen(Session, "before_flush", always_edit)
+    try:
+        response = test_client.patch(
+            "/vacations/totals",
+            json={"user_id": user_id, "year": 2025, "added_days": 3},
+            headers={"Authorization": f"Bearer {make_token(admin_id, is_admin=True)}"}
+        )
+    finally:
+        event.remove(Session, "before_flush", always_edit)
+
+    assert response.status_code == 409
+
+
+def test_bulk_writers_keep_versions(create_test_user):
+    user = create_test_user(email="bulkversion@example.com")
+    rollover_service.rollover_year(2026, base_days=20, max_carry_over=0)
+
+    with SessionLocal() as session:
+        total = session.query(VacationTotal).filter_by(employee_id=user.id, year=2026).one()
+        assert total.version == 1
+        total.total_days_left = 7
+        session.commit()
+        assert total.version == 2
+
+    reconcile_service.reconcile(2026, fix=True)
+
+    with SessionLocal() as session:
+        total = session.query(VacationTotal).filter_by(employee_id=user.id, year=2026).one()
+        assert (total.total_days_left, total.version) == (20, 3)
+
+
+def _used_upload(test_client, token):
+    csv_content = (
+        "Employee,Vacation start date,Vacation end date\n"
+        "racer@example.com,2025-03-03,2025-03-07\n"
+        "racer@example.com,2025-04-07,2025-04-08\n"
+    )
+    return test_client.post(
+        "/vacations/vacation-used",
+        data={"file": (io.BytesIO(csv_content.encode("utf-8")), "used.csv")},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+def test_import_replays_chunk_after_concurrent_edit(test_client, make_token, seeded_total, concurrent_edit):
+    admin_id, user_id = seeded_total
+
+    # The edit lands on the first row's flush, the second row then flushes a stale total
+    response = _used_upload(test_client, make_token(admin_id, is_admin=True))
+
+    assert response.status_code == 201
+    assert concurrent_edit == [1]
+    assert response.get_json()["created"] == 2
+    with SessionLocal() as session:
+        assert session.query(VacationUsed).count() == 2
+        total = session.query(VacationTotal).one()
+        assert total.total_days_left == 20 + 5 - 5 - 2
+
+
+def test_import_conflict_after_retries_returns_409(test_client, make_token, seeded_total, file_engine, monkeypatch):
+    admin_id, user_id = seeded_total
+    monkeypatch.setenv("STALE_RETRY_ATTEMPTS", "1")
+    monkeypatch.setenv("STALE_RETRY_BACKOFF", "0")
+
+    # Every attempt: bumped on the first row's flush, before this transaction holds the write lock
+    def always_edit(session, flush_context, instances):
+        first_row = any(isinstance(obj, VacationUsed) for obj in session.new)
+        if first_row and not any(isinstance(obj, VacationTotal) for obj in session.dirty):
+            with file_engine.begin() as connection:
+                connection.execute(text("UPDATE vacation_totals SET version = version + 1"))
+
+    event.listen(Session, "before_flush", always_edit)
+    try:
+        response = _used_upload(test_client, make_token(admin_id, is_admin=True))
+    finally:
+        event.remove(Session, "before_flush", always_edit)
+
+    assert response.status_code == 409
+    assert response.get_json()["error"] == import_service.STALE_TOTAL_ERROR
+    with SessionLocal() as session:
+        assert session.query(VacationUsed).count() == 0
+        assert session.query(VacationTotal).one().total_days_left == 20
+
+
+def test_import_replays_chunk_after_concurrent_booking(test_client, make_token, seeded_total, file_engine):
+    admin_id, user_id = seeded_total
+
+    # A booking of the first row's dates commits after the import checked for overlaps
+    def book_same_dates(session, flush_context, instances):
+        if booked or not any(isinstance(obj, VacationUsed) for obj in session.new):
+            return
+        booked.append(1)
+        with file_engine.begin() as connection:
+            connection.execute(VacationUsed.__table__.insert().values(
+                employee_id=user_id, start_date=date(2025, 3, 3), end_date=date(2025, 3, 7), days_used=5
+            ))
+
+    booked = []
+    event.listen(Session, "before_flush", book_same_dates)
+    try:
+        response = _used_upload(test_client, make_token(admin_id, is_admin=True))
+    finally:
+        event.remove(Session, "before_flush", book_same_dates)
+
+    assert response.status_code == 201
+    data = response.get_json()
+    assert (data["created"], data["skipped_overlap"]) == (1, ["racer@example.com"])
+    with SessionLocal() as session:
+        assert session.query(VacationUsed).count() == 2
+        assert session.query(VacationTotal).one().total_days_left == 20 - 2
@@ -0,0 +1,86 @@
+import threading
+import pytest
+from datetime import date
+from sqlalchemy.exc import IntegrityError
+
+import db
+from db import Base, SessionLocal, create_db_engine
+from db.overlaps import is_overlap_violation
+from models.employee import Employee
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services import overlap_service
+from utils.workdays import workday_bounds
+
+
+def test_workday_bounds_trim_weekends():
+    # Sat 2025-01-04 .. Sat 2025-01-11 -> Mon 6th .. Fri 10th
+    assert workday_bounds(date(2025, 1, 4), date(2025, 1, 11)) == (date(2025, 1, 6), date(2025, 1, 10))
+    assert workday_bounds(date(2025, 1, 4), date(2025, 1, 5)) == (None, None)
+
+
+def test_database_rejects_overlapping_workdays(create_test_user):
+    user = create_test_user(email="dbcheck@example.com")
+    with SessionLocal() as session:
+        session.add(VacationUsed(employee_id=user.id, start_date=date(2025, 1, 6), end_date=date(2025, 1, 10), days_used=5))
+        # Only the weekend after is shared -> fine
+        session.add(VacationUsed(employee_id=user.id, start_date=date(2025, 1, 11), end_date=date(2025, 1, 12), days_used=0))
+        session.commit()
+
+        session.add(VacationUsed(employee_id=user.id, start_date=date(2025, 1, 10), end_date=date(2025, 1, 13), days_used=2))
+        with pytest.raises(IntegrityError) as error:
+            session.commit()
+        assert is_overlap_violation(error.value)
+
+
+@pytest.fixture
+def file_engine(tmp_path, monkeypatch):
+    # In-memory SQLite is one database per thread, concurrent bookings need a real file
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'overlaps.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(db, "_engine", engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("skip_app_check", [False, True])
+def test_concurrent_bookings_never_double_book(file_engine, test_client, make_token, monkeypatch, skip_app_check):
+    if skip_app_check:
+        # Only the database constraint is left to stop the race
+        monkeypatch.setattr(overlap_service, "find_overlap", lambda *args: None)
+
+    with SessionLocal() as session:
+        user = Employee(email="race@example.com", password_hash="x")
+        session.add(user)
+        session.flush()
+        session.add(VacationTotal(employee_id=user.id, year=2025, total_days=100, total_days_left=100))
+        session.commit()
+        user_id = user.id
+
+    headers = {"Authorization": f"Bearer {make_token(user_id, is_admin=True)}"}
+    # Every request overlaps every other one on Wed 2025-03-05
+    ranges = [("2025-03-03", "2025-03-05"), ("2025-03-05", "2025-03-07"), ("2025-03-04", "2025-03-06"), ("2025-03-05", "2025-03-05")] * 3
+
+    barrier = threading.Barrier(len(ranges))
+    statuses = []
+
+    def book(start, end):
+        barrier.wait()
+        response = test_client.post(
+            "/vacations/vacation-used",
+            json={"user_id": user_id, "start_date": start, "end_date": end},
+            headers=headers,
+        )
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=book, args=pair) for pair in ranges]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [201] + [400] * (len(ranges) - 1)
+    with SessionLocal() as session:
+        assert session.query(VacationUsed).count() == 1
+        booked = session.query(VacationUsed.days_used).scalar()
+        assert session.query(VacationTotal.total_days_left).scalar() == 100 - booked
@@ -0,0 +1,27 @@
+from datetime import date
+from db import get_engine
+from db import partitions
+
+
+def test_ensure_partitions_is_noop_on_sqlite():
+    with get_engine().begin() as connection:
+        assert partitions.is_partitioned(connection) is False
+        assert partitions.ensure_partitions(connection) == []
+
+
+def test_ensure_partitions_creates_missing_years(monkeypatch):
+    created = []
+    monkeypatch.setattr(partitions, "is_partitioned", lambda connection: True)
+    monkeypatch.setattr(partitions, "existing_partition_years", lambda connection: [2021, 2023, 2024])
+    monkeypatch.setattr(partitions, "create_year_partition", lambda connection, year: created.append(year))
+
+    result = partitions.ensure_partitions(None, years_ahead=2, today=date(2025, 3, 1))
+
+    assert result == [2022, 2025, 2026, 2027]
+    assert created == result
+
+
+def test_ensure_partitions_command(test_app):
+    result = test_app.test_cli_runner().invoke(args=["ensure-partitions", "--years-ahead", "1"])
+    assert result.exit_code == 0
+    assert "up to date" in result.output
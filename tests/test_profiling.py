@@ -0,0 +1,85 @@
+import os
+import pstats
+import pytest
+from utils.profiling import ProfileSettings
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path / "profiles"))
+    return tmp_path / "profiles"
+
+
+def _profiles(profile_dir):
+    return sorted(name for name in os.listdir(profile_dir) if name.endswith(".prof")) if profile_dir.exists() else []
+
+
+def test_admin_header_writes_pstats_file(test_client, admin_token, profile_dir):
+    response = test_client.get("/users/", headers={"Authorization": f"Bearer {admin_token}", "X-Profile": "1"})
+
+    assert response.status_code == 200
+    name = response.headers["X-Profile-File"]
+    assert _profiles(profile_dir) == [name]
+    assert "-GET-users-" in name
+
+    stats = pstats.Stats(str(profile_dir / name))
+    functions = {function for _, _, function in stats.stats}
+    assert "list_users" in functions
+
+
+def test_header_from_non_admin_is_ignored(test_client, create_test_user, make_token, profile_dir):
+    user = create_test_user(email="curious@example.com")
+
+    response = test_client.get("/users/me", headers={"Authorization": f"Bearer {make_token(user.id)}", "X-Profile": "1"})
+
+    assert response.status_code == 200
+    assert "X-Profile-File" not in response.headers
+    assert _profiles(profile_dir) == []
+
+
+def test_sampling_settings_toggle(test_client, admin_token, profile_dir):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    response = test_client.put("/profiling/", json={"sample_rate": 1, "path_prefix": "/users"}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == {"sample_rate": 1.0, "path_prefix": "/users", "min_duration_ms": 0.0}
+    # Other workers read the same file
+    assert ProfileSettings().load()["sample_rate"] == 1.0
+
+    test_client.get("/users/", headers=headers)
+    test_client.get("/vacations/1", headers=headers)
+    profiles = _profiles(profile_dir)
+    assert len(profiles) == 1 and "-GET-users-" in profiles[0]
+    assert [p["name"] for p in test_client.get("/profiling/files", headers=headers).get_json()] == profiles
+
+    # Only slow requests are kept
+    test_client.put("/profiling/", json={"min_duration_ms": 60000}, headers=headers)
+    test_client.get("/users/", headers=headers)
+    assert len(_profiles(profile_dir)) == 1
+
+    response = test_client.delete("/profiling/", headers=headers)
+    assert response.get_json()["sample_rate"] == 0.0
+    test_client.get("/users/", headers=headers)
+    assert len(_profiles(profile_dir)) == 1
+
+
+def test_settings_validation_and_admin_only(test_client, admin_token, create_test_user, make_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    assert test_client.put("/profiling/", json={"sample_rate": 2}, headers=headers).status_code == 400
+    assert test_client.put("/profiling/", json={"sample_rate": True}, headers=headers).status_code == 400
+    assert test_client.put("/profiling/", json={"min_duration_ms": -1}, headers=headers).status_code == 400
+    assert test_client.put("/profiling/", json={"path_prefix": 5}, headers=headers).status_code == 400
+
+    user = create_test_user(email="nosy@example.com")
+    response = test_client.put("/profiling/", json={"sample_rate": 1}, headers={"Authorization": f"Bearer {make_token(user.id)}"})
+    assert response.status_code == 403
+
+
+def test_old_profiles_are_pruned(test_client, admin_token, profile_dir, monkeypatch):
+    monkeypatch.setenv("PROFILE_MAX_FILES", "2")
+    headers = {"Authorization": f"Bearer {admin_token}", "X-Profile": "1"}
+
+    names = [test_client.get("/users/", headers=headers).headers["X-Profile-File"] for _ in range(4)]
+
+    assert len(_profiles(profile_dir)) == 2
+    assert names[-1] in _profiles(profile_dir)
@@ -0,0 +1,165 @@
+import threading
+import pytest
+from utils import rate_limit
+from models.rate_limit_bucket import RateLimitBucket
+from main import create_app
+from utils.rate_limit import DatabaseBucketStore, DatabaseHashSlots, LoginLimiter, MemoryBucketStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("store_class", [MemoryBucketStore, DatabaseBucketStore])
+def test_token_bucket_burst_and_refill(store_class):
+    clock = FakeClock()
+    store = store_class(clock=clock)
+
+    # burst of 3, then one token every 2 seconds
+    assert [store.take("k", 3, 30) for _ in range(3)] == [0, 0, 0]
+    assert store.take("k", 3, 30) == pytest.approx(2.0)
+
+    clock.now += 2
+    assert store.take("k", 3, 30) == 0
+    # other keys have their own bucket
+    assert store.take("other", 3, 30) == 0
+
+
+def test_database_buckets_are_pruned_once_full(db_session):
+    clock = FakeClock()
+    store = DatabaseBucketStore(clock=clock, prune_every=4)
+
+    # burst of 2, an empty bucket refills in 4 seconds
+    store.take("old", 2, 30)
+    clock.now += 5
+    store.take("drained", 2, 30)
+    store.take("drained", 2, 30)
+
+    # 4th take prunes "old", "drained" is still not full
+    clock.now += 1
+    store.take("fresh", 2, 30)
+    assert sorted(key for key, in db_session.query(RateLimitBucket.key)) == ["drained", "fresh"]
+
+    clock.now += 4.5
+    assert store.prune() == 2
+    assert db_session.query(RateLimitBucket).count() == 0
+    # A deleted bucket behaves like a full one
+    assert [store.take("drained", 2, 30) for _ in range(3)] == [0, 0, pytest.approx(2.0)]
+
+
+def test_login_returns_429_with_retry_after(test_client, create_test_user, monkeypatch):
+    create_test_user(email="limited@example.com", password="secret")
+    monkeypatch.setattr(rate_limit, "_login_limiter", LoginLimiter(MemoryBucketStore(), email_burst=2, email_per_minute=6))
+
+    for _ in range(2):
+        response = test_client.post("/auth/login", json={"email": "limited@example.com", "password": "wrong"})
+        assert response.status_code == 401
+
+    # Same email in another case still hits the same bucket, even with the right password
+    response = test_client.post("/auth/login", json={"email": "LIMITED@example.com", "password": "secret"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
+
+
+def test_login_limits_per_ip(test_client, monkeypatch):
+    monkeypatch.setattr(rate_limit, "_login_limiter", LoginLimiter(MemoryBucketStore(), ip_burst=3))
+
+    codes = [
+        test_client.post("/auth/login", json={"email": f"u{i}@example.com", "password": "x"}).status_code
+        for i in range(4)
+    ]
+    assert codes == [401, 401, 401, 429]
+
+
+def test_busy_hash_slots_fail_fast(test_client, create_test_user, monkeypatch):
+    create_test_user(email="busy@example.com", password="secret")
+    limiter = LoginLimiter(MemoryBucketStore(), max_concurrent_hashes=1, hash_wait=0.01)
+    monkeypatch.setattr(rate_limit, "_login_limiter", limiter)
+
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold_slot():
+        with limiter.hash_slot():
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold_slot)
+    thread.start()
+    held.wait(5)
+    try:
+        response = test_client.post("/auth/login", json={"email": "busy@example.com", "password": "secret"})
+    finally:
+        release.set()
+        thread.join()
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+    response = test_client.post("/auth/login", json={"email": "busy@example.com", "password": "secret"})
+    assert response.status_code == 200
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    monkeypatch.setenv("LOGIN_RATE_LIMIT_BACKEND", "redis")
+    with pytest.raises(ValueError):
+        rate_limit.create_login_limiter()
+
+
+def test_database_hash_slots_are_shared(db_session):
+    clock = FakeClock()
+    first = DatabaseHashSlots(1, lease=10, clock=clock, sleep=lambda seconds: None)
+    # Another worker, same table
+    second = DatabaseHashSlots(1, lease=10, clock=clock, sleep=lambda seconds: None)
+
+    with first.acquire(0) as acquired:
+        assert acquired
+        with second.acquire(0) as other:
+            assert not other
+    with second.acquire(0) as acquired:
+        assert acquired
+
+    # A worker killed while holding a slot frees it once the lease runs out
+    stuck = first._claim()
+    assert stuck is not None
+    with second.acquire(0) as acquired:
+        assert not acquired
+    clock.now += 11
+    with second.acquire(0) as acquired:
+        assert acquired
+    # Slot rows are not pruned as idle buckets
+    clock.now += 3600
+    assert DatabaseBucketStore(clock=clock).prune(60) == 0
+
+
+@pytest.mark.parametrize("body", [
+    {"email": "x" * 300 + "@example.com", "password": "x"},
+    {"email": ["a@example.com"], "password": "x"},
+    {"email": "a@example.com", "password": 5},
+    ["not", "an", "object"],
+])
+def test_login_rejects_malformed_credentials(test_client, db_session, monkeypatch, body):
+    monkeypatch.setattr(rate_limit, "_login_limiter", LoginLimiter(DatabaseBucketStore()))
+
+    response = test_client.post("/auth/login", json=body)
+
+    assert response.status_code == 401
+    assert db_session.query(RateLimitBucket).count() == 0
+
+
+def test_login_limits_forwarded_client_ip(test_app, monkeypatch):
+    monkeypatch.setenv("TRUSTED_PROXIES", "1")
+    client = create_app().test_client()
+    monkeypatch.setattr(rate_limit, "_login_limiter", LoginLimiter(MemoryBucketStore(), ip_burst=1))
+
+    def login(ip):
+        return client.post(
+            "/auth/login", json={"email": "who@example.com", "password": "x"}, headers={"X-Forwarded-For": ip}
+        ).status_code
+
+    # Same proxy in front of both clients, each client still has its own bucket
+    assert [login("203.0.113.1"), login("203.0.113.2"), login("203.0.113.1")] == [401, 401, 429]
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+from db import Base, RoutingSession, ReplicaPool, create_db_engine, get_engine, get_replicas, read_only, sticky_key, SessionLocal
+from models.employee import Employee
+
+
+@pytest.fixture
+def primary_and_replica(tmp_path):
+    primary = create_db_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_db_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine)
+
+    # Same id, different email, so we can see which database answered
+    with primary.begin() as connection:
+        connection.execute(Employee.__table__.insert(), {"id": 1, "email": "primary@example.com", "password_hash": "x", "is_admin": False})
+    with replica.begin() as connection:
+        connection.execute(Employee.__table__.insert(), {"id": 1, "email": "replica@example.com", "password_hash": "x", "is_admin": False})
+
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def _make_session(primary, pool):
+    return sessionmaker(class_=RoutingSession, replicas=pool, bind=primary, expire_on_commit=False)
+
+
+@read_only
+def _read_email(Session):
+    with Session() as session:
+        return session.query(Employee.email).filter_by(id=1).scalar()
+
+
+def _write_user(Session, email):
+    with Session() as session:
+        session.add(Employee(email=email, password_hash="x"))
+        session.commit()
+
+
+def test_reads_go_to_replica_writes_to_primary(primary_and_replica):
+    primary, replica = primary_and_replica
+    Session = _make_session(primary, ReplicaPool([replica], sticky_seconds=0))
+
+    assert _read_email(Session) == "replica@example.com"
+
+    _write_user(Session, "new@example.com")
+    with primary.connect() as connection:
+        assert connection.execute(Employee.__table__.select().where(Employee.email == "new@example.com")).first()
+
+
+def test_read_your_writes_stickiness(primary_and_replica):
+    primary, replica = primary_and_replica
+    Session = _make_session(primary, ReplicaPool([replica], sticky_seconds=60))
+
+    token = sticky_key.set("client-a")
+    try:
+        assert _read_email(Session) == "replica@example.com"
+        _write_user(Session, "new@example.com")
+        assert _read_email(Session) == "primary@example.com"
+    finally:
+        sticky_key.reset(token)
+
+    # Another client is not affected
+    token = sticky_key.set("client-b")
+    try:
+        assert _read_email(Session) == "replica@example.com"
+    finally:
+        sticky_key.reset(token)
+
+
+def test_round_robin_skips_unhealthy_replica(primary_and_replica, tmp_path):
+    primary, replica = primary_and_replica
+    broken = create_db_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    pool = ReplicaPool([broken, replica], check_interval=60)
+
+    assert pool.choose() is replica
+    assert pool.choose() is replica
+
+    Session = _make_session(primary, ReplicaPool([broken], check_interval=60))
+    assert _read_email(Session) == "primary@example.com"
+
+
+def test_no_replicas_configured_uses_primary():
+    assert get_replicas() is None
+    with SessionLocal() as session:
+        assert session.get_bind() is get_engine()
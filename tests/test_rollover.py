@@ -0,0 +1,95 @@
+from datetime import date
+from db import SessionLocal
+from models.vacation_total import VacationTotal
+from services import archive_service, rollover_service
+
+
+def _totals(year):
+    with SessionLocal() as session:
+        return {
+            row.employee_id: (row.total_days, row.total_days_left)
+            for row in session.query(VacationTotal).filter_by(year=year)
+        }
+
+
+def _seed_previous_year(user_id, days_left):
+    with SessionLocal() as session:
+        session.add(VacationTotal(employee_id=user_id, year=2025, total_days=20, total_days_left=days_left))
+        session.commit()
+
+
+def test_rollover_carries_capped_days(create_test_user):
+    rich = create_test_user(email="rich@example.com")
+    poor = create_test_user(email="poor@example.com")
+    new = create_test_user(email="new@example.com")
+    _seed_previous_year(rich.id, 12)
+    _seed_previous_year(poor.id, 2)
+
+    result = rollover_service.rollover_year(2026, base_days=20, max_carry_over=5)
+
+    assert result["created"] == 3
+    assert _totals(2026) == {rich.id: (25, 25), poor.id: (22, 22), new.id: (20, 20)}
+
+
+def test_rollover_without_cap_carries_everything(create_test_user):
+    user = create_test_user(email="all@example.com")
+    _seed_previous_year(user.id, 12)
+
+    rollover_service.rollover_year(2026, base_days=20, max_carry_over=None)
+
+    assert _totals(2026) == {user.id: (32, 32)}
+
+
+def test_rollover_is_idempotent(create_test_user):
+    first = create_test_user(email="first@example.com")
+    rollover_service.rollover_year(2026, base_days=20)
+    second = create_test_user(email="second@example.com")
+
+    result = rollover_service.rollover_year(2026, base_days=25)
+
+    assert result["created"] == 1
+    assert _totals(2026) == {first.id: (20, 20), second.id: (25, 25)}
+
+
+def test_rollover_endpoint(test_client, admin_token, create_test_user):
+    user = create_test_user(email="api@example.com")
+    _seed_previous_year(user.id, 3)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    response = test_client.post("/vacations/rollover", json={"year": 2026, "base_days": 20, "max_carry_over": None}, headers=headers)
+    assert response.status_code == 200
+    # admin user + api user
+    assert response.get_json()["created"] == 2
+    assert _totals(2026)[user.id] == (23, 23)
+
+    response = test_client.post("/vacations/rollover", json={"year": 2026, "base_days": "20"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_rollover_year_command(test_app, create_test_user):
+    user = create_test_user(email="cli@example.com")
+    _seed_previous_year(user.id, 10)
+
+    result = test_app.test_cli_runner().invoke(args=["rollover-year", "2026", "--base-days", "21", "--max-carry-over", "4"])
+
+    assert result.exit_code == 0
+    assert "Created 1 vacation totals" in result.output
+    assert _totals(2026) == {user.id: (25, 25)}
+
+
+def test_rollover_reads_carry_over_from_archived_year(create_test_user, tmp_path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path / "archive"))
+    rich = create_test_user(email="archived-rich@example.com")
+    poor = create_test_user(email="archived-poor@example.com")
+    new = create_test_user(email="archived-new@example.com")
+    _seed_previous_year(rich.id, 12)
+    _seed_previous_year(poor.id, 2)
+    archive_service.archive_year(2025, today=date(2026, 1, 1))
+
+    result = rollover_service.rollover_year(2026, base_days=20, max_carry_over=5)
+
+    assert result["carry_over_from"] == "archive"
+    assert result["created"] == 3
+    assert _totals(2026) == {rich.id: (25, 25), poor.id: (22, 22), new.id: (20, 20)}
+    with SessionLocal() as session:
+        assert {row.version for row in session.query(VacationTotal)} == {1}
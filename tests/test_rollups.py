@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+from db import SessionLocal
+from models.employee import Employee
+from models.vacation_monthly_usage import VacationMonthlyUsage
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services import rollup_service
+from utils.workdays import calculate_workdays
+
+
+def _usage(user_id):
+    with SessionLocal() as session:
+        return {
+            row.month: row.workdays
+            for row in session.query(VacationMonthlyUsage).filter_by(employee_id=user_id)
+            if row.workdays
+        }
+
+
+def _raw(vacations, start, end):
+    return sum(
+        calculate_workdays(max(s, start), min(e, end))
+        for s, e in vacations
+        if e >= start and s <= end
+    )
+
+
+def test_booking_updates_rollup_in_same_transaction(test_client, create_test_user, admin_token):
+    user = create_test_user(email="rollup@example.com")
+    with SessionLocal() as session:
+        session.add(VacationTotal(employee_id=user.id, year=2025, total_days=30, total_days_left=30))
+        session.commit()
+
+    # Mon 27 Jan .. Tue 4 Feb -> 5 workdays in January, 2 in February
+    response = test_client.post(
+        "/vacations/vacation-used",
+        json={"user_id": user.id, "start_date": "2025-01-27", "end_date": "2025-02-04"},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 201
+    assert _usage(user.id) == {date(2025, 1, 1): 5, date(2025, 2, 1): 2}
+
+
+def test_period_query_matches_raw_rows(create_test_user):
+    user = create_test_user(email="long@example.com")
+    vacations = []
+    day = date(2019, 1, 3)
+    with SessionLocal() as session:
+        # Two-week vacation every ~7 weeks for six years, some crossing month ends
+        while day.year < 2025:
+            vacations.append((day, day + timedelta(days=13)))
+            session.add(VacationUsed(employee_id=user.id, start_date=day, end_date=day + timedelta(days=13), days_used=10))
+            day += timedelta(days=50)
+        session.commit()
+
+        for start, end in [
+            (date(2019, 1, 1), date(2024, 12, 31)),
+            (date(2019, 1, 15), date(2024, 6, 10)),
+            (date(2020, 3, 10), date(2020, 3, 20)),
+            (date(2021, 2, 1), date(2021, 2, 28)),
+            (date(2022, 5, 31), date(2022, 7, 1)),
+        ]:
+            assert rollup_service.used_workdays(session, user.id, start, end) == _raw(vacations, start, end)
+
+
+def test_rebuild_after_bulk_insert(test_app, create_test_user):
+    user = create_test_user(email="bulk@example.com")
+    with SessionLocal() as session:
+        # Plain Table.insert() skips the ORM listeners
+        session.execute(VacationUsed.__table__.insert(), [
+            {"employee_id": user.id, "start_date": date(2025, 3, 3), "end_date": date(2025, 3, 7), "days_used": 5},
+        ])
+        session.commit()
+    assert _usage(user.id) == {}
+
+    result = test_app.test_cli_runner().invoke(args=["rebuild-monthly-usage"])
+
+    assert result.exit_code == 0
+    assert _usage(user.id) == {date(2025, 3, 1): 5}
+
+
+def test_deleting_vacations_and_users_keeps_rollup_consistent(create_test_user):
+    user = create_test_user(email="gone@example.com")
+    with SessionLocal() as session:
+        first = VacationUsed(employee_id=user.id, start_date=date(2025, 4, 7), end_date=date(2025, 4, 8), days_used=2)
+        second = VacationUsed(employee_id=user.id, start_date=date(2025, 4, 14), end_date=date(2025, 4, 14), days_used=1)
+        session.add_all([first, second])
+        session.commit()
+
+        session.delete(first)
+        session.commit()
+        assert _usage(user.id) == {date(2025, 4, 1): 1}
+
+        session.delete(session.get(Employee, user.id))
+        session.commit()
+        assert session.query(VacationMonthlyUsage).count() == 0
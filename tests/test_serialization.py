@@ -0,0 +1,40 @@
+import json
+import pytest
+from datetime import date
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from utils import json_provider
+from utils.serializers import employee_row, vacation_total_row, vacation_used_row
+
+
+def test_row_serializers_work_on_tuples():
+    assert employee_row((1, "a@example.com", False)) == {"id": 1, "email": "a@example.com", "is_admin": False}
+    assert vacation_total_row((2025, 20, 15)) == {"year": 2025, "total_days": 20, "used_days": 5, "days_left": 15}
+    assert vacation_used_row((7, date(2025, 1, 10), date(2025, 1, 12), 1)) == {
+        "id": 7, "start_date": "2025-01-10", "end_date": "2025-01-12", "days_used": 1
+    }
+
+
+def test_provider_selection(monkeypatch):
+    monkeypatch.setenv("JSON_PROVIDER", "stdlib")
+    assert json_provider.get_json_provider_class() is DefaultJSONProvider
+
+    monkeypatch.delenv("JSON_PROVIDER")
+    expected = json_provider.OrjsonProvider if json_provider.orjson else DefaultJSONProvider
+    assert json_provider.get_json_provider_class() is expected
+
+
+@pytest.mark.skipif(json_provider.orjson is None, reason="orjson not installed")
+def test_orjson_provider_matches_stdlib():
+    app = Flask(__name__)
+    fast = json_provider.OrjsonProvider(app)
+    stdlib = DefaultJSONProvider(app)
+
+    payload = {"b": [1, 2.5, None, True], "a": "čćž", "when": date(2025, 1, 10)}
+    assert json.loads(fast.dumps(payload)) == json.loads(stdlib.dumps(payload))
+    assert fast.loads(fast.dumps(payload))["when"] == "Fri, 10 Jan 2025 00:00:00 GMT"
+
+    with app.app_context():
+        response = fast.response({"z": 1, "a": 2})
+    assert response.mimetype == "application/json"
+    assert response.get_data(as_text=True) == '{"a":2,"z":1}\n'
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code):
+    env = dict(os.environ, DATABASE_URL="postgresql+psycopg2://nobody@unreachable:5432/none")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def test_importing_main_creates_no_engine_or_app():
+    out = _run("import main, db; print(db._engine is None, hasattr(main, 'app'))")
+    assert out == "True False"
+
+
+def test_create_app_does_not_connect():
+    out = _run("import main, db; main.create_app(); print(db._engine is None)")
+    assert out == "True"
+
+
+def test_engine_is_rebuilt_after_fork():
+    code = (
+        "import os, db; parent = db.get_engine(); r, w = os.pipe(); pid = os.fork()\n"
+        "if pid == 0:\n"
+        "    os.write(w, b'1' if db.get_engine() is not parent else b'0'); os._exit(0)\n"
+        "os.waitpid(pid, 0); print(os.read(r, 1).decode(), db.get_engine() is parent)"
+    )
+    assert _run(code) == "1 True"
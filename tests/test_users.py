@@ -1,6 +1,12 @@
 import pytest
 from flask_jwt_extended import create_access_token
-from datetime import timedelta
+from datetime import date, timedelta
+from sqlalchemy import event
+from db import SessionLocal, get_engine
+from models.vacation_monthly_usage import VacationMonthlyUsage
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+from services.rollup_service import rebuild_monthly_usage
 
 def test_list_users_success(test_client, admin_user, test_app):
     with test_app.app_context():
@@ -219,3 +225,34 @@ def test_delete_user_not_found(test_client,admin_user, make_token):
     assert response.status_code == 404
     data = response.get_json()
     assert data["error"] == "User not found"
+
+
+def test_delete_user_cascades_in_database(test_client, admin_user, make_token, create_test_user):
+    user = create_test_user(email="leaving@example.com")
+    stays = create_test_user(email="staying@example.com")
+    with SessionLocal() as session:
+        session.add_all([VacationTotal(employee_id=employee_id, year=2025, total_days=20, total_days_left=20) for employee_id in (user.id, stays.id)])
+        first = date(2020, 1, 1)
+        session.execute(VacationUsed.__table__.insert(), [
+            {"employee_id": employee_id, "start_date": first + timedelta(days=i), "end_date": first + timedelta(days=i), "days_used": 1}
+            for employee_id in (user.id, stays.id) for i in range(300)
+        ])
+        rebuild_monthly_usage(session)
+        session.commit()
+
+    statements = []
+    log = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(get_engine(), "before_cursor_execute", log)
+    try:
+        response = test_client.delete(f"/users/{user.id}", headers={"Authorization": f"Bearer {make_token(admin_user.id, is_admin=True)}"})
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", log)
+
+    assert response.status_code == 200
+    # Children are never loaded or deleted row by row, ON DELETE CASCADE does it
+    assert not [s for s in statements if "vacation_used" in s or "vacation_totals" in s or "vacation_monthly_usage" in s]
+
+    with SessionLocal() as session:
+        for model in (VacationUsed, VacationTotal, VacationMonthlyUsage):
+            assert session.query(model).filter_by(employee_id=user.id).count() == 0
+            assert session.query(model).filter_by(employee_id=stays.id).count() > 0
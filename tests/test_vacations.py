@@ -3,6 +3,8 @@ import csv
 import json
 import pytest
 from datetime import date
+from sqlalchemy import event
+from db import get_engine
 from models.vacation_total import VacationTotal
 from models.vacation_used import VacationUsed
 
@@ -50,6 +52,16 @@ def test_create_vacation_total_json_duplicate(test_client, create_test_user, mak
     data = response.get_json()
     assert "error" in data
 
+def test_create_vacation_total_json_unknown_user(test_client, make_token, admin_user, db_session):
+    token = make_token(user_id=admin_user.id, is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    payload = {"user_id": admin_user.id + 1000, "year": 2025, "total_days": 20}
+    response = test_client.post("/vacations/totals", json=payload, headers=headers)
+    assert response.status_code == 404
+    assert response.get_json()["error"] == "User not found"
+    assert db_session.query(VacationTotal).count() == 0
+
 # ----------------------------
 # CSV mode tests
 # ----------------------------
@@ -372,4 +384,104 @@ def test_get_used_in_period_access_denied(test_client, create_test_user, make_to
 
     response = test_client.get(f"/vacations/{user.id}/used?from=2025-01-01&to=2025-01-31", headers=headers)
     assert response.status_code == 403
-    assert response.get_json()["error"] == "Access denied"
\ No newline at end of file
+    assert response.get_json()["error"] == "Access denied"
+
+def test_get_used_in_period_for_users(test_client, create_test_user, make_token, admin_user, db_session):
+    alice = create_test_user(email="alice@test.com")
+    bob = create_test_user(email="bob@test.com")
+    idle = create_test_user(email="idle@test.com")
+    admin_id = admin_user.id
+
+    db_session.add_all([
+        # Spans the whole of February plus edges in January and March
+        VacationUsed(employee_id=alice.id, start_date=date(2025, 1, 27), end_date=date(2025, 3, 4), days_used=27),
+        VacationUsed(employee_id=bob.id, start_date=date(2025, 2, 10), end_date=date(2025, 2, 14), days_used=5),
+        VacationUsed(employee_id=bob.id, start_date=date(2025, 3, 3), end_date=date(2025, 3, 3), days_used=1),
+    ])
+    db_session.commit()
+    db_session.close()
+
+    headers = {"Authorization": f"Bearer {make_token(admin_id, is_admin=True)}"}
+    response = test_client.get(
+        f"/vacations/used?from=2025-01-29&to=2025-03-03&user_ids={alice.id},{bob.id},{idle.id}", headers=headers
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["from"] == "2025-01-29"
+    assert data["users"] == [
+        {"user_id": alice.id, "email": "alice@test.com", "days_used": 3 + 20 + 1},
+        {"user_id": bob.id, "email": "bob@test.com", "days_used": 6},
+        {"user_id": idle.id, "email": "idle@test.com", "days_used": 0},
+    ]
+
+    # Same numbers as asking one by one
+    for row in data["users"]:
+        single = test_client.get(f"/vacations/{row['user_id']}/used?from=2025-01-29&to=2025-03-03", headers=headers)
+        assert single.get_json()["days_used"] == row["days_used"]
+
+    everyone = test_client.get("/vacations/used?from=2025-01-29&to=2025-03-03", headers=headers).get_json()
+    assert [row["user_id"] for row in everyone["users"]] == [admin_id, alice.id, bob.id, idle.id]
+
+def test_get_used_in_period_for_users_errors(test_client, create_test_user, make_token, admin_user):
+    user = create_test_user(email="plain@test.com")
+
+    response = test_client.get(
+        "/vacations/used?from=2025-01-01&to=2025-01-31",
+        headers={"Authorization": f"Bearer {make_token(user.id, is_admin=False)}"}
+    )
+    assert response.status_code == 403
+
+    headers = {"Authorization": f"Bearer {make_token(admin_user.id, is_admin=True)}"}
+    response = test_client.get("/vacations/used?from=2025-01-01&to=2025-01-31&user_ids=1,x", headers=headers)
+    assert response.status_code == 400
+
+    response = test_client.get(f"/vacations/used?from=2025-01-01&to=2025-01-31&user_ids={user.id},9999", headers=headers)
+    assert response.status_code == 404
+    assert response.get_json()["user_ids"] == [9999]
+
+def test_get_vacation_years_matches_single_year_views(test_client, create_test_user, make_token, db_session):
+    user = create_test_user(email="history@test.com")
+    user_id = user.id
+    for year in (2022, 2023, 2025):
+        db_session.add(VacationTotal(employee_id=user_id, year=year, total_days=20, total_days_left=20 - 2))
+        db_session.add(VacationUsed(employee_id=user_id, start_date=date(year, 3, 1), end_date=date(year, 3, 2), days_used=2))
+    # Runs into 2024, left out of 2023 like in the single year view
+    db_session.add(VacationUsed(employee_id=user_id, start_date=date(2023, 12, 29), end_date=date(2024, 1, 2), days_used=3))
+    db_session.commit()
+    db_session.close()
+
+    headers = {"Authorization": f"Bearer {make_token(user_id)}"}
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        if "vacation_totals" in statement or "vacation_used" in statement:
+            statements.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", count)
+    try:
+        response = test_client.get(f"/vacations/{user_id}/years?from_year=2022&to_year=2024", headers=headers)
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    assert len(statements) == 2
+    blocks = response.get_json()
+    assert [block["year"] for block in blocks] == [2022, 2023]
+    for block in blocks:
+        single = test_client.get(f"/vacations/{user_id}/{block['year']}", headers=headers).get_json()
+        assert block == single
+
+    everything = test_client.get(f"/vacations/{user_id}/years", headers=headers).get_json()
+    assert [block["year"] for block in everything] == [2022, 2023, 2025]
+
+def test_get_vacation_years_errors(test_client, create_test_user, make_token):
+    user = create_test_user(email="history2@test.com")
+    other = create_test_user(email="history3@test.com")
+
+    response = test_client.get(f"/vacations/{user.id}/years", headers={"Authorization": f"Bearer {make_token(other.id)}"})
+    assert response.status_code == 403
+
+    headers = {"Authorization": f"Bearer {make_token(user.id)}"}
+    assert test_client.get(f"/vacations/{user.id}/years?from_year=abc", headers=headers).status_code == 400
+    assert test_client.get(f"/vacations/{user.id}/years?from_year=2025&to_year=2024", headers=headers).status_code == 400
\ No newline at end of file
@@ -0,0 +1,148 @@
+import os
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used without it
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is used without it
+    zstandard = None
+
+
+# Only text-like bodies, images and archives don't get smaller
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/xml", "application/javascript")
+
+
+class GzipStream:
+    """Incremental gzip, flush() ends a block so the client can decode everything sent so far."""
+
+    def __init__(self, level=6):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._z.compress(data)
+
+    def flush(self):
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._z.flush()
+
+
+class BrotliStream:
+    """Incremental brotli, same interface as GzipStream."""
+
+    def __init__(self, quality=4):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._c.process(data)
+
+    def flush(self):
+        return self._c.flush()
+
+    def finish(self):
+        return self._c.finish()
+
+
+class ZstdStream:
+    """Incremental zstd, same interface as GzipStream."""
+
+    def __init__(self, level=3):
+        self._c = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._c.compress(data)
+
+    def flush(self):
+        return self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._c.flush()
+
+
+# Content-Encoding -> stream class, only the ones whose library is installed
+STREAMS = {"gzip": GzipStream}
+if brotli:
+    STREAMS["br"] = BrotliStream
+if zstandard:
+    STREAMS["zstd"] = ZstdStream
+
+
+def get_min_size():
+    return int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+
+# Server preference when the client rates several equally, empty -> compression off
+def get_encodings():
+    names = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+    return [name.strip() for name in names if name.strip() in STREAMS]
+
+
+# Best encoding both sides support, None -> send as is
+def choose_encoding(accept_encodings, encodings):
+    best, best_quality = None, 0
+    for name in encodings:
+        quality = accept_encodings.quality(name)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def _compressible(response):
+    if request.method == "HEAD" or response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    # send_file() and friends, or already encoded
+    if response.direct_passthrough or "Content-Encoding" in response.headers:
+        return False
+    return (response.mimetype or "").startswith(COMPRESSIBLE_TYPES)
+
+
+# One compressed block per chunk the endpoint yields, nothing is buffered across chunks
+def _compress_chunks(chunks, stream):
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = stream.compress(chunk) + stream.flush()
+            if data:
+                yield data
+        yield stream.finish()
+    finally:
+        # Client went away mid-stream -> still close the endpoint's generator (DB cursor etc.)
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+# after_request: compress with the negotiated encoding
+def compress_response(response):
+    if not _compressible(response):
+        return response
+    response.vary.add("Accept-Encoding")
+
+    encoding = choose_encoding(request.accept_encodings, get_encodings())
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        # Size unknown up front, generators (exports) are always compressed, chunk by chunk
+        response.response = _compress_chunks(response.response, STREAMS[encoding]())
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < get_min_size():
+            return response
+        stream = STREAMS[encoding]()
+        response.set_data(stream.compress(data) + stream.finish())
+
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def register_compression(app):
+    app.after_request(compress_response)
@@ -0,0 +1,126 @@
+from datetime import date, datetime
+from itertools import islice
+from dateutil import parser
+
+
+# Rows decoded together, also the sample size for date format sniffing
+BATCH_SIZE = 500
+
+# Candidate formats, tried in order. Month-first before day-first, same as dateutil
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%A, %B %d, %Y",      # Friday, August 30, 2019
+    "%a, %b %d, %Y",      # Fri, Aug 30, 2019
+    "%B %d, %Y",          # August 30, 2019
+    "%b %d, %Y",          # Aug 30, 2019
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%d.%m.%Y",
+    "%Y/%m/%d",
+    "%d-%m-%Y",
+]
+
+TRUE_VALUES = {"true", "1", "yes"}
+
+
+class DateDecoder:
+    """Decode date strings with one sniffed format, dateutil only for outliers."""
+
+    def __init__(self, date_format=None):
+        self.date_format = date_format
+        self.fallbacks = 0
+
+        if date_format == "%Y-%m-%d":
+            self._fast = date.fromisoformat
+        elif date_format:
+            self._fast = lambda value: datetime.strptime(value, date_format).date()
+        else:
+            self._fast = None
+
+    def __call__(self, value):
+        value = value.strip()
+        if self._fast:
+            try:
+                return self._fast(value)
+            except ValueError:
+                pass
+
+        self.fallbacks += 1
+        return parser.parse(value).date()
+
+
+def _matches(date_format, value):
+    try:
+        datetime.strptime(value, date_format)
+        return True
+    except ValueError:
+        return False
+
+
+# Pick the format that parses most samples (earlier wins ties), None if nothing fits
+def sniff_date_format(samples):
+    samples = [value.strip() for value in samples if value and value.strip()]
+
+    best_format, best_count = None, 0
+    for date_format in DATE_FORMATS:
+        count = sum(1 for value in samples if _matches(date_format, value))
+        if count > best_count:
+            best_format, best_count = date_format, count
+        if count == len(samples):
+            break
+    return best_format
+
+
+# Split any row iterator into lists of batch_size rows
+def iter_batches(rows, batch_size=BATCH_SIZE):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+# (email, password, is_admin) or None, from csv.DictReader rows
+def decode_user_rows(batch):
+    decoded = []
+    for row in batch:
+        email = row.get("Employee Email")
+        password = row.get("Employee Password")
+        is_admin = (row.get("is_admin") or "false").strip().lower() in TRUE_VALUES
+
+        if not email or not password:
+            decoded.append(None)
+            continue
+        decoded.append((email, password, is_admin))
+    return decoded
+
+
+# (email, total_days) or None, from csv.reader rows
+def decode_total_rows(batch):
+    decoded = []
+    for row in batch:
+        try:
+            decoded.append((row[0].strip(), int(row[1].strip())))
+        except (IndexError, ValueError):
+            decoded.append(None)
+    return decoded
+
+
+# (email, start_date, end_date) or None, from csv.reader rows
+def decode_used_rows(batch, date_decoder):
+    decoded = []
+    for row in batch:
+        try:
+            decoded.append((row[0].strip(), date_decoder(row[1]), date_decoder(row[2])))
+        except (IndexError, ValueError, OverflowError):
+            decoded.append(None)
+    return decoded
+
+
+# Sniff date format from the first batch of used-vacation rows
+def date_decoder_for(batch):
+    samples = []
+    for row in batch:
+        samples.extend(row[1:3])
+    return DateDecoder(sniff_date_format(samples))
@@ -0,0 +1,24 @@
+from sqlalchemy import func
+
+from models.employee import Employee
+from utils.validators import normalize_email
+
+
+# Emails per IN (...) query when resolving a batch
+RESOLVE_CHUNK = 500
+
+
+# Employee with this email in any letter case, one lookup through ux_employees_email_lower
+def find_employee(session, email):
+    return session.query(Employee).filter(func.lower(Employee.email) == normalize_email(email)).first()
+
+
+# {normalized email: employee id} for the emails that have an account, one query per RESOLVE_CHUNK emails.
+# Nothing is cached between calls: a user registered or deleted by another worker is seen right away.
+def resolve_emails(session, emails):
+    keys = sorted({normalize_email(email) for email in emails if email})
+    found = {}
+    for i in range(0, len(keys), RESOLVE_CHUNK):
+        chunk = keys[i:i + RESOLVE_CHUNK]
+        found.update(session.query(func.lower(Employee.email), Employee.id).filter(func.lower(Employee.email).in_(chunk)))
+    return found
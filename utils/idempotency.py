@@ -0,0 +1,164 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+from sqlalchemy.exc import IntegrityError
+
+from db import SessionLocal
+from models.idempotency_key import IdempotencyKey
+
+
+HEADER = "Idempotency-Key"
+METHODS = {"POST", "PATCH"}
+MAX_KEY_LENGTH = 255
+# Responses that tell the client to try again are not stored, the retry has to run for real
+NOT_STORED = {409, 429}
+
+
+def get_idempotency_ttl():
+    return int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+
+
+# A first request still "running" after this long died without cleaning up, its key can be taken over
+def get_idempotency_lock_seconds():
+    return int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "300"))
+
+
+def _identity():
+    try:
+        verify_jwt_in_request(optional=True)
+    except (JWTExtendedException, PyJWTError):
+        # Bad or revoked token, the endpoint itself answers 401
+        return None
+    return get_jwt_identity()
+
+
+# Same key for the same user, method and path only
+def _scoped_key(identity, key):
+    return hashlib.sha256(f"{identity}\n{request.method}\n{request.path}\n{key}".encode("utf-8")).hexdigest()
+
+
+def _request_hash():
+    digest = hashlib.sha256(f"{request.method} {request.full_path}\n".encode("utf-8"))
+    if request.mimetype.startswith("multipart/"):
+        # The multipart boundary changes on every retry, hash the fields and uploaded files instead
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"{name}={value}\n".encode("utf-8"))
+        for name, upload in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+            digest.update(f"{name}:{upload.filename}\n".encode("utf-8"))
+            for block in iter(lambda: upload.stream.read(1024 * 1024), b""):
+                digest.update(block)
+            upload.stream.seek(0)
+    else:
+        digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def _replay(record):
+    response = current_app.response_class(record.body, status=record.status_code, content_type=record.content_type)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _in_progress():
+    return jsonify({"error": f"A request with this {HEADER} is still in progress"}), 409, {"Retry-After": "1"}
+
+
+# before_request: claim the key, or answer from the stored response without running the endpoint
+def begin_request():
+    key = request.headers.get(HEADER)
+    if request.method not in METHODS or not key:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        return jsonify({"error": f"{HEADER} can be at most {MAX_KEY_LENGTH} characters"}), 400
+
+    # Login and first-admin setup have no user to scope the key to
+    identity = _identity()
+    if identity is None:
+        return None
+
+    scoped = _scoped_key(identity, key)
+    request_hash = _request_hash()
+    now = datetime.utcnow()
+
+    with SessionLocal() as session:
+        for _ in range(2):
+            try:
+                session.add(IdempotencyKey(
+                    key=scoped,
+                    request_hash=request_hash,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=get_idempotency_ttl())
+                ))
+                session.commit()
+                g.idempotency_key = scoped
+                return None
+            except IntegrityError:
+                session.rollback()
+
+            record = session.get(IdempotencyKey, scoped)
+            if record is None:
+                # Released by the first request in the meantime
+                continue
+
+            abandoned = record.status_code is None and record.created_at <= now - timedelta(seconds=get_idempotency_lock_seconds())
+            if record.expires_at <= now or abandoned:
+                session.delete(record)
+                session.commit()
+                continue
+
+            if record.request_hash != request_hash:
+                return jsonify({"error": f"{HEADER} was already used for a different request"}), 422
+            if record.status_code is None:
+                return _in_progress()
+            return _replay(record)
+
+    return _in_progress()
+
+
+# after_request: store the response for replays, or release the key if the client should retry
+def finish_request(response):
+    scoped = g.pop("idempotency_key", None)
+    if scoped is None:
+        return response
+
+    with SessionLocal() as session:
+        record = session.get(IdempotencyKey, scoped)
+        if record is not None:
+            if response.status_code >= 500 or response.status_code in NOT_STORED or response.is_streamed:
+                session.delete(record)
+            else:
+                record.status_code = response.status_code
+                record.content_type = response.content_type
+                record.body = response.get_data()
+            session.commit()
+    return response
+
+
+# teardown_request: the endpoint raised before a response was made, release the key
+def release_request(exc):
+    scoped = g.pop("idempotency_key", None)
+    if scoped is None:
+        return
+    with SessionLocal() as session:
+        session.query(IdempotencyKey).filter(IdempotencyKey.key == scoped, IdempotencyKey.status_code.is_(None)).delete()
+        session.commit()
+
+
+# Drop stored responses past their TTL, returns how many
+def purge_expired(now=None):
+    now = now or datetime.utcnow()
+    with SessionLocal() as session:
+        deleted = session.query(IdempotencyKey).filter(IdempotencyKey.expires_at <= now).delete()
+        session.commit()
+    return deleted
+
+
+def register_idempotency(app):
+    app.before_request(begin_request)
+    app.after_request(finish_request)
+    app.teardown_request(release_request)
@@ -0,0 +1,44 @@
+import os
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used without it
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, same output types as the default one."""
+
+    # Dates and dataclasses go through Flask's default() so output matches stdlib provider
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        # indent (debug mode) or custom arguments -> stdlib
+        if kwargs.keys() - {"separators"}:
+            return super().dumps(obj, **kwargs)
+
+        option = self.option | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+        return orjson.dumps(obj, default=self.default, option=option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+JSON_PROVIDERS = {
+    "stdlib": DefaultJSONProvider,
+    "orjson": OrjsonProvider,
+}
+
+
+# JSON_PROVIDER=stdlib|orjson, default is the fastest one installed
+def get_json_provider_class():
+    name = os.getenv("JSON_PROVIDER")
+    if name is None:
+        name = "orjson" if orjson else "stdlib"
+
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson but orjson is not installed")
+    return JSON_PROVIDERS[name]
@@ -0,0 +1,190 @@
+import cProfile
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from flask import g, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+
+
+# Layout:  <PROFILE_DIR>/<timestamp>-<method>-<path>-<ms>ms-<id>.prof  -> cProfile stats, one per profiled request
+#          <PROFILE_DIR>/settings.json                               -> sampling settings set through /profiling/
+HEADER = "X-Profile"
+SETTINGS_FILE = "settings.json"
+PROFILE_SUFFIX = ".prof"
+
+# Settings file is checked for changes at most this often per process
+SETTINGS_CHECK_SECONDS = 1.0
+
+
+def get_profile_dir():
+    return os.getenv("PROFILE_DIR", "profiles")
+
+
+def get_max_profiles():
+    return int(os.getenv("PROFILE_MAX_FILES", "500"))
+
+
+# Used until an admin changes them through /profiling/
+def default_settings():
+    return {
+        "sample_rate": float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+        "path_prefix": os.getenv("PROFILE_PATH_PREFIX", ""),
+        "min_duration_ms": float(os.getenv("PROFILE_MIN_DURATION_MS", "0")),
+    }
+
+
+_settings_cache = {}
+_cache_lock = threading.Lock()
+
+
+class ProfileSettings:
+    """Sampling settings in <PROFILE_DIR>/settings.json, shared by every worker on the host."""
+
+    def __init__(self, root=None):
+        self.root = root or get_profile_dir()
+        self.path = os.path.join(self.root, SETTINGS_FILE)
+
+    # Cached per process, re-read when the file changed (checked once a second)
+    def load(self):
+        now = time.monotonic()
+        with _cache_lock:
+            cached = _settings_cache.get(self.path)
+            if cached and now - cached[0] < SETTINGS_CHECK_SECONDS:
+                return cached[2]
+
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if cached and cached[1] == mtime:
+            settings = cached[2]
+        elif mtime is None:
+            settings = default_settings()
+        else:
+            with open(self.path, encoding="utf-8") as f:
+                settings = {**default_settings(), **json.load(f)}
+
+        with _cache_lock:
+            _settings_cache[self.path] = (now, mtime, settings)
+        return settings
+
+    def save(self, settings):
+        os.makedirs(self.root, exist_ok=True)
+        # Write + rename, other workers never read half a file
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(settings, f)
+        os.replace(tmp, self.path)
+        with _cache_lock:
+            _settings_cache.pop(self.path, None)
+
+    def reset(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        with _cache_lock:
+            _settings_cache.pop(self.path, None)
+
+
+# Stored profiles, newest first: [{"name": ..., "size": ...}]
+def list_profiles(root=None):
+    root = root or get_profile_dir()
+    if not os.path.isdir(root):
+        return []
+    names = sorted((name for name in os.listdir(root) if name.endswith(PROFILE_SUFFIX)), reverse=True)
+    return [{"name": name, "size": os.path.getsize(os.path.join(root, name))} for name in names]
+
+
+def _is_admin():
+    try:
+        verify_jwt_in_request(optional=True)
+    except (JWTExtendedException, PyJWTError):
+        return False
+    return bool(get_jwt().get("is_admin"))
+
+
+def _sampled(settings):
+    rate = settings["sample_rate"]
+    if rate <= 0 or not request.path.startswith(settings["path_prefix"]):
+        return False
+    return random.random() < rate
+
+
+# Keep the newest PROFILE_MAX_FILES dumps, names start with a timestamp
+def _prune(root):
+    names = sorted(name for name in os.listdir(root) if name.endswith(PROFILE_SUFFIX))
+    for name in names[:max(0, len(names) - get_max_profiles())]:
+        try:
+            os.remove(os.path.join(root, name))
+        except FileNotFoundError:
+            pass  # another worker pruned it first
+
+
+def _write(profiler, elapsed_ms):
+    root = get_profile_dir()
+    os.makedirs(root, exist_ok=True)
+    path = re.sub(r"[^A-Za-z0-9]+", "_", request.path).strip("_") or "root"
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    name = f"{stamp}-{request.method}-{path}-{elapsed_ms:.0f}ms-{uuid.uuid4().hex[:8]}{PROFILE_SUFFIX}"
+    profiler.dump_stats(os.path.join(root, name))
+    _prune(root)
+    return name
+
+
+# before_request: profile if an admin asked with the X-Profile header, or the request was sampled
+def start_profile():
+    forced = bool(request.headers.get(HEADER)) and _is_admin()
+    settings = ProfileSettings().load()
+    if not forced and not _sampled(settings):
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already running in this thread
+        return
+    g.profile = (profiler, time.perf_counter(), forced, settings["min_duration_ms"])
+
+
+def _finish():
+    state = g.pop("profile", None)
+    if state is None:
+        return None
+    profiler, started, forced, min_duration_ms = state
+    profiler.disable()
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if not forced and elapsed_ms < min_duration_ms:
+        return None
+    return _write(profiler, elapsed_ms)
+
+
+# after_request: write the dump, tell the admin who asked for it where it is.
+# Streamed bodies (export) are produced after this point and are not in the profile.
+def stop_profile(response):
+    name = _finish()
+    if name and request.headers.get(HEADER):
+        response.headers["X-Profile-File"] = name
+    return response
+
+
+# teardown_request: the endpoint raised, still stop the profiler and keep what it saw
+def release_profile(exc):
+    _finish()
+
+
+def register_profiling(app):
+    app.before_request(start_profile)
+    app.after_request(stop_profile)
+    app.teardown_request(release_profile)
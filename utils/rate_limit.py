@@ -0,0 +1,271 @@
+import itertools
+import math
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from db import SessionLocal
+from models.rate_limit_bucket import RateLimitBucket
+from utils.validators import normalize_email
+
+# Longest email a login is checked for, same as Employee.email
+MAX_EMAIL_LENGTH = 150
+
+
+# Password check slots live in rate_limit_buckets too, under this prefix (never pruned as buckets)
+SLOT_PREFIX = "slot:password-hash:"
+
+
+# Refill one bucket and try to take a token, returns (tokens_left, retry_after_seconds)
+def _take(tokens, updated_at, now, burst, per_minute):
+    rate = per_minute / 60.0
+    tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBucketStore:
+    """Token buckets in this process only, every worker counts on its own."""
+
+    # Above this many keys, buckets idle for an hour (full again anyway) are dropped
+    MAX_KEYS = 10000
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    # Drop buckets untouched for idle_after seconds, they have refilled to full
+    def prune(self, idle_after):
+        now = self.clock()
+        with self._lock:
+            before = len(self._buckets)
+            self._buckets = {k: v for k, v in self._buckets.items() if v[1] >= now - idle_after}
+            return before - len(self._buckets)
+
+    def take(self, key, burst, per_minute):
+        now = self.clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            tokens, retry_after = _take(tokens, updated_at, now, burst, per_minute)
+            self._buckets[key] = (tokens, now)
+
+            if len(self._buckets) > self.MAX_KEYS:
+                self._buckets = {k: v for k, v in self._buckets.items() if v[1] > now - 3600}
+        return retry_after
+
+
+class DatabaseBucketStore:
+    """Token buckets in the rate_limit_buckets table, shared by all workers."""
+
+    def __init__(self, clock=time.time, prune_every=None):
+        self.clock = clock
+        # Every new email or IP adds a row, every prune_every-th take deletes the full ones again
+        self.prune_every = prune_every or int(os.getenv("LOGIN_BUCKET_PRUNE_EVERY", "1000"))
+        self._takes = itertools.count(1)
+        # Longest time an empty bucket seen by this process needs to refill
+        self._idle_after = 0.0
+
+    # Delete buckets untouched for idle_after seconds: they are full again, same as a missing row
+    def prune(self, idle_after=None):
+        idle_after = self._idle_after if idle_after is None else idle_after
+        if not idle_after:
+            return 0
+        with SessionLocal() as session:
+            deleted = (
+                session.query(RateLimitBucket)
+                .filter(RateLimitBucket.updated_at < self.clock() - idle_after, ~RateLimitBucket.key.startswith(SLOT_PREFIX))
+                .delete(synchronize_session=False)
+            )
+            session.commit()
+        return deleted
+
+    def take(self, key, burst, per_minute):
+        self._idle_after = max(self._idle_after, burst * 60.0 / per_minute)
+        retry_after = self._take(key, burst, per_minute)
+        if next(self._takes) % self.prune_every == 0:
+            self.prune()
+        return retry_after
+
+    def _take(self, key, burst, per_minute):
+        for _ in range(2):
+            now = self.clock()
+            try:
+                with SessionLocal() as session:
+                    # Row lock on Postgres so two workers don't both spend the last token
+                    bucket = (
+                        session.query(RateLimitBucket)
+                        .filter(RateLimitBucket.key == key)
+                        .with_for_update()
+                        .first()
+                    )
+                    if bucket is None:
+                        bucket = RateLimitBucket(key=key, tokens=burst, updated_at=now)
+                        session.add(bucket)
+
+                    bucket.tokens, retry_after = _take(bucket.tokens, bucket.updated_at, now, burst, per_minute)
+                    bucket.updated_at = now
+                    session.commit()
+                    return retry_after
+            except IntegrityError:
+                # Another worker created the same bucket first, read it again
+                continue
+        return 0.0
+
+
+class LocalHashSlots:
+    """Cap on concurrent password checks in this process, only bites with threaded workers."""
+
+    def __init__(self, limit):
+        self._slots = threading.BoundedSemaphore(limit)
+
+    @contextmanager
+    def acquire(self, timeout):
+        acquired = self._slots.acquire(timeout=timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._slots.release()
+
+
+class DatabaseHashSlots:
+    """Cap on concurrent password checks across all workers: one rate_limit_buckets row per slot,
+    tokens 1 = free, 0 = taken. A slot taken longer than `lease` seconds (worker killed mid-check) is free again."""
+
+    def __init__(self, limit, lease=10.0, poll=0.02, clock=time.time, sleep=time.sleep):
+        self.keys = [f"{SLOT_PREFIX}{i}" for i in range(limit)]
+        self.lease = lease
+        self.poll = poll
+        self.clock = clock
+        self.sleep = sleep
+
+    @contextmanager
+    def acquire(self, timeout):
+        deadline = self.clock() + timeout
+        slot = self._claim()
+        while slot is None and self.clock() < deadline:
+            self.sleep(self.poll)
+            slot = self._claim()
+        try:
+            yield slot is not None
+        finally:
+            if slot is not None:
+                self._release(*slot)
+
+    # (key, taken_at) of a slot this process now holds, None when all are busy
+    def _claim(self):
+        now = self.clock()
+        keys = random.sample(self.keys, len(self.keys))
+        with SessionLocal() as session:
+            for key in keys:
+                claimed = (
+                    session.query(RateLimitBucket)
+                    .filter(RateLimitBucket.key == key, or_(RateLimitBucket.tokens >= 1, RateLimitBucket.updated_at < now - self.lease))
+                    .update({"tokens": 0, "updated_at": now}, synchronize_session=False)
+                )
+                session.commit()
+                if claimed:
+                    return key, now
+
+            # First use: slot rows are created already taken
+            existing = {key for key, in session.query(RateLimitBucket.key).filter(RateLimitBucket.key.in_(keys))}
+            for key in keys:
+                if key in existing:
+                    continue
+                session.add(RateLimitBucket(key=key, tokens=0, updated_at=now))
+                try:
+                    session.commit()
+                    return key, now
+                except IntegrityError:
+                    # Another worker created it first
+                    session.rollback()
+        return None
+
+    def _release(self, key, taken_at):
+        with SessionLocal() as session:
+            # Only our own claim, the lease may have run out and someone else holds it now
+            session.query(RateLimitBucket).filter(
+                RateLimitBucket.key == key, RateLimitBucket.updated_at == taken_at
+            ).update({"tokens": 1}, synchronize_session=False)
+            session.commit()
+
+
+# backend -> (bucket store, password check slots)
+BUCKET_STORES = {
+    "memory": (MemoryBucketStore, LocalHashSlots),
+    "database": (DatabaseBucketStore, DatabaseHashSlots),
+}
+
+
+class LoginLimiter:
+    """Per-IP and per-email token buckets plus a cap on concurrent password hash checks."""
+
+    def __init__(self, store, ip_burst=10, ip_per_minute=30, email_burst=5, email_per_minute=10,
+                 max_concurrent_hashes=4, hash_wait=0.5, hash_slots=None):
+        self.store = store
+        self.ip_limit = (ip_burst, ip_per_minute)
+        self.email_limit = (email_burst, email_per_minute)
+        self.hash_wait = hash_wait
+        self.hash_slots = hash_slots or LocalHashSlots(max_concurrent_hashes)
+
+    # Seconds the client has to wait, 0 when the attempt is allowed. The email must already be
+    # a string of at most MAX_EMAIL_LENGTH characters (see auth_service.login).
+    def check(self, ip, email):
+        retry_after = self.store.take(f"login:ip:{ip}", *self.ip_limit)
+        if email:
+            retry_after = max(retry_after, self.store.take(f"login:email:{normalize_email(email)}", *self.email_limit))
+        return retry_after
+
+    # Seconds after which an untouched bucket of either kind is full again
+    def idle_seconds(self):
+        return max(burst * 60.0 / per_minute for burst, per_minute in (self.ip_limit, self.email_limit))
+
+    # Yields False when no hash slot freed up within hash_wait seconds
+    @contextmanager
+    def hash_slot(self):
+        with self.hash_slots.acquire(self.hash_wait) as acquired:
+            yield acquired
+
+
+def create_login_limiter():
+    backend = os.getenv("LOGIN_RATE_LIMIT_BACKEND", "memory")
+    if backend not in BUCKET_STORES:
+        raise ValueError(f"Unknown LOGIN_RATE_LIMIT_BACKEND '{backend}', use one of: {', '.join(BUCKET_STORES)}")
+
+    store_class, slots_class = BUCKET_STORES[backend]
+    max_concurrent_hashes = int(os.getenv("LOGIN_MAX_CONCURRENT_HASHES", "4"))
+    return LoginLimiter(
+        store_class(),
+        ip_burst=int(os.getenv("LOGIN_IP_BURST", "10")),
+        ip_per_minute=float(os.getenv("LOGIN_IP_PER_MINUTE", "30")),
+        email_burst=int(os.getenv("LOGIN_EMAIL_BURST", "5")),
+        email_per_minute=float(os.getenv("LOGIN_EMAIL_PER_MINUTE", "10")),
+        hash_wait=float(os.getenv("LOGIN_HASH_WAIT", "0.5")),
+        hash_slots=slots_class(max_concurrent_hashes),
+    )
+
+
+_login_limiter = None
+
+
+def get_login_limiter():
+    global _login_limiter
+    if _login_limiter is None:
+        _login_limiter = create_login_limiter()
+    return _login_limiter
+
+
+def reset_login_limiter():
+    global _login_limiter
+    _login_limiter = None
+
+
+def retry_after_header(seconds):
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
@@ -0,0 +1,39 @@
+from models.employee import Employee
+from models.vacation_total import VacationTotal
+from models.vacation_used import VacationUsed
+
+
+# Serializers work on plain column tuples, query exactly these columns:
+#   session.query(*EMPLOYEE_COLUMNS)
+
+
+EMPLOYEE_COLUMNS = (Employee.id, Employee.email, Employee.is_admin)
+
+def employee_row(row):
+    return {"id": row[0], "email": row[1], "is_admin": row[2]}
+
+
+VACATION_TOTAL_COLUMNS = (VacationTotal.year, VacationTotal.total_days, VacationTotal.total_days_left)
+
+def vacation_total_row(row):
+    return {
+        "year": row[0],
+        "total_days": row[1],
+        "used_days": row[1] - row[2],
+        "days_left": row[2],
+    }
+
+
+VACATION_USED_COLUMNS = (VacationUsed.id, VacationUsed.start_date, VacationUsed.end_date, VacationUsed.days_used)
+
+def vacation_used_row(row):
+    return {
+        "id": row[0],
+        "start_date": row[1].isoformat(),
+        "end_date": row[2].isoformat(),
+        "days_used": row[3],
+    }
+
+
+def serialize_rows(serializer, rows):
+    return [serializer(row) for row in rows]
@@ -1 +1,46 @@
-blacklist = set()
\ No newline at end of file
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+
+from db import SessionLocal
+from models.revoked_token import RevokedToken
+
+
+# Rows revoked before expires_at was stored are kept this long (access tokens live 1 hour)
+LEGACY_RETENTION = timedelta(days=1)
+
+
+class TokenBlacklist:
+    """Revoked JWT ids, kept in the database so every worker process sees a logout."""
+
+    # expires: the token's exp claim (unix time)
+    def add(self, jti, expires=None):
+        with SessionLocal() as session:
+            if not session.get(RevokedToken, jti):
+                expires_at = datetime.utcfromtimestamp(expires) if expires is not None else None
+                session.add(RevokedToken(jti=jti, expires_at=expires_at))
+                session.commit()
+
+    # Only called for tokens that are not expired yet, flask-jwt-extended checks exp first
+    def __contains__(self, jti):
+        with SessionLocal() as session:
+            return session.get(RevokedToken, jti) is not None
+
+
+# Drop revoked tokens past their exp, they can't be used anymore anyway. Returns how many.
+def purge_expired_tokens(now=None):
+    now = now or datetime.utcnow()
+    with SessionLocal() as session:
+        deleted = (
+            session.query(RevokedToken)
+            .filter(or_(
+                RevokedToken.expires_at <= now,
+                and_(RevokedToken.expires_at.is_(None), RevokedToken.revoked_at <= now - LEGACY_RETENTION),
+            ))
+            .delete(synchronize_session=False)
+        )
+        session.commit()
+    return deleted
+
+
+blacklist = TokenBlacklist()
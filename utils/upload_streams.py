@@ -0,0 +1,91 @@
+import gzip
+import json
+import zlib
+from io import TextIOWrapper
+from itertools import chain
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for .zst uploads
+    zstandard = None
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class UnsupportedUploadError(ValueError):
+    pass
+
+
+# Wrap upload in a streaming decompressor, detected from the magic bytes
+def decompressed(stream):
+    magic = stream.read(4)
+    stream.seek(0)
+
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+
+    if magic.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise UnsupportedUploadError("zstd uploads need the 'zstandard' package installed")
+        return zstandard.ZstdDecompressor().stream_reader(stream)
+
+    return stream
+
+
+# What a truncated or corrupt gzip / zstd / utf-8 upload raises while it is read
+READ_ERRORS = (OSError, EOFError, zlib.error, UnicodeDecodeError) + ((zstandard.ZstdError,) if zstandard else ())
+
+
+# Returns ("csv" | "ndjson", iterator of text lines), nothing is read ahead except the first line
+def open_upload(stream):
+    text = TextIOWrapper(decompressed(stream), encoding="utf-8-sig", newline="")
+
+    try:
+        first_line = text.readline()
+    except READ_ERRORS as e:
+        raise UnsupportedUploadError(f"Could not read upload: {e}")
+
+    upload_format = "ndjson" if first_line.lstrip().startswith("{") else "csv"
+    return upload_format, chain([first_line], _checked_lines(text))
+
+
+# A broken upload only shows up mid-stream, chunks before it are already committed
+def _checked_lines(text):
+    try:
+        yield from text
+    except READ_ERRORS as e:
+        raise UnsupportedUploadError(f"Upload is truncated or corrupt: {e}")
+
+
+# One dict per NDJSON line; blank lines are ignored, broken lines become {}
+def ndjson_records(lines):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = {}
+        yield record if isinstance(record, dict) else {}
+
+
+# Turn records into csv.reader style rows with the given field order
+def rows_from_records(records, fields):
+    for record in records:
+        if not all(field in record for field in fields):
+            yield []
+            continue
+        yield ["" if record[field] is None else str(record[field]) for field in fields]
+
+
+# Turn records into csv.DictReader style rows used by the users import
+def user_rows_from_records(records):
+    for record in records:
+        yield {
+            "Employee Email": record.get("email"),
+            "Employee Password": record.get("password"),
+            "is_admin": str(record.get("is_admin", "false")),
+        }
@@ -0,0 +1,132 @@
+import gzip
+import json
+import os
+import threading
+
+
+# Layout:  <ARCHIVE_DIR>/<year>/vacations.jsonl.gz  -> one gzip member per employee block, append-only
+#          <ARCHIVE_DIR>/<year>/index.json          -> {"employee_id": [[offset, length], ...]}
+DATA_FILE = "vacations.jsonl.gz"
+INDEX_FILE = "index.json"
+
+
+def get_archive_dir():
+    return os.getenv("ARCHIVE_DIR", "archive")
+
+
+_index_cache = {}
+_cache_lock = threading.Lock()
+
+
+class VacationArchive:
+    """Compressed, append-only store for vacation years that were closed and moved out of the database."""
+
+    def __init__(self, root=None):
+        self.root = root or get_archive_dir()
+
+    def _year_dir(self, year):
+        return os.path.join(self.root, str(year))
+
+    def _index_path(self, year):
+        return os.path.join(self._year_dir(year), INDEX_FILE)
+
+    def _data_path(self, year):
+        return os.path.join(self._year_dir(year), DATA_FILE)
+
+    def years(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(name) for name in os.listdir(self.root) if name.isdigit() and self.is_archived(int(name)))
+
+    def is_archived(self, year):
+        return os.path.exists(self._index_path(year))
+
+    # Index is small, cached per process until the file changes
+    def load_index(self, year):
+        path = self._index_path(year)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+
+        with _cache_lock:
+            cached = _index_cache.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+        with _cache_lock:
+            _index_cache[path] = (mtime, index)
+        return index
+
+    def _pending_path(self, year):
+        return self._index_path(year) + ".pending"
+
+    # blocks: iterable of (employee_id, {"total": {...} | None, "vacations": [...]})
+    def append(self, year, blocks):
+        written = self.stage(year, blocks)
+        self.publish(year)
+        return written
+
+    # Appends the data but only writes the new index next to the live one, readers don't see it until publish()
+    def stage(self, year, blocks):
+        os.makedirs(self._year_dir(year), exist_ok=True)
+        index = dict(self.load_index(year))
+        written = 0
+
+        with open(self._data_path(year), "ab") as f:
+            for employee_id, block in blocks:
+                member = gzip.compress(json.dumps(block, separators=(",", ":")).encode("utf-8"))
+                offset = f.tell()
+                f.write(member)
+                index.setdefault(str(employee_id), []).append([offset, len(member)])
+                written += 1
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Index last, until it's published the appended bytes are unreferenced
+        with open(self._pending_path(year), "w", encoding="utf-8") as f:
+            json.dump(index, f)
+            f.flush()
+            os.fsync(f.fileno())
+        return written
+
+    def has_pending(self, year):
+        return os.path.exists(self._pending_path(year))
+
+    # Atomic swap, the staged blocks become visible all at once
+    def publish(self, year):
+        os.replace(self._pending_path(year), self._index_path(year))
+
+    def discard(self, year):
+        try:
+            os.remove(self._pending_path(year))
+        except FileNotFoundError:
+            pass
+
+    # Merged block for one employee, None if the employee has nothing archived that year
+    def read(self, year, employee_id):
+        entries = self.load_index(year).get(str(employee_id))
+        if not entries:
+            return None
+
+        total = None
+        vacations = {}
+        with open(self._data_path(year), "rb") as f:
+            for offset, length in entries:
+                f.seek(offset)
+                block = json.loads(gzip.decompress(f.read(length)))
+                total = block.get("total") or total
+                for vacation in block.get("vacations", []):
+                    vacations[vacation["id"]] = vacation
+
+        return {
+            "total": total,
+            "vacations": sorted(vacations.values(), key=lambda vacation: vacation["start_date"]),
+        }
+
+    # (employee_id, merged block) for every employee archived that year
+    def iter_year(self, year):
+        for employee_id in sorted(int(key) for key in self.load_index(year)):
+            yield employee_id, self.read(year, employee_id)
@@ -0,0 +1,12 @@
+import re
+
+
+# Check is email
+def is_valid_email(email: str) -> bool:
+    pattern = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+    return bool(re.match(pattern, email))
+
+
+# Lookup key for emails, John@Example.com and john@example.com are the same employee
+def normalize_email(email) -> str:
+    return str(email or "").strip().lower()
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+
+# Calculate days only from monday to friday
+def calculate_workdays(start_date, end_date):
+    days = (end_date - start_date).days + 1
+    if days <= 0:
+        return 0
+    # 5 workdays per full week, then walk the remaining 0-6 days
+    weeks, rest = divmod(days, 7)
+    first = start_date.weekday()
+    return weeks * 5 + sum(1 for i in range(rest) if (first + i) % 7 < 5)  # 0-4 mo-fr
+
+# Ignor overlap if overlap is weekends
+def overlap_is_only_weekends(start, end):
+    current = start
+    while current <= end:
+        if current.weekday() < 5:  # 0-4 mo-fr
+            return False
+        current += timedelta(days=1)
+    return True
+
+# First and last workday inside start..end, (None, None) if the range is only a weekend
+def workday_bounds(start_date, end_date):
+    # sat/sun -> next monday, previous friday
+    first = start_date + timedelta(days=7 - start_date.weekday()) if start_date.weekday() >= 5 else start_date
+    last = end_date - timedelta(days=end_date.weekday() - 4) if end_date.weekday() >= 5 else end_date
+    if first > last:
+        return None, None
+    return first, last
+
+# {first day of month: workdays} for start..end, one entry per calendar month touched
+def workdays_by_month(start_date, end_date):
+    months = {}
+    current = start_date
+    while current <= end_date:
+        month = current.replace(day=1)
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        last = min(end_date, next_month - timedelta(days=1))
+        months[month] = calculate_workdays(current, last)
+        current = next_month
+    return months